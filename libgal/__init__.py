@@ -14,47 +14,89 @@ try:
     import os
     from pathlib import Path
     import time
-    import requests
+    from importlib import import_module
     from urllib.parse import urlparse
 
+    # Variables de entorno
+    from dotenv import load_dotenv
+
+except ImportError as imp_err:
+    # Freno ejecucion y devuelvo codigo de error
+    raise ImportError(f"Error al importar libreria: {imp_err}")
+
+
+# Nombres exportados por libgal cuya importación se difiere hasta el primer uso (PEP 562).
+# Cada entrada es: nombre -> (módulo, atributo). Si el atributo es None se exporta el módulo completo.
+_LAZY_IMPORTS = {
+    # Requests
+    'requests': ('requests', None),
+
     # Selenium
-    from selenium import webdriver
-    from selenium.webdriver.firefox.service import Service
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.support.select import Select
+    'webdriver': ('selenium.webdriver', None),
+    'Service': ('selenium.webdriver.firefox.service', 'Service'),
+    'By': ('selenium.webdriver.common.by', 'By'),
+    'Select': ('selenium.webdriver.support.select', 'Select'),
+    'Keys': ('selenium.webdriver.common.keys', 'Keys'),
+    'ActionChains': ('selenium.webdriver.common.action_chains', 'ActionChains'),
 
-    from bs4 import BeautifulSoup
+    'BeautifulSoup': ('bs4', 'BeautifulSoup'),
 
     # Teradata
-    import teradatasql
-    from libgal.modules.Teradata import teradata
-    from teradatasql import OperationalError as TeradataError
-
-    # Variables de entorno
-    from dotenv import load_dotenv
+    'teradatasql': ('teradatasql', None),
+    'teradata': ('libgal.modules.Teradata', 'teradata'),
+    'TeradataError': ('teradatasql', 'OperationalError'),
 
     # SQLALchemy
-    from sqlalchemy import create_engine, Column, Integer, String, text, and_
-    from sqlalchemy.orm import sessionmaker
-    from sqlalchemy.ext.declarative import declarative_base
-    from sqlalchemy.exc import OperationalError as SQLAlchemyError
-    from libgal.modules.SQLAlchemy import SQLAlchemy as sqlalchemy
+    'create_engine': ('sqlalchemy', 'create_engine'),
+    'Column': ('sqlalchemy', 'Column'),
+    'Integer': ('sqlalchemy', 'Integer'),
+    'String': ('sqlalchemy', 'String'),
+    'text': ('sqlalchemy', 'text'),
+    'and_': ('sqlalchemy', 'and_'),
+    'sessionmaker': ('sqlalchemy.orm', 'sessionmaker'),
+    'declarative_base': ('sqlalchemy.ext.declarative', 'declarative_base'),
+    'SQLAlchemyError': ('sqlalchemy.exc', 'OperationalError'),
+    'sqlalchemy': ('libgal.modules.SQLAlchemy', 'SQLAlchemy'),
 
     # Machine Learning
-    from sklearn.base import BaseEstimator, TransformerMixin
-    import numpy as np
-    import pandas
-    from collections import defaultdict
-    from scipy.stats import ks_2samp
-    from sklearn.metrics import roc_curve, roc_auc_score
-    from selenium.webdriver.common.keys import Keys
-    from selenium.webdriver.common.action_chains import ActionChains
-    from libgal.modules.MLS import *
+    'BaseEstimator': ('sklearn.base', 'BaseEstimator'),
+    'TransformerMixin': ('sklearn.base', 'TransformerMixin'),
+    'np': ('numpy', None),
+    'pandas': ('pandas', None),
+    'defaultdict': ('collections', 'defaultdict'),
+    'ks_2samp': ('scipy.stats', 'ks_2samp'),
+    'roc_curve': ('sklearn.metrics', 'roc_curve'),
+    'roc_auc_score': ('sklearn.metrics', 'roc_auc_score'),
+    'evaluate_ks_and_roc_auc': ('libgal.modules.MLS', 'evaluate_ks_and_roc_auc'),
+    'NumNormTransformer': ('libgal.modules.MLS', 'NumNormTransformer'),
+    'NumLogTransformer': ('libgal.modules.MLS', 'NumLogTransformer'),
+    'CategoricalReduceTransformer': ('libgal.modules.MLS', 'CategoricalReduceTransformer'),
+}
+
+
+def __getattr__(name):
+    """
+    Descripción: Resuelve en el primer acceso los nombres declarados en _LAZY_IMPORTS
+    Parámetro:
+    - name (String): Nombre del atributo solicitado
+    """
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
+    module_name, attr = _LAZY_IMPORTS[name]
+    try:
+        module = import_module(module_name)
+        value = module if attr is None else getattr(module, attr)
+    except ImportError as imp_err:
+        raise ImportError(f"Error al importar libreria: {imp_err}")
+
+    # Se cachea en el namespace del paquete para que los siguientes accesos no pasen por __getattr__
+    globals()[name] = value
+    return value
 
-except ImportError as imp_err:
-    # Freno ejecucion y devuelvo codigo de error
-    raise ImportError(f"Error al importar libreria: {imp_err}")
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
 
 
 def variables_entorno(path_env_file=None):
@@ -120,6 +162,9 @@ def firefox(webdriver_path, browser_path, url, hidden=False, tipo_archivo=None,
     - url (String): URL del sitio web a explorar.
     - hidden (Boolean): Indica si se oculta o no el cliente web. False por defecto.
     """
+    # Selenium se importa recién al usarse para no penalizar el import de libgal
+    from selenium import webdriver
+    from selenium.webdriver.firefox.service import Service
 
     options = webdriver.FirefoxOptions()
     options.binary_location = browser_path
@@ -166,9 +211,20 @@ def html_parser(html):
 
     raise Exception("La función html_parser() se encuentra deprecada. Utilice la función request() en su lugar.")
 
-def request(url, intentos=1, scraping=False, SSL=True):
-
+def request(url, intentos=1, scraping=False, SSL=True, retry_policy=None):
+    """
+    Descripción: Realiza un GET a la URL indicada con reintentos (backoff exponencial con jitter)
+    Parámetro:
+    - url (String): URL a consultar
+    - intentos (Integer): Cantidad máxima de intentos
+    - scraping (Boolean): Si es True devuelve el HTML parseado con BeautifulSoup
+    - SSL (Boolean): Verifica el certificado SSL
+    - retry_policy (RetryPolicy): Política de reintentos, reemplaza a intentos
+    """
+    import requests
+    from bs4 import BeautifulSoup
     from libgal.modules.Logger import Logger
+    from libgal.modules.Retry import RetryPolicy
     _logger = Logger(format_output="CSV")
     _logger.get_logger().setLevel(logging.INFO)
     _log=_logger.get_logger()
@@ -184,29 +240,17 @@ def request(url, intentos=1, scraping=False, SSL=True):
     "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_4) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/83.0.4103.97 Safari/537.36", 
   }
     
-    web=None
-
-    intento = 0
-
-    while intento < intentos:
-        try:
-
-            web=sesion.get(url ,headers=headers, verify=SSL)
-
-            if web != None:
-
-                if scraping:
-                    return BeautifulSoup(web.content, 'html.parser')
-                else:
-                    return web
-
-        except requests.RequestException as e:
-            _log.error(f"No se puede conectar a la URL especificada: {e}")
-            intento += 1
-            time.sleep(20)
-        except requests.ConnectionError as e:
-            _log.error(f"No se puede conectar a la URL especificada: {e}")
-            intento += 1
-            time.sleep(20)
-
-    return False
+    if retry_policy is None:
+        retry_policy = RetryPolicy(max_attempts=intentos, base_delay=1, max_delay=20,
+                                   retryable_exceptions=(requests.RequestException,), name='request')
+
+    try:
+        web = retry_policy.run(sesion.get, url, headers=headers, verify=SSL, logger=_log)
+    except requests.RequestException as e:
+        _log.error("No se puede conectar a la URL especificada: %s", e)
+        return False
+
+    if scraping:
+        return BeautifulSoup(web.content, 'html.parser')
+    else:
+        return web
@@ -0,0 +1,217 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional
+
+from pandas import DataFrame
+
+from libgal.modules.DatabaseAPI import DatabaseAPI, DEFAULT_CHUNK_ROWS
+from libgal.modules.QueryCache import written_tables
+
+DEFAULT_ASYNC_WORKERS = 8
+
+
+class AsyncDatabaseAPI:
+    """
+    Fachada asyncio de una DatabaseAPI. Las operaciones se ejecutan en un ThreadPoolExecutor acotado y cada
+    hilo del executor usa su propia instancia creada con factory, de modo que el executor es también el pool
+    de conexiones. Permite lanzar muchas queries con asyncio.gather: el tiempo total pasa a ser el de la más
+    lenta en lugar de la suma.
+
+        async with AsyncSqlite('datos.db') as adb:
+            a, b = await asyncio.gather(adb.query(sql_a), adb.query(sql_b))
+    """
+
+    def __init__(self, factory: Callable[[], DatabaseAPI], max_workers: int = DEFAULT_ASYNC_WORKERS,
+                 max_concurrency: Optional[int] = None):
+        """
+            :param factory: Función sin argumentos que crea una conexión (una por hilo del executor)
+            :param max_workers: Hilos del executor (y conexiones abiertas como máximo)
+            :param max_concurrency: Operaciones en curso como máximo, por defecto max_workers. Las demás esperan
+                sin ocupar el executor, por lo que se pueden cancelar antes de empezar.
+        """
+        self.factory = factory
+        self.max_workers = max(max_workers, 1)
+        self.max_concurrency = max_concurrency or self.max_workers
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='libgal-async')
+        self._local = threading.local()
+        self._instances = []
+        self._lock = threading.Lock()
+        self._semaphores = {}
+
+    def _db(self) -> DatabaseAPI:
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = self._local.db = self.factory()
+            with self._lock:
+                self._instances.append(db)
+        return db
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    def _on_cancel(self, state: dict):
+        """
+        Se llama cuando se cancela una operación que ya empezó a ejecutarse. Las implementaciones que
+        puedan interrumpir la sentencia en el motor lo hacen aquí.
+        """
+        pass
+
+    async def _submit(self, func: Callable[[dict], object]):
+        """
+        Ejecuta func(state) en el executor respetando el límite de concurrencia. state es un diccionario
+        donde la operación puede dejar lo necesario para interrumpirla (ver _on_cancel).
+        """
+        state = {}
+
+        def call():
+            state['running'] = True
+            return func(state)
+
+        async with self._semaphore():
+            future = asyncio.get_running_loop().run_in_executor(self._executor, call)
+            try:
+                return await future
+            except asyncio.CancelledError:
+                # si la operación no había empezado el executor la descarta, si no se intenta interrumpirla
+                if state.get('running'):
+                    self._on_cancel(state)
+                raise
+
+    async def run(self, func: Callable, *args, **kwargs):
+        """
+        Ejecuta func(db, *args, **kwargs) en el executor, donde db es la conexión del hilo
+        """
+        return await self._submit(lambda state: func(self._db(), *args, **kwargs))
+
+    async def query(self, query: str, **kwargs) -> DataFrame:
+        return await self.run(lambda db: db.query(query, **kwargs))
+
+    async def do(self, query, **kwargs):
+        return await self.run(lambda db: db.do(query, **kwargs))
+
+    async def insert(self, df: DataFrame, schema: Optional[str], table: str, pk: str, **kwargs):
+        return await self.run(lambda db: db.insert(df, schema, table, pk, **kwargs))
+
+    async def upsert(self, df: DataFrame, schema: Optional[str], table: str, pk: str, **kwargs):
+        return await self.run(lambda db: db.upsert(df, schema, table, pk, **kwargs))
+
+    async def query_to_file(self, query: str, path: str, file_format: Optional[str] = None,
+                            chunk_rows: int = DEFAULT_CHUNK_ROWS, **kwargs) -> int:
+        return await self.run(lambda db: db.query_to_file(query, path, file_format, chunk_rows, **kwargs))
+
+    async def gather_queries(self, queries: Iterable[str], return_exceptions: bool = False) -> List[DataFrame]:
+        """
+        Ejecuta varias queries de forma concurrente y devuelve los resultados en el mismo orden
+            :param queries: Queries a ejecutar
+            :param return_exceptions: Devolver las excepciones en la lista en lugar de propagar la primera
+        """
+        return await asyncio.gather(*(self.query(query) for query in queries), return_exceptions=return_exceptions)
+
+    def close(self):
+        """
+        Espera a que terminen las operaciones en curso y cierra las conexiones de los hilos
+        """
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            for db in self._instances:
+                try:
+                    db.connection.close()
+                except Exception:
+                    pass
+            self._instances = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+
+class AsyncSqlite(AsyncDatabaseAPI):
+    """
+    Fachada asyncio de Sqlite, con una conexión al archivo por hilo
+    """
+
+    def __init__(self, dbfile: str, max_workers: int = DEFAULT_ASYNC_WORKERS, max_concurrency: Optional[int] = None):
+        if dbfile == ':memory:':
+            raise ValueError('Cada hilo abre su propia conexión, una base en memoria no se compartiría')
+        from libgal.modules.Sqlite import Sqlite
+        super().__init__(lambda: Sqlite(dbfile), max_workers, max_concurrency)
+
+
+class AsyncTeradataML(AsyncDatabaseAPI):
+    """
+    Fachada asyncio de TeradataML. query y do se ejecutan en paralelo, cada una en una sesión del pool de
+    teradatasql de la instancia. insert, upsert y los scripts de Scripting usan el contexto de teradataml,
+    que es único por proceso, por lo que se ejecutan de a uno.
+    Al cancelar una query en curso se cancela la sentencia en su sesión.
+    """
+
+    def __init__(self, td, max_workers: Optional[int] = None, max_concurrency: Optional[int] = None):
+        """
+            :param td: Instancia de TeradataML
+            :param max_workers: Hilos del executor, por defecto el tamaño máximo del pool de sesiones
+            :param max_concurrency: Operaciones en curso como máximo, por defecto max_workers
+        """
+        self.td = td
+        self._write_lock = threading.Lock()
+        super().__init__(lambda: td, max_workers or td.pool_max_size, max_concurrency)
+
+    def _on_cancel(self, state: dict):
+        session = state.get('session')
+        cancel = getattr(session, 'cancel', None)
+        if cancel is not None:
+            try:
+                cancel()
+            except Exception:
+                pass
+
+    def _pooled(self, state: dict, func):
+        with self.td.pool.session() as con:
+            state['session'] = con
+            with con.cursor() as c:
+                return func(c)
+
+    async def query(self, query: str, **kwargs) -> DataFrame:
+        """
+        Ejecuta una query en una sesión del pool. Con kwargs (ej: mode='fastexport') se usa TeradataML.query.
+        """
+        if kwargs:
+            return await self._submit(lambda state: self._serialized(self.td.query, query, **kwargs))
+
+        def fetch(c):
+            c.execute(query)
+            columns = [col[0] for col in c.description]
+            return DataFrame.from_records(c.fetchall(), columns=columns, coerce_float=True)
+
+        return await self._submit(lambda state: self._pooled(state, fetch))
+
+    async def do(self, query, **kwargs):
+        """
+        Ejecuta una sentencia en una sesión del pool (en modo autocommit). Las listas de Scripting se
+        ejecutan con TeradataML.do.
+        """
+        if isinstance(query, list) or kwargs:
+            return await self._submit(lambda state: self._serialized(self.td.do, query, **kwargs))
+        await self._submit(lambda state: self._pooled(state, lambda c: c.execute(query)))
+        if self.td.query_cache is not None:
+            self.td.query_cache.invalidate(written_tables(query))
+
+    def _serialized(self, func, *args, **kwargs):
+        with self._write_lock:
+            return func(*args, **kwargs)
+
+    async def insert(self, df: DataFrame, schema: Optional[str], table: str, pk: str, **kwargs):
+        return await self._submit(lambda state: self._serialized(self.td.insert, df, schema, table, pk, **kwargs))
+
+    async def upsert(self, df: DataFrame, schema: Optional[str], table: str, pk: str, **kwargs):
+        return await self._submit(lambda state: self._serialized(self.td.upsert, df, schema, table, pk, **kwargs))
+
+    def close(self):
+        # la conexión principal y el pool pertenecen a la instancia de TeradataML
+        self._executor.shutdown(wait=True)
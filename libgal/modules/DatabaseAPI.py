@@ -1,9 +1,27 @@
+import uuid
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Iterator, List, NamedTuple, Optional, Tuple, Union
 
 import pandas as pd
 from pandas import DataFrame
 from libgal.modules.Utils import chunks
+from libgal.modules.Metrics import instrument_class, measure, timed
+from libgal.modules.Metadata import MetadataCache
+from libgal.modules.QueryCache import QueryCache, install_query_cache, DEFAULT_CACHE_TTL, \
+    DEFAULT_CACHE_ENTRIES, DEFAULT_CACHE_MEMORY_BYTES, DEFAULT_CACHE_DISK_BYTES
+
+DEFAULT_CHUNK_ROWS = 100000  # filas por chunk en las lecturas por streaming
+DEFAULT_DIFF_BUCKETS = 1024  # buckets de hash_diff
+
+# Operaciones que se miden automáticamente en todas las implementaciones de DatabaseAPI
+INSTRUMENTED_METHODS = ('do', 'query', 'insert', 'upsert', 'diff', 'staging_insert', 'staging_upsert',
+                        'drop_table', 'truncate_table', 'table_columns', 'create_table_like',
+                        'fastload', 'retry_fastload', 'parallel_fastload', 'load_csv')
+
+# Operaciones que invalidan la caché de resultados de las tablas que modifican
+CACHE_WRITERS = ('do', 'insert', 'upsert', 'insert_overwrite', '_delete_by_key_table', 'truncate_table',
+                 'drop_table', 'drop_tables', 'create_table_like', 'fastload', 'retry_fastload',
+                 'parallel_fastload', 'load_csv', 'staging_insert', 'staging_upsert')
 
 
 class FunctionNotImplementedException(Exception):
@@ -15,8 +33,41 @@ class DatabaseError(Exception):
     pass
 
 
+def _key_columns(pk: Union[str, List[str]]) -> List[str]:
+    """
+    Normaliza una clave simple o compuesta ('a', 'a, b' o ['a', 'b']) a una lista de columnas
+    """
+    if isinstance(pk, str):
+        return [col.strip() for col in pk.split(',') if col.strip()]
+    return list(pk)
+
+
+def _aux_table(table: str, suffix: str) -> str:
+    """
+    Nombre único para una tabla auxiliar de table (claves a borrar, particiones de una carga), para que dos
+    cargas concurrentes sobre la misma tabla no usen ni borren la tabla auxiliar de la otra
+    """
+    tag = f'_{suffix}_{uuid.uuid4().hex[:12]}'
+    return table[:128 - len(tag)] + tag
+
+
+class HashDiff(NamedTuple):
+    """
+    Resultado de hash_diff. Los conjuntos de claves son DataFrames con las columnas de la clave.
+    """
+    inserted: DataFrame  # claves que están en el origen y no en el destino
+    deleted: DataFrame  # claves que están en el destino y no en el origen
+    changed: DataFrame  # claves presentes en ambas tablas con algún valor distinto
+    rows: Optional[DataFrame]  # filas completas del origen de las claves insertadas y modificadas (fetch_rows=True)
+
+
 class DatabaseAPI(ABC):
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        instrument_class(cls, INSTRUMENTED_METHODS)
+        install_query_cache(cls, CACHE_WRITERS)
+
     @abstractmethod
     def connect(self):
         ...
@@ -35,6 +86,136 @@ class DatabaseAPI(ABC):
     def query(self, query: str) -> DataFrame:
         ...
 
+    def _connection_identity(self) -> str:
+        """
+        Identifica la base de datos en las claves de la caché de resultados
+        """
+        return f'{type(self).__name__}:{id(self)}'
+
+    @property
+    def query_cache(self) -> Optional[QueryCache]:
+        """
+        Caché de resultados de query, None si no está activada
+        """
+        return self.__dict__.get('_query_cache')
+
+    def enable_query_cache(self, ttl: float = DEFAULT_CACHE_TTL, max_entries: int = DEFAULT_CACHE_ENTRIES,
+                           max_memory_bytes: int = DEFAULT_CACHE_MEMORY_BYTES, cache_dir: Optional[str] = None,
+                           max_disk_bytes: int = DEFAULT_CACHE_DISK_BYTES) -> QueryCache:
+        """
+        Activa la caché de resultados de query. Las llamadas a query con la misma sentencia (sin importar
+        espacios ni comentarios) devuelven el resultado guardado hasta que vence o se modifica alguna de
+        las tablas que lee con do, insert, upsert u otro método de carga. Se puede indicar la vigencia de
+        una query con query(sql, cache_ttl=segundos) (0 para no usar la caché).
+            :param ttl: Segundos de vigencia por defecto
+            :param max_entries: Máximo de resultados en memoria
+            :param max_memory_bytes: Presupuesto de memoria
+            :param cache_dir: Directorio donde guardar los resultados en Parquet para reutilizarlos entre
+                ejecuciones (None para usar solo memoria)
+            :param max_disk_bytes: Presupuesto del directorio
+            :return: La caché, con las estadísticas en stats
+        """
+        self._query_cache = QueryCache(ttl, max_entries, max_memory_bytes, cache_dir, max_disk_bytes)
+        return self._query_cache
+
+    def disable_query_cache(self):
+        self._query_cache = None
+
+    def _cursor_chunks(self, cursor, query: str, chunk_rows: int) -> Iterator[DataFrame]:
+        """
+        Ejecuta la query en el cursor y devuelve el resultado de a chunk_rows filas con fetchmany.
+        Si la query no devuelve filas se devuelve un único DataFrame vacío con las columnas del resultado.
+        """
+        try:
+            cursor.execute(query)
+            columns = [col[0] for col in cursor.description]
+            rows = cursor.fetchmany(chunk_rows)
+            yield DataFrame.from_records(rows, columns=columns, coerce_float=True)
+            while rows:
+                rows = cursor.fetchmany(chunk_rows)
+                if rows:
+                    yield DataFrame.from_records(rows, columns=columns, coerce_float=True)
+        finally:
+            cursor.close()
+
+    def query_iter(self, query: str, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[DataFrame]:
+        """
+        Ejecuta una query y devuelve un iterador de DataFrames de hasta chunk_rows filas.
+        Las filas se leen del cursor a medida que se consumen, por lo que la memoria usada queda acotada
+        al tamaño de un chunk.
+            :param query: Query a ejecutar
+            :param chunk_rows: Cantidad de filas por DataFrame
+            :return: Iterador de DataFrames
+        """
+        return self._cursor_chunks(self.connection.cursor(), query, chunk_rows)
+
+    def query_to_file(self, query: str, path: str, file_format: Optional[str] = None,
+                      chunk_rows: int = DEFAULT_CHUNK_ROWS, **kwargs) -> int:
+        """
+        Ejecuta una query y escribe el resultado en un archivo CSV o Parquet chunk por chunk,
+        sin construir un único DataFrame con todo el resultado
+            :param query: Query a ejecutar
+            :param path: Ruta del archivo de salida
+            :param file_format: 'csv' o 'parquet', por defecto se infiere de la extensión del archivo
+            :param chunk_rows: Cantidad de filas por chunk
+            :param kwargs: Parámetros adicionales para DataFrame.to_csv o pyarrow.parquet.ParquetWriter
+            :return: Cantidad de filas escritas
+        """
+        if file_format is None:
+            file_format = 'parquet' if str(path).lower().endswith(('.parquet', '.pq')) else 'csv'
+        file_format = file_format.lower()
+        if file_format not in ('csv', 'parquet'):
+            raise ValueError(f'Formato de archivo no soportado: {file_format}')
+
+        total = 0
+        with measure(f'{type(self).__name__}.query_to_file') as m:
+            if file_format == 'csv':
+                for i, chunk in enumerate(self.query_iter(query, chunk_rows)):
+                    chunk.to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=False, **kwargs)
+                    total += len(chunk)
+                    m.add(rows=len(chunk), nbytes=int(chunk.memory_usage(index=False).sum()))
+            else:
+                try:
+                    import pyarrow as pa
+                    import pyarrow.parquet as pq
+                except ImportError as imp_err:
+                    raise ImportError(f'La escritura en Parquet requiere pyarrow: {imp_err}')
+
+                # El esquema del archivo se fija al abrir el writer. Una columna que en los primeros chunks solo
+                # tiene NULL no tiene tipo todavía, por lo que se retienen los chunks hasta que todas las columnas
+                # tengan alguno y se unifican los tipos (ej: int64 y double se promueven a double)
+                writer = None
+                pending = []
+
+                def write(tables):
+                    nonlocal writer, total
+                    if writer is None:
+                        schema = pa.unify_schemas([t.schema for t in tables], promote_options='permissive')
+                        writer = pq.ParquetWriter(path, schema, **kwargs)
+                    for table in tables:
+                        table = table.cast(writer.schema)
+                        writer.write_table(table)
+                        total += table.num_rows
+                        m.add(rows=table.num_rows, nbytes=table.nbytes)
+
+                try:
+                    for chunk in self.query_iter(query, chunk_rows):
+                        if writer is not None:
+                            write([pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False)])
+                            continue
+                        pending.append(pa.Table.from_pandas(chunk, preserve_index=False))
+                        schema = pa.unify_schemas([t.schema for t in pending], promote_options='permissive')
+                        if not any(pa.types.is_null(field.type) for field in schema):
+                            write(pending)
+                            pending = []
+                    if pending:
+                        # columnas sin ningún valor en todo el resultado (o resultado vacío): quedan de tipo null
+                        write(pending)
+                finally:
+                    if writer is not None:
+                        writer.close()
+        return total
+
     @abstractmethod
     def drop_table(self, schema: Optional[str], table: str):
         ...
@@ -47,6 +228,46 @@ class DatabaseAPI(ABC):
     def table_columns(self, schema: Optional[str], table: str) -> List[str]:
         ...
 
+    @property
+    def metadata_cache(self) -> MetadataCache:
+        """
+        Caché de la definición de las tablas (se crea con los valores por defecto en el primer uso)
+        """
+        cache = self.__dict__.get('_metadata_cache')
+        if cache is None:
+            cache = self._metadata_cache = MetadataCache()
+        return cache
+
+    @metadata_cache.setter
+    def metadata_cache(self, cache: MetadataCache):
+        self._metadata_cache = cache
+
+    def _read_table_schema(self, schema: Optional[str], table: str) -> List[Tuple[str, Optional[str]]]:
+        """
+        Lee del catálogo del motor la lista de (columna, tipo) de una tabla
+        """
+        raise FunctionNotImplementedException('La lectura del catálogo no está implementada para este motor')
+
+    def table_schema(self, schema: Optional[str], table: str) -> List[Tuple[str, Optional[str]]]:
+        """
+        Devuelve la lista de (columna, tipo) de una tabla. Se lee del catálogo una sola vez y se guarda
+        en metadata_cache hasta que vence o se invalida.
+            :param schema: Schema de la tabla
+            :param table: Nombre de la tabla
+        """
+        columns = self.metadata_cache.get(schema, table)
+        if columns is None:
+            columns = self._read_table_schema(schema, table)
+            self.metadata_cache.put(schema, table, columns)
+        return columns
+
+    def invalidate_metadata(self, schema: Optional[str] = None, table: Optional[str] = None):
+        """
+        Descarta la definición guardada de una tabla, de un schema (table=None) o de todas (sin argumentos).
+        Es necesario luego de modificar la estructura de una tabla con do().
+        """
+        self.metadata_cache.invalidate(schema, table)
+
     @staticmethod
     def _pks_as_in_statement(pks):
         if pd.api.types.is_numeric_dtype(pks):
@@ -55,16 +276,53 @@ class DatabaseAPI(ABC):
             pk_in_list = "'" + "','".join(pks.unique().astype(dtype=str).tolist()) + "'"
         return pk_in_list
 
-    def delete_by_primary_key(self, df: DataFrame, schema: Optional[str], table: str, pk: str, parser_limit=10000):
-        if not df.empty:
-            for pks in chunks(df[pk], parser_limit):
-                in_list = self._pks_as_in_statement(pks)
-                if schema is not None:
-                    escaped_table_name = f'{schema}.{table}'
-                else:
-                    escaped_table_name = f'{table}' if '.' not in table else f'"{table}"'
-                query = f"DELETE FROM {escaped_table_name} WHERE {pk} IN ({in_list});"
-                self.do(query)
+    @staticmethod
+    def _escaped_table_name(schema: Optional[str], table: str) -> str:
+        if schema is not None:
+            return f'{schema}.{table}'
+        return f'{table}' if '.' not in table else f'"{table}"'
+
+    def _delete_by_key_table(self, pks: pd.Series, schema: Optional[str], table: str, pk: str):
+        """
+        Carga las claves en una tabla auxiliar y borra con un único DELETE ... WHERE pk IN (SELECT ...).
+        Cada motor implementa la carga de la tabla auxiliar.
+        """
+        raise FunctionNotImplementedException('El borrado con tabla de claves no está implementado para este motor')
+
+    @timed('DatabaseAPI.delete_by_primary_key')
+    def delete_by_primary_key(self, df: DataFrame, schema: Optional[str], table: str, pk: str, parser_limit=10000,
+                              strategy: str = 'auto', join_threshold: Optional[int] = None):
+        """
+        Borra de la tabla los registros cuya clave está en el DataFrame
+            :param df: DataFrame con las claves
+            :param schema: Schema de la tabla
+            :param table: Nombre de la tabla
+            :param pk: Primary key de la tabla
+            :param parser_limit: Máximo de claves por sentencia con la estrategia 'in'
+            :param strategy: 'in' (listas IN literales), 'join' (tabla auxiliar de claves y un único DELETE)
+                o 'auto' (usa 'join' cuando hay más de join_threshold claves)
+            :param join_threshold: Cantidad de claves a partir de la cual 'auto' usa 'join', por defecto parser_limit
+        """
+        if df.empty:
+            return
+        if strategy not in ('auto', 'in', 'join'):
+            raise ValueError(f'Estrategia de borrado no soportada: {strategy}')
+
+        pks = pd.Series(df[pk].unique(), name=pk)
+        threshold = parser_limit if join_threshold is None else join_threshold
+        if strategy == 'join' or (strategy == 'auto' and len(pks) > threshold):
+            try:
+                self._delete_by_key_table(pks, schema, table, pk)
+                return
+            except FunctionNotImplementedException:
+                if strategy == 'join':
+                    raise
+
+        escaped_table_name = self._escaped_table_name(schema, table)
+        for chunk in chunks(pks, parser_limit):
+            in_list = self._pks_as_in_statement(chunk)
+            query = f"DELETE FROM {escaped_table_name} WHERE {pk} IN ({in_list});"
+            self.do(query)
 
     @abstractmethod
     def insert(self, df: DataFrame, schema: Optional[str], table: str, pk: str):
@@ -85,6 +343,104 @@ class DatabaseAPI(ABC):
              schema_dst: Optional[str], table_dst: str) -> DataFrame:
         ...
 
+    def _hash_diff_table(self, schema: Optional[str], table: str) -> str:
+        """
+        Nombre de la tabla en las queries de hash_diff
+        """
+        return self._escaped_table_name(schema, table)
+
+    def _row_hash_sql(self, columns: List[str]) -> str:
+        """
+        Expresión SQL con un hash entero de los valores de las columnas, que se pueda sumar sin desbordar
+        """
+        raise FunctionNotImplementedException('hash_diff no está implementado para este motor')
+
+    def _bucket_sql(self, keys: List[str], buckets: int) -> str:
+        """
+        Expresión SQL con el bucket (0 a buckets - 1) de la clave de cada fila
+        """
+        raise FunctionNotImplementedException('hash_diff no está implementado para este motor')
+
+    def _bucket_summary(self, table_sql: str, bucket_sql: str, row_hash_sql: str) -> DataFrame:
+        query = f'SELECT libgal_bucket, COUNT(*) AS libgal_rows, SUM(libgal_hash) AS libgal_hash ' \
+                f'FROM (SELECT {bucket_sql} AS libgal_bucket, {row_hash_sql} AS libgal_hash FROM {table_sql}) d ' \
+                f'GROUP BY libgal_bucket;'
+        result = self.query(query, cache_ttl=0)
+        result.columns = ['libgal_bucket', 'libgal_rows', 'libgal_hash']
+        return result.astype('int64')
+
+    def _bucket_rows(self, table_sql: str, select: str, bucket_sql: str, row_hash_sql: str,
+                     buckets: List[int]) -> DataFrame:
+        in_list = ','.join(str(bucket) for bucket in buckets)
+        query = f'SELECT {select}, {row_hash_sql} AS libgal_hash FROM {table_sql} t ' \
+                f'WHERE {bucket_sql} IN ({in_list});'
+        return self.query(query, cache_ttl=0)
+
+    @timed('DatabaseAPI.hash_diff')
+    def hash_diff(self, schema_src: Optional[str], table_src: str, schema_dst: Optional[str], table_dst: str,
+                  pk: Union[str, List[str]], buckets: int = DEFAULT_DIFF_BUCKETS, fetch_rows: bool = False,
+                  bucket_limit: int = 1000) -> HashDiff:
+        """
+        Compara dos tablas con la misma estructura sin traer al cliente las filas completas. Primero se calcula
+        en el motor, para cada bucket del hash de la clave, la cantidad de filas y la suma de los hashes de las
+        filas. Solo de los buckets que no coinciden se traen las claves con el hash de la fila.
+            :param schema_src: Schema de la tabla origen
+            :param table_src: Nombre de la tabla origen
+            :param schema_dst: Schema de la tabla destino
+            :param table_dst: Nombre de la tabla destino
+            :param pk: Clave única de ambas tablas, simple o compuesta ('a, b' o ['a', 'b'])
+            :param buckets: Cantidad de buckets en que se reparten las claves
+            :param fetch_rows: Traer también las filas completas del origen de las claves insertadas y modificadas
+            :param bucket_limit: Máximo de buckets por query de la segunda fase
+            :return: HashDiff con las claves insertadas, borradas y modificadas
+        """
+        keys = _key_columns(pk)
+        columns = self.table_columns(schema_src, table_src)
+        dst_columns = self.table_columns(schema_dst, table_dst)
+        if sorted(col.lower() for col in columns) != sorted(col.lower() for col in dst_columns):
+            raise ValueError(f'Las tablas {table_src} y {table_dst} no tienen las mismas columnas')
+
+        src_sql = self._hash_diff_table(schema_src, table_src)
+        dst_sql = self._hash_diff_table(schema_dst, table_dst)
+        bucket_sql = self._bucket_sql(keys, buckets)
+        row_hash_sql = self._row_hash_sql(columns)
+
+        summary = self._bucket_summary(src_sql, bucket_sql, row_hash_sql).merge(
+            self._bucket_summary(dst_sql, bucket_sql, row_hash_sql), on='libgal_bucket', how='outer',
+            suffixes=('_src', '_dst'))
+        mismatched = summary[(summary['libgal_rows_src'] != summary['libgal_rows_dst']) |
+                             (summary['libgal_hash_src'] != summary['libgal_hash_dst'])]['libgal_bucket']
+
+        key_select = ', '.join(keys)
+        src_parts, dst_parts = [], []
+        for chunk in chunks(sorted(int(bucket) for bucket in mismatched), bucket_limit):
+            src_parts.append(self._bucket_rows(src_sql, 't.*' if fetch_rows else key_select, bucket_sql,
+                                               row_hash_sql, chunk))
+            dst_parts.append(self._bucket_rows(dst_sql, key_select, bucket_sql, row_hash_sql, chunk))
+
+        empty = DataFrame(columns=keys + ['libgal_hash'])
+        src_rows = pd.concat(src_parts, ignore_index=True) if src_parts else empty
+        dst_rows = pd.concat(dst_parts, ignore_index=True) if dst_parts else empty.copy()
+        src_rows.columns = [*src_rows.columns[:-1], 'libgal_hash']
+        dst_rows.columns = keys + ['libgal_hash']
+        # con fetch_rows los nombres de las columnas son los de la tabla, que pueden diferir en mayúsculas de pk
+        names = {col.lower(): col for col in src_rows.columns}
+        src_keys = src_rows[[names[key.lower()] for key in keys] + ['libgal_hash']]
+        src_keys.columns = keys + ['libgal_hash']
+
+        src_vs_dst = src_keys.merge(dst_rows, on=keys, how='left', suffixes=('_src', '_dst'))
+        new = src_vs_dst['libgal_hash_dst'].isna()
+        modified = ~new & (src_vs_dst['libgal_hash_src'] != src_vs_dst['libgal_hash_dst'])
+        dst_vs_src = dst_rows.merge(src_keys[keys], on=keys, how='left', indicator=True)
+
+        inserted = src_vs_dst.loc[new, keys].reset_index(drop=True)
+        changed = src_vs_dst.loc[modified, keys].reset_index(drop=True)
+        deleted = dst_vs_src.loc[dst_vs_src['_merge'] == 'left_only', keys].reset_index(drop=True)
+        rows = None
+        if fetch_rows:
+            rows = src_rows[(new | modified).to_numpy()].drop(columns='libgal_hash').reset_index(drop=True)
+        return HashDiff(inserted, deleted, changed, rows)
+
     @abstractmethod
     def staging_insert(self, df: DataFrame, schema_src: Optional[str], table_src: str,
                        schema_dst: Optional[str], table_dst: str, pk: str):
@@ -27,15 +27,15 @@ def delete_older_files(path: str, max_days: int = 30, dry_run: bool = False, oda
         fileage = t - stat(filepath).st_mtime
         if fileage > age_max and isfile(filepath):
             age_days = round(fileage / 86400)
-            logger.info('Eliminando %s, (%d días de antigüedad)' % (filepath, age_days))
+            logger.info('Eliminando %s, (%d días de antigüedad)', filepath, age_days)
             if not dry_run:
                 try:
                     remove(filepath)
                 except Exception as e:
-                    logger.error('Error %s' % e)
+                    logger.error('Error %s', e)
                     pass
             else:
-                logger.info('Omitiendo acción (dry run) en %s' % filepath)
+                logger.info('Omitiendo acción (dry run) en %s', filepath)
 
 
 def create_dirs(dir_list):
@@ -44,7 +44,7 @@ def create_dirs(dir_list):
         :param dir_list: Lista de directorios a crear
     """
     for dir_ in dir_list:
-        logger.info('Creando directorio %s' % dir_)
+        logger.info('Creando directorio %s', dir_)
         Path(dir_).mkdir(parents=True, exist_ok=True)
 
 
@@ -58,10 +58,10 @@ def change_to_public_permissions(path):
         if isfile(filepath):
             try:
                 mode = 0o664
-                logger.info('Cambiando permisos de %s a %s' % (filepath, oct(mode)))
+                logger.info('Cambiando permisos de %s a %s', filepath, oct(mode))
                 Path(filepath).chmod(mode)
             except Exception as e:
-                logger.error('Error %s' % e)
+                logger.error('Error %s', e)
                 pass
 
 
@@ -74,7 +74,7 @@ def create_output_dirs(home):
     all_dirs = OUTPUT_DIRS + DB_DIR
     create_dirs(all_dirs)
     for dir_ in all_dirs:
-        logger.info('Cambiando permisos de %s' % dir_)
+        logger.info('Cambiando permisos de %s', dir_)
         change_to_public_permissions(dir_)
 
 
@@ -87,15 +87,15 @@ def delete_files(path, dry_run=False):
     for f in listdir(path):
         filepath = join(path, f)
         if isfile(filepath):
-            logger.info('Eliminando %s' % filepath)
+            logger.info('Eliminando %s', filepath)
             if not dry_run:
                 try:
                     remove(filepath)
                 except Exception as e:
-                    logger.error('Error %s' % e)
+                    logger.error('Error %s', e)
                     pass
             else:
-                logger.info('Omitiendo acción (dry run) en %s' % filepath)
+                logger.info('Omitiendo acción (dry run) en %s', filepath)
 
 
 def init_env(home):
@@ -4,10 +4,30 @@
 import logging
 import os
 import datetime
+import glob
+import gzip
+import json
+import queue
+import threading
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 import unidecode
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 DEFAULT_FILE_BUFFER_SIZE = 1024 * 1024  # 1 MB
+DEFAULT_FLUSH_INTERVAL = 1.0  # segundos
 
 
 class SingletonType(type):
@@ -20,32 +40,252 @@ class SingletonType(type):
         return cls._instances[cls]
 
 
+# Atributos propios de LogRecord, lo que no esté acá se considera un campo estructurado (extra=...)
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'taskName'}
+
+
+def _json_dumps(obj: dict) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj, default=str).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, default=str)
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Formatea cada registro como una línea JSON válida. Los campos pasados con extra= (por ejemplo
+    duration, rows o table) se agregan al objeto. Usa orjson si está instalado.
+    """
+
+    def __init__(self, instance_hash=None, datefmt='%m/%d/%Y %I:%M:%S %p'):
+        super().__init__(datefmt=datefmt)
+        self.instance_hash = instance_hash
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record, self.datefmt),
+            'pid': record.process,
+            'instance_hash': self.instance_hash,
+            'thread': record.threadName,
+            'name': record.name,
+            'level': record.levelname,
+            'file': record.filename,
+            'lineno': record.lineno,
+            'message': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry['stack'] = self.formatStack(record.stack_info)
+        return _json_dumps(entry)
+
+
+def _compress_file(path: str, compression: str) -> str:
+    """
+    Comprime un archivo de log rotado y elimina el original
+        :param path: Ruta del archivo a comprimir
+        :param compression: 'gzip' o 'zstd'
+        :return: Ruta del archivo comprimido
+    """
+    if compression == 'gzip':
+        target = path + '.gz'
+        with open(path, 'rb') as src, gzip.open(target, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+    else:
+        target = path + '.zst'
+        with open(path, 'rb') as src, open(target, 'wb') as dst:
+            zstandard.ZstdCompressor().copy_stream(src, dst)
+    os.remove(path)
+    return target
+
+
+def _enforce_size_budget(filename: str, max_total_bytes: int):
+    """
+    Elimina los segmentos rotados más antiguos de un log hasta que el total (incluido el archivo activo)
+    entre en el presupuesto de bytes
+        :param filename: Ruta del archivo de log activo
+        :param max_total_bytes: Presupuesto total en bytes
+    """
+    segments = []
+    for path in glob.glob(glob.escape(filename) + '.*'):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        segments.append((st.st_mtime, st.st_size, path))
+
+    total = sum(size for _, size, _ in segments)
+    if os.path.exists(filename):
+        total += os.path.getsize(filename)
+
+    for _, size, path in sorted(segments):
+        if total <= max_total_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Limita la cantidad de registros por punto de llamada (logger + archivo + línea).
+    Permite como máximo `rate` registros por segundo (con ráfagas de hasta `burst`) y, opcionalmente,
+    deja pasar solo uno de cada `sample_every` registros. Los registros de nivel mayor a max_level no se limitan.
+    Al primer registro que pasa luego de haber descartado otros se le agrega el campo `suppressed`.
+    """
+
+    def __init__(self, rate: Optional[float] = None, burst: Optional[int] = None, sample_every: int = 1,
+                 max_level: int = logging.INFO):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst if burst is not None else max(int(rate or 1), 1)
+        self.sample_every = max(sample_every, 1)
+        self.max_level = max_level
+        # punto de llamada -> [tokens disponibles, último instante, contador para muestreo, descartados]
+        self._sites = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno > self.max_level:
+            return True
+
+        key = (record.name, record.pathname, record.lineno)
+        with self._lock:
+            now = time.monotonic()
+            site = self._sites.get(key)
+            if site is None:
+                site = self._sites[key] = [float(self.burst), now, 0, 0]
+
+            site[2] += 1
+            allowed = (site[2] - 1) % self.sample_every == 0
+
+            if allowed and self.rate is not None:
+                site[0] = min(self.burst, site[0] + (now - site[1]) * self.rate)
+                site[1] = now
+                if site[0] >= 1:
+                    site[0] -= 1
+                else:
+                    allowed = False
+
+            if not allowed:
+                site[3] += 1
+                return False
+
+            if site[3]:
+                record.suppressed = site[3]
+                site[3] = 0
+        return True
+
+
 class BufferingHandler(logging.Handler):
-    def __init__(self, filename, encoding='utf-8', buffer_size=DEFAULT_FILE_BUFFER_SIZE):
+    def __init__(self, filename, encoding='utf-8', buffer_size=DEFAULT_FILE_BUFFER_SIZE,
+                 max_bytes: Optional[int] = None, rotate_interval: Optional[float] = None,
+                 compression: Optional[str] = None, max_total_bytes: Optional[int] = None):
+        """
+        Handler de archivo con buffer y rotación opcional
+            :param filename: Ruta del archivo de log
+            :param encoding: Codificación del archivo
+            :param buffer_size: Tamaño del buffer en caracteres antes de escribir a disco
+            :param max_bytes: Rota el archivo al superar este tamaño en bytes
+            :param rotate_interval: Rota el archivo cada esta cantidad de segundos
+            :param compression: Comprime los segmentos rotados en segundo plano ('gzip' o 'zstd')
+            :param max_total_bytes: Presupuesto total en bytes para el archivo activo y sus segmentos rotados
+        """
         super().__init__()
+        if compression not in (None, 'gzip', 'zstd'):
+            raise ValueError(f'Compresión de logs no soportada: {compression}')
+        if compression == 'zstd' and zstandard is None:
+            raise ValueError('La compresión zstd requiere el paquete zstandard')
+
         self.buffer_size = buffer_size
         self.filename = filename
         self.encoding = encoding
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.compression = compression
+        self.max_total_bytes = max_total_bytes
         self.fp = open(self.filename, mode='at', encoding=self.encoding)
         self.buffer = []
+        # largo acumulado del buffer, evita recalcularlo en cada registro
+        self._buffer_len = 0
+        self._file_size = os.path.getsize(self.filename)
+        self._next_rollover = time.time() + rotate_interval if rotate_interval else None
+        self._rotations = None
 
     def emit(self, record):
         msg = self.format(record)
+        self._append(msg)
+
+    def _append(self, msg: str):
+        if self._next_rollover is not None and time.time() >= self._next_rollover:
+            # la rotación por tiempo no espera a que se llene el buffer: el registro nuevo va al archivo nuevo
+            self._write_buffer()
         self.buffer.append(msg)
+        self._buffer_len += len(msg) + 1
 
-        if len(''.join(self.buffer)) >= self.buffer_size:
-            self.flush()
+        if self._buffer_len >= self.buffer_size:
+            self._write_buffer()
 
-    def flush(self):
+    def _write_buffer(self):
         if self.buffer:
-            log_entry = '\n'.join(self.buffer)
+            log_entry = '\n'.join(self.buffer) + '\n'
             self.fp.write(log_entry)
             self.buffer = []
+            self._buffer_len = 0
+            if self.max_bytes is not None:
+                self._file_size += len(log_entry.encode(self.encoding))
+        if self._should_rotate():
+            self.rotate()
+
+    def _should_rotate(self) -> bool:
+        if self.max_bytes is not None and self._file_size >= self.max_bytes:
+            return True
+        return self._next_rollover is not None and time.time() >= self._next_rollover
+
+    def rotate(self):
+        """
+        Cierra el archivo actual, lo renombra con un sufijo de fecha y hora y abre uno nuevo.
+        La compresión y la política de retención se ejecutan en un hilo en segundo plano.
+        """
+        self.fp.close()
+        suffix = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+        rotated, counter = f'{self.filename}.{suffix}', 1
+        while glob.glob(glob.escape(rotated) + '*'):
+            rotated, counter = f'{self.filename}.{suffix}-{counter}', counter + 1
+        os.replace(self.filename, rotated)
+
+        self.fp = open(self.filename, mode='at', encoding=self.encoding)
+        self._file_size = 0
+        if self.rotate_interval:
+            self._next_rollover = time.time() + self.rotate_interval
+
+        if self.compression is not None or self.max_total_bytes is not None:
+            if self._rotations is None:
+                self._rotations = ThreadPoolExecutor(max_workers=1, thread_name_prefix='libgal-log-rotation')
+            self._rotations.submit(self._after_rotation, rotated)
+
+    def _after_rotation(self, rotated: str):
+        try:
+            if self.compression is not None:
+                _compress_file(rotated, self.compression)
+            if self.max_total_bytes is not None:
+                _enforce_size_budget(self.filename, self.max_total_bytes)
+        except Exception as e:
+            # no se loguea para no reentrar en este mismo handler
+            sys.stderr.write(f'Error al procesar el log rotado {rotated}: {e}\n')
+
+    def flush(self):
+        self._write_buffer()
 
     def close(self):
         self.flush()
-        self.fp.write('\n')
         self.fp.close()
+        if self._rotations is not None:
+            self._rotations.shutdown(wait=True)
         super().close()
 
     @property
@@ -53,6 +293,73 @@ class BufferingHandler(logging.Handler):
         return self.filename
 
 
+class AsyncBufferingHandler(BufferingHandler):
+    """
+    Handler de archivo no bloqueante: emit() solo encola el registro y un hilo escritor en segundo plano
+    se encarga de formatearlo y de escribir en bloque cuando se llena el buffer o vence flush_interval.
+    Como el formateo es diferido, los argumentos del mensaje no deberían mutarse luego de loguearlos.
+    """
+
+    _STOP = object()
+
+    def __init__(self, filename, encoding='utf-8', buffer_size=DEFAULT_FILE_BUFFER_SIZE,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL, **rotation):
+        super().__init__(filename, encoding=encoding, buffer_size=buffer_size, **rotation)
+        self.flush_interval = flush_interval
+        self.queue = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._run, name='libgal-log-writer', daemon=True)
+        self._writer.start()
+
+    def emit(self, record):
+        self.queue.put_nowait(record)
+
+    def _run(self):
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self.queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                item = None
+
+            if item is self._STOP:
+                break
+            elif isinstance(item, threading.Event):
+                self._write_to_disk()
+                item.set()
+            elif item is not None:
+                try:
+                    self._append(self.format(item))
+                except Exception:
+                    self.handleError(item)
+
+            if time.monotonic() >= deadline:
+                self._write_to_disk()
+                deadline = time.monotonic() + self.flush_interval
+
+        self._write_to_disk()
+
+    def _write_to_disk(self):
+        self._write_buffer()
+        self.fp.flush()
+
+    def flush(self):
+        """
+        Espera a que el hilo escritor procese lo encolado hasta el momento y lo baje a disco
+        """
+        if self._writer.is_alive():
+            done = threading.Event()
+            self.queue.put_nowait(done)
+            done.wait(timeout=max(self.flush_interval, 1) * 10)
+        elif not self.fp.closed:
+            self._write_buffer()
+
+    def close(self):
+        if self._writer.is_alive():
+            self.queue.put_nowait(self._STOP)
+            self._writer.join()
+        super().close()
+
+
 class Logger(object, metaclass=SingletonType):
 
     _logger = None
@@ -75,7 +382,7 @@ class Logger(object, metaclass=SingletonType):
         if dirname is not None:
             self.set_outputdir(dirname, format_output)
 
-        self._logger.info(f"Generate new instance, hash = {self._id}")
+        self._logger.info("Generate new instance, hash = %s", self._id)
 
     def __del__(self):
         logging.shutdown()
@@ -89,13 +396,7 @@ class Logger(object, metaclass=SingletonType):
     def set_format(self, format_output: Optional[str]):
         formatter = None
         if format_output is not None and format_output.lower() == 'json':
-            formatter = logging.Formatter(
-                "{'time':'%(asctime)s', 'pid': '%(process)d', 'instance_hash': " 
-                f"'{self._id}', "
-                "'thread', '%(threadName)s', 'name': '%(name)s', 'level': '%(levelname)s', 'file': '%(filename)s', "
-                "'lineno': %(lineno)s, 'message': '%(message)s'}",
-                datefmt='%m/%d/%Y %I:%M:%S %p'
-            )
+            formatter = JSONFormatter(instance_hash=self._id, datefmt='%m/%d/%Y %I:%M:%S %p')
         elif format_output is not None and format_output.lower() == 'csv':
             formatter = logging.Formatter(
                 '%(asctime)s, %(process)d, '
@@ -122,19 +423,69 @@ class Logger(object, metaclass=SingletonType):
 
         return formatter
 
-    def set_outputdir(self, dirname: Optional[str], log_format: Optional[str] = None):
+    def set_rate_limit(self, rate: Optional[float] = None, burst: Optional[int] = None, sample_every: int = 1,
+                       max_level: int = logging.INFO):
+        """
+        Limita los registros por punto de llamada para no saturar el log en bucles con millones de iteraciones
+            :param rate: Máximo de registros por segundo por punto de llamada (None para no limitar)
+            :param burst: Cantidad de registros que se permiten en ráfaga, por defecto igual a rate
+            :param sample_every: Deja pasar solo uno de cada sample_every registros
+            :param max_level: Nivel máximo al que se aplica el límite (por defecto INFO, los warnings y errores pasan)
+            :return: El filtro agregado al logger
+        """
+        self.remove_rate_limit()
+        if rate is None and sample_every <= 1:
+            return None
+        rate_filter = RateLimitFilter(rate=rate, burst=burst, sample_every=sample_every, max_level=max_level)
+        self._logger.addFilter(rate_filter)
+        return rate_filter
+
+    def remove_rate_limit(self):
+        """
+        Elimina los límites de registros configurados con set_rate_limit
+        """
+        for log_filter in list(self._logger.filters):
+            if isinstance(log_filter, RateLimitFilter):
+                self._logger.removeFilter(log_filter)
+
+    def set_outputdir(self, dirname: Optional[str], log_format: Optional[str] = None, async_mode: bool = False,
+                      flush_interval: float = DEFAULT_FLUSH_INTERVAL, max_bytes: Optional[int] = None,
+                      rotate_interval: Optional[float] = None, compression: Optional[str] = None,
+                      max_total_bytes: Optional[int] = None):
+        """
+        Agrega un handler de archivo en el directorio indicado
+            :param dirname: Directorio de salida de los logs
+            :param log_format: Formato del log (json, csv o None para texto plano)
+            :param async_mode: Si es True, la escritura se hace en un hilo en segundo plano (AsyncBufferingHandler)
+            :param flush_interval: Segundos máximos entre escrituras a disco en modo asíncrono
+            :param max_bytes: Rota el archivo al superar este tamaño en bytes
+            :param rotate_interval: Rota el archivo cada esta cantidad de segundos
+            :param compression: Compresión de los archivos rotados ('gzip' o 'zstd')
+            :param max_total_bytes: Presupuesto total en bytes de los logs de esta ejecución
+        """
         if dirname is not None:
             if not os.path.isdir(dirname):
                 os.mkdir(dirname)
             formatter = self.set_format(log_format)
             now = datetime.datetime.now()
-            for handler in self._logger.handlers:
+            for handler in list(self._logger.handlers):
                 if isinstance(handler, BufferingHandler):
                     handler.close()
                     self._logger.removeHandler(handler)
 
-            file_handler = BufferingHandler(
-                dirname + f"/{unidecode.unidecode(self._app_name).replace(' ','_').lower()}_{os.getpid()}_" + now.strftime("%Y-%m-%d") + ".log", encoding='utf-8')
+            filename = dirname + f"/{unidecode.unidecode(self._app_name).replace(' ','_').lower()}_{os.getpid()}_" + \
+                now.strftime("%Y-%m-%d") + ".log"
+            rotation = {
+                'max_bytes': max_bytes,
+                'rotate_interval': rotate_interval,
+                'compression': compression,
+                'max_total_bytes': max_total_bytes
+            }
+            if async_mode:
+                file_handler = AsyncBufferingHandler(filename, encoding='utf-8', flush_interval=flush_interval,
+                                                     **rotation)
+            else:
+                file_handler = BufferingHandler(filename, encoding='utf-8', **rotation)
             file_handler.setFormatter(formatter)
             self._logger.addHandler(file_handler)
         else:
@@ -0,0 +1,79 @@
+import threading
+from collections import OrderedDict
+from time import monotonic
+from typing import Optional, List, Tuple
+
+DEFAULT_METADATA_TTL = 300.0  # segundos que se considera vigente la definición de una tabla
+DEFAULT_METADATA_ENTRIES = 512  # tablas que se mantienen en la caché
+
+
+class MetadataCache:
+    """
+    Caché LRU con vencimiento (TTL) de la definición de las tablas: lista de (columna, tipo) por tabla.
+    Las claves no distinguen mayúsculas y minúsculas, igual que los nombres de Teradata y SQLite.
+    """
+
+    def __init__(self, ttl: Optional[float] = DEFAULT_METADATA_TTL, max_entries: int = DEFAULT_METADATA_ENTRIES):
+        """
+            :param ttl: Segundos de vigencia de cada entrada (None para que no venzan)
+            :param max_entries: Cantidad máxima de tablas, al superarla se descarta la usada hace más tiempo
+        """
+        self.ttl = ttl
+        self.max_entries = max(max_entries, 1)
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(schema: Optional[str], table: str) -> Tuple[str, str]:
+        return (schema or '').lower(), table.lower()
+
+    def get(self, schema: Optional[str], table: str) -> Optional[List[Tuple[str, Optional[str]]]]:
+        """
+        Devuelve las columnas de la tabla o None si no está en la caché o venció
+        """
+        key = self._key(schema, table)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > monotonic()):
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return list(entry[1])
+            if entry is not None:
+                del self._entries[key]
+                self.stats['evictions'] += 1
+            self.stats['misses'] += 1
+            return None
+
+    def put(self, schema: Optional[str], table: str, columns: List[Tuple[str, Optional[str]]]):
+        key = self._key(schema, table)
+        expires = monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires, list(columns))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def invalidate(self, schema: Optional[str] = None, table: Optional[str] = None):
+        """
+        Descarta entradas de la caché
+            :param schema: Schema a invalidar (None para todos)
+            :param table: Tabla a invalidar (None para todas las del schema)
+        """
+        with self._lock:
+            if schema is None and table is None:
+                keys = list(self._entries)
+            elif table is None:
+                keys = [k for k in self._entries if k[0] == schema.lower()]
+            else:
+                keys = [self._key(schema, table)]
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self.stats['invalidations'] += 1
+
+    def clear(self):
+        self.invalidate()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,274 @@
+import bisect
+import functools
+import os
+import threading
+import types
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Optional, List, Dict
+
+# Límites superiores (en segundos) de los buckets del histograma de latencias
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0,
+                   600.0, 1800.0, 3600.0)
+
+
+class Histogram:
+    """
+    Histograma acumulativo de latencias de una operación, con contadores de filas, bytes y errores
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+        self.rows = 0
+        self.bytes = 0
+        self.errors = 0
+
+    def observe(self, seconds: float, rows: int = 0, nbytes: int = 0, error: bool = False):
+        self.bucket_counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+        self.rows += rows
+        self.bytes += nbytes
+        if error:
+            self.errors += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estima un cuantil a partir de los buckets (devuelve el límite superior del bucket que lo contiene)
+            :param q: Cuantil entre 0 y 1
+        """
+        if self.count == 0:
+            return None
+        target = q * self.count
+        accumulated = 0
+        for i, bucket_count in enumerate(self.bucket_counts):
+            accumulated += bucket_count
+            if accumulated >= target:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'total_s': self.sum,
+            'mean_s': self.sum / self.count if self.count else None,
+            'min_s': self.min,
+            'max_s': self.max,
+            'p50_s': self.quantile(0.5),
+            'p95_s': self.quantile(0.95),
+            'p99_s': self.quantile(0.99),
+            'rows': self.rows,
+            'bytes': self.bytes,
+        }
+
+
+class MetricsRegistry:
+    """
+    Registro en memoria de las métricas de las operaciones de libgal
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, operation: str, seconds: float, rows: int = 0, nbytes: int = 0, error: bool = False):
+        with self._lock:
+            histogram = self._histograms.get(operation)
+            if histogram is None:
+                histogram = self._histograms[operation] = Histogram()
+            histogram.observe(seconds, rows, nbytes, error)
+
+    def histogram(self, operation: str) -> Optional[Histogram]:
+        return self._histograms.get(operation)
+
+    def operations(self) -> List[str]:
+        return sorted(self._histograms)
+
+    def summary(self) -> Dict[str, dict]:
+        with self._lock:
+            return {op: self._histograms[op].summary() for op in sorted(self._histograms)}
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+
+    def to_prometheus(self) -> str:
+        """
+        Devuelve las métricas en el formato de texto de Prometheus
+        """
+        lines = [
+            '# HELP libgal_operation_seconds Latencia de las operaciones de libgal',
+            '# TYPE libgal_operation_seconds histogram',
+        ]
+        counters = {'rows': [], 'bytes': [], 'errors': []}
+        with self._lock:
+            for op in sorted(self._histograms):
+                h = self._histograms[op]
+                label = f'operation="{op}"'
+                accumulated = 0
+                for bound, bucket_count in zip(h.buckets, h.bucket_counts):
+                    accumulated += bucket_count
+                    lines.append(f'libgal_operation_seconds_bucket{{{label},le="{bound}"}} {accumulated}')
+                lines.append(f'libgal_operation_seconds_bucket{{{label},le="+Inf"}} {h.count}')
+                lines.append(f'libgal_operation_seconds_sum{{{label}}} {h.sum}')
+                lines.append(f'libgal_operation_seconds_count{{{label}}} {h.count}')
+                counters['rows'].append(f'libgal_operation_rows_total{{{label}}} {h.rows}')
+                counters['bytes'].append(f'libgal_operation_bytes_total{{{label}}} {h.bytes}')
+                counters['errors'].append(f'libgal_operation_errors_total{{{label}}} {h.errors}')
+
+        for name, values in counters.items():
+            lines.append(f'# TYPE libgal_operation_{name}_total counter')
+            lines.extend(values)
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str):
+        """
+        Escribe las métricas en un archivo .prom para el textfile collector de node_exporter.
+        La escritura es atómica (archivo temporal + rename) para que nunca se lea un archivo a medias.
+            :param path: Ruta del archivo .prom
+        """
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, mode='w', encoding='utf-8') as fp:
+            fp.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+    def log(self, logger=None):
+        """
+        Registra un resumen de cada operación en el logger (los valores van como campos extra)
+            :param logger: Logger a utilizar, por defecto el de libgal
+        """
+        if logger is None:
+            from libgal.modules.Logger import Logger
+            logger = Logger().get_logger()
+        for op, summary in self.summary().items():
+            logger.info('Métricas de %s: %d llamadas, %.3f s en total', op, summary['count'], summary['total_s'],
+                        extra={'operation': op, **summary})
+
+
+registry = MetricsRegistry(enabled=os.environ.get('LIBGAL_METRICS', '').lower() in ('1', 'true', 's', 'si'))
+
+
+def enable_metrics():
+    registry.enabled = True
+
+
+def disable_metrics():
+    registry.enabled = False
+
+
+def get_metrics() -> Dict[str, dict]:
+    """
+    Devuelve un diccionario operación -> resumen (cantidad, latencias, filas, bytes, errores)
+    """
+    return registry.summary()
+
+
+def reset_metrics():
+    registry.reset()
+
+
+def _payload_size(obj):
+    """
+    Devuelve (filas, bytes) si el objeto es un DataFrame, de lo contrario (0, 0)
+    """
+    memory_usage = getattr(obj, 'memory_usage', None)
+    if memory_usage is None or not hasattr(obj, 'columns'):
+        return 0, 0
+    return len(obj), int(memory_usage(index=False, deep=False).sum())
+
+
+class _Measurement:
+
+    def __init__(self):
+        self.rows = 0
+        self.bytes = 0
+
+    def add(self, rows: int = 0, nbytes: int = 0):
+        self.rows += rows
+        self.bytes += nbytes
+
+
+@contextmanager
+def measure(operation: str):
+    """
+    Context manager que mide la duración de un bloque. Permite informar filas y bytes con add().
+
+        with measure('mi_proceso') as m:
+            df = td.query(sql)
+            m.add(rows=len(df))
+    """
+    if not registry.enabled:
+        yield _Measurement()
+        return
+
+    measurement = _Measurement()
+    t_start = perf_counter()
+    error = False
+    try:
+        yield measurement
+    except BaseException:
+        error = True
+        raise
+    finally:
+        registry.record(operation, perf_counter() - t_start, measurement.rows, measurement.bytes, error)
+
+
+def timed(operation: Optional[str] = None):
+    """
+    Decorador que registra la latencia de la función. Si alguno de los argumentos o el resultado
+    es un DataFrame se registran también sus filas y bytes.
+        :param operation: Nombre de la operación, por defecto el __qualname__ de la función
+    """
+    def decorator(func):
+        name = operation or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled:
+                return func(*args, **kwargs)
+
+            t_start = perf_counter()
+            error = False
+            result = None
+            try:
+                result = func(*args, **kwargs)
+                return result
+            except BaseException:
+                error = True
+                raise
+            finally:
+                elapsed = perf_counter() - t_start
+                rows, nbytes = _payload_size(result)
+                if rows == 0:
+                    for arg in list(args) + list(kwargs.values()):
+                        rows, nbytes = _payload_size(arg)
+                        if rows:
+                            break
+                registry.record(name, elapsed, rows, nbytes, error)
+
+        wrapper.__libgal_timed__ = True
+        return wrapper
+
+    return decorator
+
+
+def instrument_class(cls, methods):
+    """
+    Aplica @timed a los métodos indicados que estén definidos en la propia clase
+        :param cls: Clase a instrumentar
+        :param methods: Nombres de los métodos
+    """
+    for name in methods:
+        method = cls.__dict__.get(name)
+        if isinstance(method, types.FunctionType) and not getattr(method, '__libgal_timed__', False):
+            setattr(cls, name, timed(f'{cls.__name__}.{name}')(method))
+    return cls
@@ -1,16 +1,81 @@
+import functools
 import re
 import pandas as pd
 import datetime
 import math
+import numpy as np
 
+DEFAULT_ARROW_BATCH_ROWS = 65536  # filas por fetchmany en la lectura columnar
+
+
+def load_table(conn, table, use_quotes=True, dtype_backend='numpy'):
+    """
+    Lee una tabla completa
+        :param conn: Engine de SQLAlchemy o conexión DB-API
+        :param table: Nombre de la tabla
+        :param use_quotes: Encerrar el nombre de la tabla entre comillas
+        :param dtype_backend: 'numpy' (pd.read_sql) o 'pyarrow' (lectura columnar con tipos de Arrow, ver read_sql_arrow)
+    """
+    query = f'SELECT * FROM "{table}"' if use_quotes else f'SELECT * FROM {table}'
+    if dtype_backend == 'pyarrow':
+        return read_sql_arrow(conn, query)
+    return pd.read_sql(sql=query, con=conn, index_col=None, coerce_float=True,
+                       parse_dates=None, columns=None, chunksize=None)
+
+
+def fetch_arrow(cursor, query, batch_rows=DEFAULT_ARROW_BATCH_ROWS):
+    """
+    Ejecuta la query y arma una tabla de Arrow transponiendo cada lote de fetchmany directamente en columnas,
+    sin pasar por los registros de pandas
+        :param cursor: Cursor DB-API
+        :param query: Query a ejecutar
+        :param batch_rows: Filas por fetchmany
+        :return: pyarrow.Table
+    """
+    import pyarrow as pa
+
+    cursor.execute(query)
+    names = [col[0] for col in cursor.description]
+    tables = []
+    while True:
+        rows = cursor.fetchmany(batch_rows)
+        if not rows:
+            break
+        columns = zip(*rows)
+        tables.append(pa.table([pa.array(col, from_pandas=True) for col in columns], names=names))
+    if not tables:
+        return pa.table([pa.array([], type=pa.null()) for _ in names], names=names)
+    # los tipos inferidos pueden variar entre lotes (ej: nulos o decimales de distinta precisión)
+    return pa.concat_tables(tables, promote_options='permissive')
 
-def load_table(conn, table, use_quotes=True):
-    if use_quotes:
-        return pd.read_sql(sql=f'SELECT * FROM "{table}"', con=conn, index_col=None, coerce_float=True,
-                           parse_dates=None, columns=None, chunksize=None)
-    else:
-        return pd.read_sql(sql=f'SELECT * FROM {table}', con=conn, index_col=None, coerce_float=True,
-                           parse_dates=None, columns=None, chunksize=None)
+
+def read_sql_arrow(conn, query, batch_rows=DEFAULT_ARROW_BATCH_ROWS):
+    """
+    Ejecuta una query con la lectura columnar de fetch_arrow y devuelve un DataFrame con tipos de Arrow
+    (pd.ArrowDtype). Si alguna columna tiene valores de tipos que Arrow no puede combinar (ej: columnas
+    sin tipo de SQLite) se usa pd.read_sql con dtype_backend='pyarrow'.
+        :param conn: Engine de SQLAlchemy o conexión DB-API
+        :param query: Query a ejecutar
+        :param batch_rows: Filas por fetchmany
+    """
+    import pyarrow as pa
+
+    raw = conn.raw_connection() if hasattr(conn, 'raw_connection') else conn
+    try:
+        cursor = raw.cursor()
+        try:
+            table = fetch_arrow(cursor, query, batch_rows)
+        finally:
+            cursor.close()
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        table = None
+    finally:
+        if raw is not conn:
+            raw.close()
+
+    if table is None:
+        return pd.read_sql(sql=query, con=conn, coerce_float=True, dtype_backend='pyarrow')
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
 
 
 def load_sql(path):
@@ -49,3 +114,85 @@ def inserts_from_dataframe(source, target):
         sql_texts.append(insert.replace("'NULL_NONE'", 'NULL'))
     return sql_texts
 
+
+
+def _normalize_object_value(value, int_like=False):
+    if isinstance(value, datetime.date):
+        return value.strftime('%Y-%m-%d')
+    elif isinstance(value, datetime.time):
+        return value.strftime('%H:%M:%S')
+    elif value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    elif isinstance(value, str):
+        return value.replace("'", '').strip()
+    elif int_like and isinstance(value, float) and value == int(value):
+        return int(value)
+    return value
+
+
+def _normalize_column(name, col):
+    """
+    Normaliza una columna para usarla como parámetro de un INSERT (mismas reglas que inserts_from_dataframe)
+        :param name: Nombre de la columna
+        :param col: Serie de pandas
+        :return: array de objetos Python con la columna normalizada
+    """
+    if pd.api.types.is_datetime64_any_dtype(col):
+        values = col.dt.strftime('%Y-%m-%d').astype(object)
+        return values.where(col.notna(), None).to_numpy()
+    elif pd.api.types.is_bool_dtype(col) or pd.api.types.is_integer_dtype(col):
+        values = col.astype(object)
+        return values.where(col.notna(), None).to_numpy()
+    elif pd.api.types.is_float_dtype(col):
+        values = col.astype(object)
+        if 'Id' in name or 'Num' in name:
+            # los Id/Num enteros que pandas convirtió a float vuelven a ser int
+            is_int = np.isfinite(col) & (col == np.floor(col))
+            if is_int.any():
+                values = values.where(~is_int, col[is_int].astype('int64').astype(object))
+        return values.where(col.notna(), None).to_numpy()
+    else:
+        values = col.map(functools.partial(_normalize_object_value, int_like='Id' in name or 'Num' in name))
+        values = values.astype(object)
+        return values.where(values.notna(), None).to_numpy()
+
+
+def insert_params_from_dataframe(df):
+    """
+    Convierte un DataFrame en una lista de tuplas de parámetros para un INSERT con executemany.
+    Fechas y horas se formatean como texto, los NaN pasan a None, se quitan comillas y espacios de los strings
+    y las columnas Id/Num con valores enteros se envían como int. La normalización se hace por columna.
+        :param df: DataFrame de origen
+        :return: lista de tuplas, una por fila
+    """
+    if df.empty:
+        return []
+    columns = [_normalize_column(str(name), df.iloc[:, i]) for i, name in enumerate(df.columns)]
+    return list(zip(*columns))
+
+
+def _bind_column(col):
+    """
+    Convierte una columna en valores Python para usarlos como parámetros, sin alterar los datos
+        :param col: Serie de pandas
+        :return: array de objetos Python (NaN/NaT/NA como None)
+    """
+    if pd.api.types.is_datetime64_any_dtype(col):
+        values = pd.Series(pd.DatetimeIndex(col).to_pydatetime(), index=col.index, dtype=object)
+    else:
+        values = col.astype(object)
+    return values.where(col.notna(), None).to_numpy()
+
+
+def bind_params_from_dataframe(df):
+    """
+    Convierte un DataFrame en una lista de tuplas de parámetros para executemany sin modificar los valores
+    (a diferencia de insert_params_from_dataframe, que replica la normalización de Scripting): los strings
+    se envían tal cual, las fechas con hora como datetime y los NaN/NaT como None.
+        :param df: DataFrame de origen
+        :return: lista de tuplas, una por fila
+    """
+    if df.empty:
+        return []
+    columns = [_bind_column(df.iloc[:, i]) for i in range(len(df.columns))]
+    return list(zip(*columns))
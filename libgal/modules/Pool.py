@@ -0,0 +1,242 @@
+import re
+import threading
+from contextlib import contextmanager
+from time import monotonic
+from typing import Callable, Optional
+
+from libgal.modules.DatabaseAPI import DatabaseError
+from libgal.modules.Metrics import registry
+
+# como en Retry, el SQLSTATE solo se busca como primer argumento de pyodbc.Error o entre corchetes
+_DISCONNECT_SQLSTATE = re.compile(r"(?:\('|\[)(08[0-9A-Z]{3})(?:'|\])")
+_DISCONNECT_MESSAGES = ('socket', 'connection reset', 'connection refused', 'broken pipe', 'not connected',
+                        'connection is closed', 'connection closed')
+
+
+def is_disconnect(exc: BaseException) -> bool:
+    """
+    Indica si una excepción corresponde a una sesión caída (SQLSTATE de la clase 08 o error de socket)
+    """
+    message = str(exc).lower()
+    return bool(_DISCONNECT_SQLSTATE.search(str(exc))) or any(text in message for text in _DISCONNECT_MESSAGES)
+
+
+class PoolTimeout(DatabaseError):
+    """No se obtuvo una sesión del pool en el tiempo de espera"""
+    pass
+
+
+class SessionPool:
+    """
+    Pool de sesiones (conexiones DB-API) con tamaño mínimo y máximo, verificación de la sesión antes de
+    entregarla (pre-ping), reconexión y préstamo por hilo: dentro de un mismo hilo session() devuelve
+    siempre la misma sesión aunque se anide.
+    """
+
+    def __init__(self, factory: Callable, min_size: int = 1, max_size: int = 8, timeout: Optional[float] = 30.0,
+                 ping_query: Optional[str] = 'SELECT 1', ping_interval: float = 30.0, retry_policy=None,
+                 name: str = 'pool', logger=None):
+        """
+            :param factory: Función sin argumentos que abre una sesión nueva
+            :param min_size: Sesiones que se abren al crear el pool y se mantienen abiertas
+            :param max_size: Máximo de sesiones abiertas
+            :param timeout: Segundos de espera de una sesión libre (None para esperar indefinidamente)
+            :param ping_query: Query para verificar la sesión antes de entregarla (None para no verificar)
+            :param ping_interval: Solo se verifican las sesiones inactivas hace más de estos segundos
+            :param retry_policy: Política de reintentos para abrir sesiones
+            :param name: Nombre del pool (para logs y métricas)
+            :param logger: Logger donde informar reconexiones
+        """
+        self.factory = factory
+        self.min_size = max(min_size, 0)
+        self.max_size = max(max_size, 1, self.min_size)
+        self.timeout = timeout
+        self.ping_query = ping_query
+        self.ping_interval = ping_interval
+        self.retry_policy = retry_policy
+        self.name = name
+        self._logger = logger
+        self._idle = []  # (sesión, momento en que se devolvió)
+        self._size = 0
+        self._closed = False
+        self._local = threading.local()
+        self._cond = threading.Condition()
+        self._stats = {'checkouts': 0, 'waits': 0, 'wait_s': 0.0, 'max_wait_s': 0.0, 'timeouts': 0,
+                       'failures': 0, 'reconnects': 0, 'created': 0, 'closed': 0}
+        for _ in range(self.min_size):
+            self._idle.append((self._open(), monotonic()))
+            self._size += 1
+
+    def _count(self, key: str, value=1):
+        with self._cond:
+            self._stats[key] += value
+
+    def _open(self):
+        try:
+            if self.retry_policy is not None:
+                conn = self.retry_policy.run(self.factory, logger=self._logger)
+            else:
+                conn = self.factory()
+        except Exception:
+            self._count('failures')
+            raise
+        self._count('created')
+        return conn
+
+    def _close(self, conn):
+        self._count('closed')
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _ping(self, conn) -> bool:
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(self.ping_query)
+                cursor.fetchall()
+            finally:
+                cursor.close()
+            return True
+        except Exception as e:
+            self._count('failures')
+            if self._logger is not None:
+                self._logger.warning('Sesión caída en el pool %s, reconectando: %s', self.name, e)
+            return False
+
+    def acquire(self):
+        """
+        Toma una sesión del pool (hay que devolverla con release). Si no hay sesiones libres y el pool está
+        completo espera hasta timeout segundos.
+        """
+        t_start = monotonic()
+        conn, idle_since = None, None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise DatabaseError(f'El pool {self.name} está cerrado')
+                if self._idle:
+                    conn, idle_since = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                remaining = None if self.timeout is None else self.timeout - (monotonic() - t_start)
+                if remaining is not None and remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise PoolTimeout(f'No hay sesiones libres en el pool {self.name} '
+                                      f'({self.max_size} en uso) luego de {self.timeout} s')
+                self._cond.wait(remaining)
+
+            waited = monotonic() - t_start
+            self._stats['checkouts'] += 1
+            self._stats['wait_s'] += waited
+            self._stats['max_wait_s'] = max(self._stats['max_wait_s'], waited)
+            if waited > 0.001:
+                self._stats['waits'] += 1
+        if registry.enabled:
+            registry.record(f'SessionPool.{self.name}.wait', waited)
+
+        try:
+            if conn is None:
+                return self._open()
+            if self.ping_query is not None and monotonic() - idle_since >= self.ping_interval \
+                    and not self._ping(conn):
+                self._close(conn)
+                self._count('reconnects')
+                return self._open()
+            return conn
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, conn, discard: bool = False):
+        """
+        Devuelve una sesión al pool
+            :param conn: Sesión tomada con acquire
+            :param discard: Cerrar la sesión en lugar de reutilizarla (ej: si quedó en un estado inválido)
+        """
+        with self._cond:
+            if discard or self._closed:
+                self._size -= 1
+                self._close(conn)
+            else:
+                self._idle.append((conn, monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def session(self):
+        """
+        Context manager que presta una sesión al hilo actual. Si el hilo ya tiene una sesión del pool
+        se reutiliza. Si la sesión se cae durante el bloque se descarta en lugar de devolverla.
+
+            with pool.session() as con:
+                with con.cursor() as c:
+                    c.execute(sql)
+        """
+        current = getattr(self._local, 'conn', None)
+        if current is not None:
+            yield current
+            return
+
+        conn = self.acquire()
+        self._local.conn = conn
+        discard = False
+        try:
+            yield conn
+        except Exception as e:
+            discard = is_disconnect(e)
+            raise
+        finally:
+            self._local.conn = None
+            self.release(conn, discard)
+
+    @property
+    def stats(self) -> dict:
+        """
+        Estadísticas del pool: préstamos, esperas (cantidad y segundos), timeouts, fallas, reconexiones,
+        sesiones abiertas, libres y en uso
+        """
+        with self._cond:
+            return {**self._stats, 'size': self._size, 'idle': len(self._idle),
+                    'in_use': self._size - len(self._idle)}
+
+    def close(self):
+        """
+        Cierra las sesiones libres. Las sesiones en uso se cierran al devolverse.
+        """
+        with self._cond:
+            self._closed = True
+            for conn, _ in self._idle:
+                self._close(conn)
+                self._size -= 1
+            self._idle = []
+            self._cond.notify_all()
+
+
+_shared_pools = {}
+_shared_lock = threading.Lock()
+
+
+def shared_pool(key, factory: Callable, **kwargs) -> SessionPool:
+    """
+    Devuelve el pool compartido para key (ej: host y usuario), creándolo con factory y kwargs la primera vez
+    """
+    with _shared_lock:
+        pool = _shared_pools.get(key)
+        if pool is None or pool._closed:
+            pool = _shared_pools[key] = SessionPool(factory, **kwargs)
+        return pool
+
+
+def close_pools():
+    """
+    Cierra todos los pools compartidos
+    """
+    with _shared_lock:
+        for pool in _shared_pools.values():
+            pool.close()
+        _shared_pools.clear()
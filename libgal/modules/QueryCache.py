@@ -0,0 +1,345 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from time import time
+from typing import Optional, Set
+
+from pandas import DataFrame
+
+DEFAULT_CACHE_TTL = 300.0  # segundos de vigencia de un resultado
+DEFAULT_CACHE_ENTRIES = 128  # resultados en memoria
+DEFAULT_CACHE_MEMORY_BYTES = 256 * 1024 ** 2  # presupuesto de memoria
+DEFAULT_CACHE_DISK_BYTES = 1024 ** 3  # presupuesto del directorio de Parquet
+
+_LITERAL = re.compile(r"('(?:[^']|'')*')")
+_COMMENT = re.compile(r'--[^\n]*|/\*.*?\*/', re.DOTALL)
+_NAME = r'((?:"[^"]+"|\w+)(?:\s*\.\s*(?:"[^"]+"|\w+))?)'
+_READ_TABLES = re.compile(r'\b(?:FROM|JOIN)\s+' + _NAME, re.IGNORECASE)
+_WRITE_TABLES = re.compile(r'^\s*(?:INSERT\s+INTO|INS\s+INTO|INSERT|INS|UPDATE|UPD|'
+                           r'DELETE\s+FROM|DEL\s+FROM|DELETE|DEL|MERGE\s+INTO|MERGE|'
+                           r'DROP\s+TABLE(?:\s+IF\s+EXISTS)?|CREATE\s+(?:\w+\s+)*TABLE|'
+                           r'ALTER\s+TABLE|RENAME\s+TABLE|REPLACE\s+VIEW|TRUNCATE\s+TABLE|TRUNCATE)\s+' + _NAME,
+                           re.IGNORECASE)
+_READ_ONLY = re.compile(r'^\s*(?:SEL|SELECT|WITH|SHOW|HELP|EXPLAIN|DATABASE|SET|COLLECT|BEGIN|END|COMMIT|'
+                        r'ROLLBACK|BT|ET|PRAGMA|VACUUM|LOCKING)\b', re.IGNORECASE)
+
+
+def normalize_sql(query: str) -> str:
+    """
+    Normaliza una query para usarla como clave: quita comentarios, colapsa los espacios y el ';' final
+    sin modificar los literales entre comillas
+    """
+    parts = _LITERAL.split(query)
+    for i in range(0, len(parts), 2):
+        parts[i] = re.sub(r'\s+', ' ', _COMMENT.sub(' ', parts[i]))
+    return ''.join(parts).strip().rstrip(';').strip()
+
+
+def _table_name(name: str) -> str:
+    # se compara solo el nombre de la tabla, sin schema, para invalidar de más y nunca de menos
+    return name.replace('"', '').replace(' ', '').split('.')[-1].lower()
+
+
+def _without_literals(query: str) -> str:
+    return _LITERAL.sub("''", _COMMENT.sub(' ', query))
+
+
+def referenced_tables(query: str) -> Set[str]:
+    """
+    Tablas leídas por una query (las que siguen a FROM y JOIN)
+    """
+    return {_table_name(name) for name in _READ_TABLES.findall(_without_literals(query))}
+
+
+def written_tables(query: str) -> Optional[Set[str]]:
+    """
+    Tablas modificadas por una sentencia. Devuelve un conjunto vacío si la sentencia no modifica tablas
+    y None si no se puede determinar (en ese caso hay que invalidar todo).
+    """
+    tables = set()
+    for statement in _without_literals(query).split(';'):
+        if not statement.strip() or _READ_ONLY.match(statement):
+            continue
+        match = _WRITE_TABLES.match(statement)
+        if match is None:
+            return None
+        tables.add(_table_name(match.group(1)))
+    return tables
+
+
+class QueryCache:
+    """
+    Caché de resultados de queries en dos niveles: LRU en memoria y, opcionalmente, archivos Parquet
+    en disco que sobreviven entre ejecuciones. Cada resultado guarda las tablas que lee para poder
+    invalidarlo cuando se modifican.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_CACHE_TTL, max_entries: int = DEFAULT_CACHE_ENTRIES,
+                 max_memory_bytes: int = DEFAULT_CACHE_MEMORY_BYTES, cache_dir: Optional[str] = None,
+                 max_disk_bytes: int = DEFAULT_CACHE_DISK_BYTES):
+        """
+            :param ttl: Segundos de vigencia por defecto de cada resultado
+            :param max_entries: Máximo de resultados en memoria
+            :param max_memory_bytes: Presupuesto de memoria de los resultados
+            :param cache_dir: Directorio de los archivos Parquet (None para usar solo memoria)
+            :param max_disk_bytes: Presupuesto del directorio, se borran primero los archivos más viejos
+        """
+        self.ttl = ttl
+        self.max_entries = max(max_entries, 1)
+        self.max_memory_bytes = max_memory_bytes
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.stats = {'hits': 0, 'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'invalidations': 0,
+                      'evictions': 0, 'disk_errors': 0}
+        self._memory = OrderedDict()  # clave -> (vence, tablas, DataFrame, bytes)
+        self._memory_bytes = 0
+        self._disk = {}  # clave -> (vence, tablas)
+        self._lock = threading.RLock()
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._load_disk_index()
+
+    @staticmethod
+    def key(identity: str, query: str, params=None) -> str:
+        """
+        Clave de un resultado: identidad de la conexión, query normalizada y parámetros adicionales
+        """
+        text = '\0'.join([identity, normalize_sql(query), repr(params) if params else ''])
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f'{key}.parquet')
+
+    def _load_disk_index(self):
+        import pyarrow.parquet as pq
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.parquet'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                meta = pq.read_schema(path).metadata or {}
+                info = json.loads(meta[b'libgal_cache'])
+                self._disk[name[:-len('.parquet')]] = (info['expires'], set(info['tables']))
+            except Exception:
+                self._remove_file(path)
+
+    @staticmethod
+    def _remove_file(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def get(self, key: str) -> Optional[DataFrame]:
+        """
+        Devuelve una copia del resultado guardado o None si no está o venció
+        """
+        now = time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    self.stats['hits'] += 1
+                    self.stats['memory_hits'] += 1
+                    return entry[2].copy()
+                self._drop_memory(key)
+                self.stats['evictions'] += 1
+
+            disk_entry = self._disk.get(key)
+            if disk_entry is not None:
+                if disk_entry[0] > now:
+                    try:
+                        import pyarrow.parquet as pq
+                        df = pq.read_table(self._path(key)).to_pandas()
+                    except Exception:
+                        self.stats['disk_errors'] += 1
+                        self._drop_disk(key)
+                    else:
+                        self.stats['hits'] += 1
+                        self.stats['disk_hits'] += 1
+                        self._put_memory(key, disk_entry[0], disk_entry[1], df)
+                        return df.copy()
+                else:
+                    self._drop_disk(key)
+                    self.stats['evictions'] += 1
+
+            self.stats['misses'] += 1
+            return None
+
+    def put(self, key: str, df: DataFrame, tables: Set[str], ttl: Optional[float] = None):
+        """
+        Guarda un resultado
+            :param key: Clave generada con QueryCache.key
+            :param df: Resultado de la query
+            :param tables: Tablas que lee la query
+            :param ttl: Segundos de vigencia (None para usar el de la caché)
+        """
+        expires = time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._put_memory(key, expires, tables, df.copy())
+            if self.cache_dir is not None:
+                self._put_disk(key, expires, tables, df)
+
+    def _put_memory(self, key: str, expires: float, tables: Set[str], df: DataFrame):
+        nbytes = int(df.memory_usage(index=True, deep=True).sum())
+        if nbytes > self.max_memory_bytes:
+            return
+        if key in self._memory:
+            self._drop_memory(key)
+        self._memory[key] = (expires, tables, df, nbytes)
+        self._memory_bytes += nbytes
+        while len(self._memory) > self.max_entries or self._memory_bytes > self.max_memory_bytes:
+            self._drop_memory(next(iter(self._memory)))
+            self.stats['evictions'] += 1
+
+    def _put_disk(self, key: str, expires: float, tables: Set[str], df: DataFrame):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            meta = dict(table.schema.metadata or {})
+            meta[b'libgal_cache'] = json.dumps({'expires': expires, 'tables': sorted(tables)}).encode('utf-8')
+            tmp_path = f'{self._path(key)}.{os.getpid()}.tmp'
+            pq.write_table(table.replace_schema_metadata(meta), tmp_path)
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            # hay tipos de datos que Parquet no soporta, el resultado queda solo en memoria
+            self.stats['disk_errors'] += 1
+            return
+        self._disk[key] = (expires, tables)
+        self._enforce_disk_budget()
+
+    def _enforce_disk_budget(self):
+        files = []
+        for key in self._disk:
+            try:
+                st = os.stat(self._path(key))
+            except FileNotFoundError:
+                continue
+            files.append((st.st_mtime, st.st_size, key))
+        total = sum(size for _, size, _ in files)
+        for _, size, key in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            self._drop_disk(key)
+            self.stats['evictions'] += 1
+            total -= size
+
+    def _drop_memory(self, key: str):
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= entry[3]
+
+    def _drop_disk(self, key: str):
+        if self._disk.pop(key, None) is not None:
+            self._remove_file(self._path(key))
+
+    def invalidate(self, tables: Optional[Set[str]] = None):
+        """
+        Descarta los resultados que leen alguna de las tablas (None para descartar todos)
+        """
+        with self._lock:
+            if tables is not None:
+                tables = {_table_name(table) for table in tables}
+            for store, drop in ((self._memory, self._drop_memory), (self._disk, self._drop_disk)):
+                for key in [k for k, entry in store.items() if tables is None or entry[1] & tables]:
+                    drop(key)
+                    self.stats['invalidations'] += 1
+
+    def clear(self):
+        self.invalidate()
+
+    def __len__(self):
+        return len(set(self._memory) | set(self._disk))
+
+
+def _cache_of(instance) -> Optional[QueryCache]:
+    return instance.__dict__.get('_query_cache')
+
+
+def cached_query(func):
+    """
+    Decorador de query: si la instancia tiene la caché activada devuelve el resultado guardado.
+    Acepta el parámetro adicional cache_ttl (segundos, 0 para no usar la caché en esa llamada).
+    """
+    @functools.wraps(func)
+    def wrapper(self, query, *args, cache_ttl: Optional[float] = None, **kwargs):
+        cache = _cache_of(self)
+        if cache is None or cache_ttl == 0 or not isinstance(query, str):
+            return func(self, query, *args, **kwargs)
+
+        params = (args, sorted(kwargs.items())) if args or kwargs else None
+        key = QueryCache.key(self._connection_identity(), query, params)
+        result = cache.get(key)
+        if result is None:
+            result = func(self, query, *args, **kwargs)
+            if isinstance(result, DataFrame):
+                cache.put(key, result, referenced_tables(query), cache_ttl)
+        return result
+
+    wrapper.__libgal_cached__ = True
+    return wrapper
+
+
+def invalidates_cache(func):
+    """
+    Decorador de los métodos que modifican tablas: al terminar invalida los resultados que leen las tablas
+    modificadas. Las tablas se toman de los argumentos cuyo nombre empieza con 'table' o, en do/execute,
+    de la sentencia SQL.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        cache = _cache_of(self)
+        if cache is None:
+            return func(self, *args, **kwargs)
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            cache.invalidate(_touched_tables(signature, self, args, kwargs))
+
+    wrapper.__libgal_invalidates__ = True
+    return wrapper
+
+
+def _touched_tables(signature, instance, args, kwargs) -> Optional[Set[str]]:
+    try:
+        bound = signature.bind(instance, *args, **kwargs)
+    except TypeError:
+        return None
+    tables = set()
+    for name, value in bound.arguments.items():
+        if name.startswith('table') and isinstance(value, str):
+            tables.add(value)
+        elif name.startswith('table') and isinstance(value, (list, tuple)):
+            tables |= {table for table in value if isinstance(table, str)}
+        elif name == 'query':
+            statements = value if isinstance(value, list) else [value]
+            for statement in statements:
+                sql = statement['statement'] if isinstance(statement, dict) else statement
+                written = written_tables(sql) if isinstance(sql, str) else None
+                if written is None:
+                    return None
+                tables |= written
+    return tables
+
+
+def install_query_cache(cls, writers):
+    """
+    Aplica cached_query a query e invalidates_cache a los métodos de escritura definidos en la propia clase
+    """
+    method = cls.__dict__.get('query')
+    if inspect.isfunction(method) and not getattr(method, '__libgal_cached__', False):
+        setattr(cls, 'query', cached_query(method))
+    for name in writers:
+        method = cls.__dict__.get(name)
+        if inspect.isfunction(method) and not getattr(method, '__libgal_invalidates__', False):
+            setattr(cls, name, invalidates_cache(method))
+    return cls
@@ -0,0 +1,132 @@
+import functools
+import random
+import re
+import threading
+from time import sleep, monotonic
+from typing import Optional, Iterable, Tuple, Type
+
+from libgal.modules.Metrics import registry
+
+# Códigos de error de Teradata que indican contención o una condición transitoria
+TERADATA_RETRYABLE_CODES = frozenset({
+    2631,  # transacción abortada por deadlock
+    2639,  # demasiadas transacciones simultáneas
+    2641,  # la tabla está siendo reestructurada
+    2663,  # demasiadas cargas (fastload/multiload/fastexport) en ejecución
+    3111,  # timeout del dispatcher
+    3598,  # cambio concurrente en el diccionario de datos
+})
+
+# SQLSTATE de ODBC transitorios (comunicación, timeouts, deadlocks)
+ODBC_RETRYABLE_SQLSTATES = frozenset({'08001', '08S01', '08003', 'HYT00', 'HYT01', '40001'})
+
+_TERADATA_CODE = re.compile(r'\[Error (\d+)\]')
+# el SQLSTATE solo aparece como primer argumento de pyodbc.Error ("('08S01', ...") o entre corchetes ("[08S01]")
+_SQLSTATE = re.compile(r"(?:\('|\[)([0-9A-Z]{5})(?:'|\])")
+
+
+def error_code(exc: BaseException) -> Optional[int]:
+    """
+    Extrae el código de error de Teradata del mensaje de una excepción (ej: "[Error 2663] ...")
+        :param exc: Excepción
+        :return: Código de error o None
+    """
+    match = _TERADATA_CODE.search(str(exc))
+    return int(match.group(1)) if match else None
+
+
+class RetryPolicy:
+    """
+    Política de reintentos con backoff exponencial, jitter y deadline.
+    Una excepción se reintenta si es de alguno de los tipos de retryable_exceptions, si su mensaje contiene
+    un código de Teradata de retryable_codes o un SQLSTATE de ODBC de retryable_sqlstates.
+    """
+
+    def __init__(self, max_attempts: int = 5, base_delay: float = 0.5, max_delay: float = 30.0,
+                 multiplier: float = 2.0, jitter: float = 0.5, deadline: Optional[float] = None,
+                 retryable_codes: Iterable[int] = TERADATA_RETRYABLE_CODES,
+                 retryable_sqlstates: Iterable[str] = ODBC_RETRYABLE_SQLSTATES,
+                 retryable_exceptions: Tuple[Type[BaseException], ...] = (),
+                 name: str = 'default'):
+        """
+            :param max_attempts: Cantidad máxima de intentos (incluido el primero)
+            :param base_delay: Espera antes del primer reintento en segundos
+            :param max_delay: Espera máxima entre reintentos en segundos
+            :param multiplier: Factor de crecimiento de la espera
+            :param jitter: Fracción aleatoria de la espera (0 a 1) para no sincronizar a los clientes
+            :param deadline: Tiempo total máximo en segundos (None para no limitar)
+            :param retryable_codes: Códigos de error de Teradata que se reintentan
+            :param retryable_sqlstates: SQLSTATE de ODBC que se reintentan
+            :param retryable_exceptions: Tipos de excepción que siempre se reintentan
+            :param name: Nombre de la política (para logs y métricas)
+        """
+        self.max_attempts = max(max_attempts, 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.deadline = deadline
+        self.retryable_codes = frozenset(retryable_codes)
+        self.retryable_sqlstates = frozenset(retryable_sqlstates)
+        self.retryable_exceptions = tuple(retryable_exceptions)
+        self.name = name
+        self.stats = {'calls': 0, 'retries': 0, 'failures': 0, 'sleep_s': 0.0}
+        self._lock = threading.Lock()
+
+    def is_retryable(self, exc: BaseException) -> bool:
+        if self.retryable_exceptions and isinstance(exc, self.retryable_exceptions):
+            return True
+        code = error_code(exc)
+        if code is not None:
+            return code in self.retryable_codes
+        return bool(set(_SQLSTATE.findall(str(exc))) & self.retryable_sqlstates)
+
+    def delay(self, attempt: int) -> float:
+        """
+        Espera antes del reintento número attempt (1 para el primer reintento)
+        """
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1))
+        return delay * (1 - self.jitter * random.random())
+
+    def _count(self, key: str, value=1):
+        with self._lock:
+            self.stats[key] += value
+
+    def run(self, func, *args, logger=None, **kwargs):
+        """
+        Ejecuta func(*args, **kwargs) aplicando la política de reintentos
+            :param func: Función a ejecutar
+            :param logger: Logger donde informar los reintentos
+            :return: El resultado de func
+        """
+        self._count('calls')
+        start = monotonic()
+        attempt = 1
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                delay = self.delay(attempt)
+                out_of_time = self.deadline is not None and monotonic() - start + delay > self.deadline
+                if not self.is_retryable(e) or attempt >= self.max_attempts or out_of_time:
+                    self._count('failures')
+                    raise
+                if logger is not None:
+                    logger.warning('Reintento %d/%d de %s en %.1f s: %s', attempt, self.max_attempts - 1,
+                                   getattr(func, '__name__', 'operación'), delay, e)
+                self._count('retries')
+                self._count('sleep_s', delay)
+                if registry.enabled:
+                    registry.record(f'RetryPolicy.{self.name}', delay, error=True)
+                sleep(delay)
+                attempt += 1
+
+    def __call__(self, func):
+        """
+        Permite usar la política como decorador
+        """
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return self.run(func, *args, **kwargs)
+
+        return wrapper
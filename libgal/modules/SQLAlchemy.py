@@ -6,7 +6,7 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.exc import OperationalError as SQLAlchemyError
 from libgal.modules.Teradata import TeradataML
-from libgal.modules.DatabaseAPI import DatabaseAPI, FunctionNotImplementedException
+from libgal.modules.DatabaseAPI import DatabaseAPI, FunctionNotImplementedException, DEFAULT_CHUNK_ROWS
 
 
 class SQLAlchemy(DatabaseAPI):
@@ -39,7 +39,8 @@ class SQLAlchemy(DatabaseAPI):
 
     def connect(self):
         if self.driver.lower() == "teradata":
-            self._engine = TeradataML(host=self.host, user=self.username, passw=self.password, logmech=self.logmech).engine
+            self._engine = TeradataML.shared(host=self.host, user=self.username, passw=self.password,
+                                             logmech=self.logmech).engine
         elif self.driver.lower() == "mysql":
             self._engine = create_engine(f"mysql+mysqlconnector://{self.username}:{self.password}@{self.host}/",
                                         pool_recycle=self.pool_recycle, pool_size=self.pool_size)
@@ -68,6 +69,24 @@ class SQLAlchemy(DatabaseAPI):
         with self.engine.connect() as conn:
             return conn.execute(text(query))
 
+    def query_iter(self, query, chunk_rows=DEFAULT_CHUNK_ROWS):
+        """
+        Descripción: Ejecuta una instrucción SQL y devuelve el resultado en DataFrames de hasta chunk_rows filas,
+        usando un cursor del lado del servidor (stream_results) cuando el driver lo soporta.
+        Parámetro:
+        - query (String): Instrucción SQL a ejecutar
+        - chunk_rows (Integer): Cantidad de filas por DataFrame
+        """
+        with self.engine.connect() as conn:
+            result = conn.execution_options(stream_results=True).execute(text(query))
+            columns = list(result.keys())
+            empty = True
+            for rows in result.partitions(chunk_rows):
+                empty = False
+                yield DataFrame.from_records(rows, columns=columns, coerce_float=True)
+            if empty:
+                yield DataFrame(columns=columns)
+
     def insert(self, pandas_dataframe, database, table, pk=None, parser_limit=10000):
         """
         Descripción: Permite ejecutar una instrucción SQL según el motor de Base de Datos.
@@ -18,5 +18,5 @@ class SQLMemory(Sqlite):
         """
         Vuelca la memoria a un archivo
         """
-        logger.info(f'Volcando memoria a {self.dbfile}')
+        logger.info('Volcando memoria a %s', self.dbfile)
         self.do(f"vacuum main into '{self.dbfile}'")
@@ -1,16 +1,29 @@
-from typing import List, Optional
+import hashlib
+from typing import List, Optional, Tuple
 import pandas as pd
 import sqlalchemy
 from pandas import DataFrame
-from libgal.modules.DatabaseAPI import DatabaseAPI, FunctionNotImplementedException
+from libgal.modules.DatabaseAPI import DatabaseAPI, FunctionNotImplementedException, _aux_table
 from libgal.modules.Logger import Logger
+import os
 import re
-from libgal.modules.ODBCTools import load_table, load_sql
-from libgal.modules.Utils import drop_lists, chunks_df
+from libgal.modules.ODBCTools import load_table, load_sql, read_sql_arrow
+from libgal.modules.Utils import drop_lists, iter_chunks_df, optimize_memory
 
 logger = Logger(dirname=None).get_logger()
 
 
+def _row_hash(*values) -> int:
+    """
+    Hash de 32 bits de los valores de una fila, estable entre procesos (función libgal_hash de SQL)
+    """
+    return int.from_bytes(hashlib.blake2b(repr(values).encode('utf-8'), digest_size=4).digest(), 'big')
+
+
+def _register_functions(dbapi_connection, connection_record):
+    dbapi_connection.create_function('libgal_hash', -1, _row_hash, deterministic=True)
+
+
 class Sqlite(DatabaseAPI):
 
     def __init__(self, dbfile, drop_tables=False):
@@ -29,6 +42,7 @@ class Sqlite(DatabaseAPI):
             :return: Tupla con la conexión y el engine
         """
         eng = sqlalchemy.create_engine(f'sqlite:///{self.filepath}')
+        sqlalchemy.event.listen(eng, 'connect', _register_functions)
         conn = eng.raw_connection()
         return conn, eng
 
@@ -38,21 +52,27 @@ class Sqlite(DatabaseAPI):
             :param query: Query a ejecutar
         """
         c = self.conn.cursor()
-        logger.debug(f'Ejecutando query: {query}')
+        logger.debug('Ejecutando query: %s', query)
         c.execute(query)
         c.close()
         self.conn.commit()
 
-    def read_table(self, table: str) -> DataFrame:
+    def _connection_identity(self) -> str:
+        if self.filepath == ':memory:':
+            return super()._connection_identity()
+        return f'sqlite:{os.path.abspath(self.filepath)}'
+
+    def read_table(self, table: str, dtype_backend: str = 'numpy') -> DataFrame:
         """
         Lee una tabla de la base de datos
             :param table: Nombre de la tabla a leer
+            :param dtype_backend: 'numpy' o 'pyarrow' (DataFrame con tipos de Arrow, ver query)
             :return: DataFrame con el contenido de la tabla
         """
-        return load_table(self.engine, table)
+        return load_table(self.engine, table, dtype_backend=dtype_backend)
 
     def insert(self, df: DataFrame, schema: Optional[str], table: str, pk: str,
-               odbc_limit: int = 100000):
+               odbc_limit: int = 100000, optimize_dtypes: bool = False):
         """
         Inserta un DataFrame en una tabla
             :param df: DataFrame a insertar
@@ -60,11 +80,14 @@ class Sqlite(DatabaseAPI):
             :param table: Nombre de la tabla
             :param pk: Primary key de la tabla
             :param odbc_limit: Límite de filas por lote
-        """
-        parts = chunks_df(df, odbc_limit)
-        total = len(parts)
-        for i, chunk in enumerate(parts):
-            logger.info(f'Cargando lote {i+1} de {total}')
+            :param optimize_dtypes: Reducir la memoria del DataFrame antes de cargarlo (ver Utils.optimize_memory)
+        """
+        if optimize_dtypes:
+            df = optimize_memory(df)
+            logger.debug('Tipos optimizados, %d bytes menos', df.attrs['optimize_memory']['bytes_saved'])
+        total = -(-len(df) // odbc_limit)
+        for i, chunk in enumerate(iter_chunks_df(df, odbc_limit)):
+            logger.info('Cargando lote %d de %d', i + 1, total)
             chunk.to_sql(name=table, con=self.engine, schema=schema, if_exists='append', index=False)
 
     def upsert(self, df: DataFrame, schema: Optional[str], table: str, pk: str):
@@ -78,7 +101,30 @@ class Sqlite(DatabaseAPI):
         self.delete_by_primary_key(df, schema, table, pk)
         self.insert(df, schema, table, pk)
 
+    def _delete_by_key_table(self, pks: pd.Series, schema: Optional[str], table: str, pk: str):
+        """
+        Carga las claves en una tabla temporal con executemany y borra con un único DELETE
+        """
+        key_table = _aux_table(f'libgal_delete_keys_{table}'.replace('.', '_'), 'dk')
+        escaped_table_name = self._escaped_table_name(schema, table)
+        c = self.conn.cursor()
+        try:
+            c.execute(f'CREATE TEMP TABLE "{key_table}" ({pk} PRIMARY KEY);')
+            c.executemany(f'INSERT OR IGNORE INTO temp."{key_table}" VALUES (?);', [(k,) for k in pks.tolist()])
+            logger.debug('Borrando %d claves de %s con tabla temporal', len(pks), escaped_table_name)
+            c.execute(f'DELETE FROM {escaped_table_name} WHERE {pk} IN (SELECT {pk} FROM temp."{key_table}");')
+            c.execute(f'DROP TABLE temp."{key_table}";')
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            c.close()
+
     def diff(self, schema_src: Optional[str], table_src: str, schema_dst: Optional[str], table_dst: str) -> DataFrame:
+        """
+        Devuelve las filas del origen que no están en el destino (para tablas grandes ver hash_diff)
+        """
         if schema_src is not None and schema_dst is not None:
             query = f'SELECT * FROM "{schema_src}.{table_src}" EXCEPT SELECT * FROM "{schema_dst}.{table_dst}";'
         elif schema_src is not None:
@@ -91,6 +137,15 @@ class Sqlite(DatabaseAPI):
         difference = self.query(query)
         return difference
 
+    def _hash_diff_table(self, schema: Optional[str], table: str) -> str:
+        return f'"{schema}.{table}"' if schema is not None else f'"{table}"'
+
+    def _row_hash_sql(self, columns: List[str]) -> str:
+        return 'libgal_hash(' + ', '.join(f'"{col}"' for col in columns) + ')'
+
+    def _bucket_sql(self, keys: List[str], buckets: int) -> str:
+        return 'libgal_hash(' + ', '.join(f'"{key}"' for key in keys) + f') % {int(buckets)}'
+
     def staging_insert(self, df: DataFrame, schema_src: Optional[str], table_src: str,
                        schema_dst: Optional[str], table_dst: str, pk: str):
         raise FunctionNotImplementedException('staging_insert no está implementado para SQLite')
@@ -107,14 +162,21 @@ class Sqlite(DatabaseAPI):
         """
         return load_sql(path)
 
-    def query(self, query: str) -> DataFrame:
+    def query(self, query: str, dtype_backend: str = 'numpy', optimize_dtypes: bool = False) -> DataFrame:
         """
         Ejecuta una query que devuelve resultados
             :param query: Query a ejecutar
+            :param dtype_backend: 'numpy' (pd.read_sql) o 'pyarrow': los lotes del cursor se convierten
+                directamente en columnas de Arrow y el DataFrame usa tipos de Arrow
+            :param optimize_dtypes: Reducir la memoria del resultado (ver Utils.optimize_memory)
             :return: DataFrame con el resultado de la query
         """
-        return pd.read_sql(sql=query, con=self.engine, index_col=None, coerce_float=True,
-                           parse_dates=None, columns=None, chunksize=None)
+        if dtype_backend == 'pyarrow':
+            result = read_sql_arrow(self.engine, query)
+        else:
+            result = pd.read_sql(sql=query, con=self.engine, index_col=None, coerce_float=True,
+                                 parse_dates=None, columns=None, chunksize=None)
+        return optimize_memory(result) if optimize_dtypes else result
 
     def table_columns(self, schema: Optional[str], table: str) -> List[str]:
         """
@@ -123,9 +185,24 @@ class Sqlite(DatabaseAPI):
             :param table: Nombre de la tabla
             :return: Lista de columnas de la tabla
         """
-        query = f'SELECT * FROM "{schema}.{table}" LIMIT 1;'
-        result = self.query(query)
-        return result.columns.tolist()
+        return [name for name, _ in self.table_schema(schema, table)]
+
+    def _read_table_schema(self, schema: Optional[str], table: str) -> List[Tuple[str, Optional[str]]]:
+        """
+        Lee las columnas y sus tipos con PRAGMA table_info
+        """
+        name = f'{schema}.{table}' if schema is not None else table
+        c = self.conn.cursor()
+        try:
+            c.execute(f'PRAGMA table_info("{name}");')
+            columns = [(row[1], row[2] or None) for row in c.fetchall()]
+        finally:
+            c.close()
+        if not columns:
+            # la tabla no existe: la query falla con el error del motor
+            result = self.query(f'SELECT * FROM "{name}" LIMIT 1;')
+            columns = [(col, None) for col in result.columns]
+        return columns
 
     def truncate_table(self, schema: Optional[str], table: str):
         """
@@ -154,6 +231,7 @@ class Sqlite(DatabaseAPI):
             :param schema: Esquema de la tabla
             :param table: Nombre de la tabla
         """
+        self.invalidate_metadata(schema, table)
         if schema is not None:
             query = f'DROP TABLE IF EXISTS "{schema}.{table}";'
         else:
@@ -177,6 +255,7 @@ class Sqlite(DatabaseAPI):
         else:
             query = f'CREATE TABLE "{table}" AS SELECT * FROM "{table_orig}" LIMIT 1;'
 
+        self.invalidate_metadata(schema, table)
         self.do(query)
         self.truncate_table(schema, table)
 
@@ -186,6 +265,7 @@ class Sqlite(DatabaseAPI):
             :param tables: Lista de tablas a borrar
         """
         for table in tables:
+            self.invalidate_metadata(None, table)
             query = f'DROP TABLE IF EXISTS "{table}";'
             self.do(query)
 
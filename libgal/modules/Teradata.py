@@ -1,6 +1,10 @@
+import csv
 import datetime
+import glob
+import hashlib
 import math
-from typing import Optional, List
+import threading
+from typing import Iterator, Optional, List, Tuple, Union
 
 import pyodbc
 import pandas as pd
@@ -9,13 +13,26 @@ from pandas import DataFrame
 from sqlalchemy.engine import Engine
 from sqlalchemy.exc import OperationalError
 
-from libgal.modules.DatabaseAPI import DatabaseAPI, DatabaseError
-from libgal.modules.ODBCTools import load_table, inserts_from_dataframe
-from time import sleep
+from libgal.modules.DatabaseAPI import DatabaseAPI, DatabaseError, DEFAULT_CHUNK_ROWS, _aux_table, _key_columns
+from libgal.modules.ODBCTools import load_table, inserts_from_dataframe, insert_params_from_dataframe, \
+    bind_params_from_dataframe, read_sql_arrow
+from time import perf_counter
+from concurrent.futures import ThreadPoolExecutor
 from teradataml.context.context import create_context
 from teradataml.dataframe.fastload import fastload
 from teradatasql import OperationalError as tdOperationalError
-from libgal.modules.Utils import chunks_df
+from libgal.modules.Utils import iter_chunks_df, optimize_memory
+from libgal.modules.Retry import RetryPolicy
+from libgal.modules.Pool import SessionPool, shared_pool, is_disconnect
+from libgal.modules.Throughput import ThroughputHistory, estimate_payload_bytes, odbc_batch_rows
+
+DEFAULT_BATCH_SIZE = 10000  # filas por executemany
+DEFAULT_MULTI_STATEMENT_LIMIT = 100  # sentencias por multi-statement request
+PACKABLE_STATEMENTS = ('INSERT', 'INS', 'UPDATE', 'UPD', 'DELETE', 'DEL', 'MERGE')
+DDL_STATEMENTS = ('CREATE', 'CT', 'DROP', 'ALTER', 'RENAME', 'REPLACE', 'COLLECT', 'GRANT', 'REVOKE', 'COMMENT',
+                  'DATABASE')
+HASHROW_MAX_ARGS = 50  # columnas por HASHROW en hash_diff
+CSV_COUNT_BLOCK_BYTES = 16 * 1024 ** 2  # bytes por lectura al contar las filas de un CSV
 
 
 def teradata(host, username, password, logmech="LDAP", database=None):
@@ -35,6 +52,101 @@ def teradata(host, username, password, logmech="LDAP", database=None):
 
     return td.connection
 
+def _is_packable(statement: str) -> bool:
+    """
+    Indica si una sentencia sin parámetros puede ir dentro de un multi-statement request
+    (solo DML, la DDL y el control de transacciones se ejecutan solos)
+    """
+    return statement.lstrip().split(' ', 1)[0].upper() in PACKABLE_STATEMENTS
+
+
+def _is_ddl(statement: str) -> bool:
+    """
+    Indica si una sentencia es DDL, que en Teradata tiene que ser la última de su transacción
+    """
+    return statement.lstrip().split(' ', 1)[0].upper().rstrip(';') in DDL_STATEMENTS
+
+
+def plan_script(script: list, batch_size: int = DEFAULT_BATCH_SIZE,
+                multi_statement_limit: int = DEFAULT_MULTI_STATEMENT_LIMIT) -> list:
+    """
+    Arma el plan de ejecución de una lista de sentencias de Scripting:
+        - las sentencias parametrizadas consecutivas con el mismo texto se agrupan en lotes para executemany
+        - las sentencias DML sin parámetros consecutivas se empaquetan en multi-statement requests
+        - el resto se ejecuta de a una
+        :param script: Lista de diccionarios {'statement', 'values'[, 'batch']}
+        :param batch_size: Máximo de filas por lote
+        :param multi_statement_limit: Máximo de sentencias por multi-statement request
+        :return: Lista de unidades {'kind', 'statement', 'params', 'first', 'end', 'complete'} donde first es la
+            posición de la primera sentencia incluida, end la posición siguiente a la última sentencia completada
+            y complete indica si la unidad termina en el límite de una sentencia del script
+    """
+    plan = []
+    ix, total = 0, len(script)
+    while ix < total:
+        item = script[ix]
+        statement = item['statement']
+        if item.get('batch') or len(item['values']) > 0:
+            # agrupo todas las sentencias consecutivas con el mismo texto
+            params, counts = [], []
+            while ix < total and script[ix]['statement'] == statement and \
+                    (script[ix].get('batch') or len(script[ix]['values']) > 0):
+                rows = script[ix]['batch'] if script[ix].get('batch') else [tuple(script[ix]['values'])]
+                params.extend(rows)
+                counts.extend([ix] * len(rows))
+                ix += 1
+            if len(params) == 1 and not item.get('batch'):
+                plan.append({'kind': 'single', 'statement': statement, 'params': params[0],
+                             'first': ix - 1, 'end': ix, 'complete': True})
+                continue
+            for offset in range(0, len(params), batch_size):
+                owners = counts[offset:offset + batch_size]
+                # el lote completa una sentencia del script si contiene su última fila
+                complete = offset + batch_size >= len(params) or counts[offset + batch_size] != owners[-1]
+                plan.append({'kind': 'batch', 'statement': statement, 'params': params[offset:offset + batch_size],
+                             'first': owners[0], 'end': owners[-1] + 1 if complete else owners[-1],
+                             'complete': complete})
+        elif _is_packable(statement):
+            first, statements = ix, []
+            while ix < total and len(statements) < multi_statement_limit and \
+                    not script[ix].get('batch') and len(script[ix]['values']) == 0 and \
+                    _is_packable(script[ix]['statement']):
+                statements.append(script[ix]['statement'].strip().rstrip(';'))
+                ix += 1
+            kind = 'multi' if len(statements) > 1 else 'single'
+            plan.append({'kind': kind, 'statement': ';'.join(statements) + ';', 'params': [],
+                         'first': first, 'end': ix, 'complete': True})
+        else:
+            plan.append({'kind': 'single', 'statement': statement, 'params': [], 'first': ix, 'end': ix + 1,
+                         'complete': True})
+            ix += 1
+    return plan
+
+
+def _count_csv_rows(path: str) -> int:
+    """
+    Cuenta las filas de datos de un CSV (sin el encabezado) contando saltos de línea, sin parsear el archivo.
+    Los saltos de línea dentro de campos entre comillas se cuentan como filas.
+    """
+    lines, last = 0, b''
+    with open(path, mode='rb') as fp:
+        while True:
+            block = fp.read(CSV_COUNT_BLOCK_BYTES)
+            if not block:
+                break
+            lines += block.count(b'\n')
+            last = block
+    if last and not last.endswith(b'\n'):
+        lines += 1
+    return max(lines - 1, 0)
+
+
+def _qualified(schema: Optional[str], table: str) -> str:
+    """
+    Nombre de tabla calificado con el schema, o solo el nombre para las tablas volátiles (schema None)
+    """
+    return f'{schema}.{table}' if schema is not None else table
+
 
 class Scripting:
 
@@ -55,8 +167,36 @@ class Scripting:
             'values': []
         })
 
-    def insert_batch(self, df, schema, table):
+    def insert_batch(self, df, schema, table, columnar: bool = True, lossless: bool = False):
+        """
+        Agrega al script los INSERT de un DataFrame
+            :param df: DataFrame a insertar
+            :param schema: Schema de la tabla
+            :param table: Nombre de la tabla
+            :param columnar: Si es True se normaliza el DataFrame por columna y se agrega una única sentencia
+                parametrizada con el lote de filas (que do() ejecuta con executemany). Si es False se agrega
+                una sentencia por fila.
+            :param lossless: Si es True (solo en modo columnar) los valores se envían sin normalizar: strings
+                intactos, fechas con hora y NaN/NaT como NULL (ver bind_params_from_dataframe)
+        """
         columns = str(', '.join(df.columns))
+        insert = f'INSERT INTO {_qualified(schema, table)}' + ' (' + columns + ') VALUES (' + \
+                 ','.join(['?'] * len(df.columns)) + ');'
+
+        if columnar:
+            try:
+                batch = bind_params_from_dataframe(df) if lossless else insert_params_from_dataframe(df)
+            except ValueError as e:
+                self._logger.error(e)
+                raise e
+            if batch:
+                self._script.append({
+                    'statement': insert,
+                    'values': [],
+                    'batch': batch
+                })
+            return
+
         for index, row in df.iterrows():
             try:
                 for name, value in row.items():
@@ -71,12 +211,10 @@ class Scripting:
                     elif ('Id' in name or 'Num' in name) and value == int(value):
                         row[name] = int(value)
             except ValueError as e:
-                self._self._logger.error(e)
-                self._self._logger.debug(row)
+                self._logger.error(e)
+                self._logger.debug(row)
                 raise e
 
-            insert = f'INSERT INTO {schema}.{table}' + ' (' + columns + ') VALUES (' + \
-                     ','.join(['?'] * len(row.values)) + ');'
             self._script.append({
                 'statement': insert,
                 'values': row.values
@@ -93,7 +231,29 @@ class Scripting:
         )
 
     def delete_by_table(self, schema, table, stg_schema, stg_table, pk):
-        statement = f'DELETE FROM {schema}.{table} WHERE {pk} IN (SEL {pk} FROM {stg_schema}.{stg_table});'
+        statement = f'DELETE FROM {schema}.{table} WHERE {pk} IN (SEL {pk} FROM {_qualified(stg_schema, stg_table)});'
+        self._script.append(
+            {
+                'statement': statement,
+                'values': []
+            }
+        )
+
+    def merge_from_table(self, schema, table, stg_schema, stg_table, pk, columns):
+        """
+        Agrega al script un MERGE que actualiza las filas existentes e inserta las nuevas desde una tabla staging
+            :param pk: Clave simple o compuesta, debe incluir el primary index de la tabla destino
+            :param columns: Columnas de la tabla destino
+        """
+        keys = _key_columns(pk)
+        on = ' AND '.join(f'prd.{k} = stg.{k}' for k in keys)
+        key_names = {k.lower() for k in keys}
+        updates = ', '.join(f'{col} = stg.{col}' for col in columns if col.lower() not in key_names)
+        statement = f'MERGE INTO {schema}.{table} AS prd USING {_qualified(stg_schema, stg_table)} AS stg ON {on} '
+        if updates:
+            statement += f'WHEN MATCHED THEN UPDATE SET {updates} '
+        statement += f'WHEN NOT MATCHED THEN INSERT ({", ".join(columns)}) ' + \
+            f'VALUES ({", ".join(f"stg.{col}" for col in columns)});'
         self._script.append(
             {
                 'statement': statement,
@@ -139,7 +299,11 @@ class Scripting:
         str_arr = []
         import re
         for item in self._script:
-            if len(item['values']) > 0:
+            if item.get('batch'):
+                statement = re.sub(r'VALUES \(.*\?.*\);', '', item['statement'])
+                for values in item['batch']:
+                    str_arr.append(statement + 'VALUES (' + ', '.join(self._stringify(values)) + ');')
+            elif len(item['values']) > 0:
                 statement = re.sub(r'VALUES \(.*\?.*\);', '', item['statement'])
                 str_arr.append(statement + 'VALUES (' + ', '.join(self._stringify(item['values'])) + ');')
             else:
@@ -149,8 +313,13 @@ class Scripting:
 
 class TeradataML(DatabaseAPI):
 
+    _shared_instances = {}
+    _shared_lock = threading.Lock()
+
     def __init__(self, host: str, user: str, passw: str,
-                 logmech: Optional[str] = 'LDAP', schema: Optional[str] = 'DBC'):
+                 logmech: Optional[str] = 'LDAP', schema: Optional[str] = 'DBC',
+                 retry_policy: Optional[RetryPolicy] = None, pool_min_size: int = 1, pool_max_size: int = 8,
+                 history_file: Optional[str] = None):
         """
         Inicializa una conexión a Teradata
             :param host: Host de la base de datos
@@ -158,7 +327,18 @@ class TeradataML(DatabaseAPI):
             :param passw: Contraseña
             :param logmech: Mecanismo de autenticación
             :param schema: Schema por defecto
+            :param retry_policy: Política de reintentos para query y do ante errores transitorios
+            :param pool_min_size: Sesiones de teradatasql que el pool mantiene abiertas
+            :param pool_max_size: Máximo de sesiones de teradatasql del pool
+            :param history_file: Archivo donde guardar el rendimiento de las cargas de insert(path='auto') entre
+                ejecuciones (por defecto LIBGAL_THROUGHPUT_FILE, sin ninguno queda solo en memoria)
         """
+        self.retry_policy = retry_policy if retry_policy is not None else \
+            RetryPolicy(max_attempts=5, base_delay=0.5, max_delay=30, deadline=300, name='teradata')
+        self.pool_min_size = pool_min_size
+        self.pool_max_size = pool_max_size
+        self.throughput = ThroughputHistory(history_file)
+        self._session_staging = set()  # tablas staging volátiles o temporales ya creadas en la sesión
         self.context: Optional[Engine] = None
         self.eng: Optional[Engine] = None
         self.conn = None
@@ -190,6 +370,66 @@ class TeradataML(DatabaseAPI):
                 'Fastload solo se puede usar si se inicializa Teradata especificando un schema'
             )
 
+    @classmethod
+    def shared(cls, host: str, user: str, passw: str, logmech: Optional[str] = 'LDAP',
+               schema: Optional[str] = 'DBC', **kwargs) -> 'TeradataML':
+        """
+        Devuelve una instancia compartida por todos los que se conectan con los mismos parámetros,
+        para no repetir el logon en cada conexión
+        """
+        # la contraseña solo se guarda como hash en la clave
+        key = (cls, host, user, hashlib.sha256(passw.encode('utf-8')).hexdigest(), logmech, schema)
+        with cls._shared_lock:
+            instance = cls._shared_instances.get(key)
+            if instance is None:
+                instance = cls._shared_instances[key] = cls(host, user, passw, logmech, schema, **kwargs)
+            return instance
+
+    def _connection_identity(self) -> str:
+        return f'teradata:{self._conn_params["host"]}:{self._conn_params["user"]}:{self.schema}'
+
+    def reconnect(self):
+        """
+        Descarta la conexión actual de esta instancia y abre otra desde el engine. El contexto de teradataml
+        es global al proceso y lo comparten las demás instancias, por lo que no se toca.
+        """
+        self._logger.warning('Reconectando TeradataML')
+        self._session_staging.clear()
+        if self.context is None:
+            self.connect()
+            return
+        try:
+            # invalidate() saca la conexión del pool del engine en lugar de devolverla para reutilizarla
+            self.conn.invalidate()
+        except Exception:
+            try:
+                self.conn.close()
+            except Exception:
+                pass
+        self.conn = self.context.raw_connection()
+
+    def _reconnecting(self, func):
+        """
+        Ejecuta func y, si la sesión se cayó, reconecta antes de propagar el error para que el reintento
+        use la conexión nueva
+        """
+        try:
+            return func()
+        except Exception as e:
+            if is_disconnect(e):
+                self.reconnect()
+            raise
+
+    @property
+    def pool(self) -> SessionPool:
+        """
+        Pool de sesiones de teradatasql compartido por las instancias con los mismos parámetros de conexión.
+        Se crea en el primer uso.
+        """
+        key = ('teradata', self._conn_params['host'], self._conn_params['user'], self.logmech, self.schema)
+        return shared_pool(key, self.td_connect, min_size=self.pool_min_size, max_size=self.pool_max_size,
+                           retry_policy=self.retry_policy, name='teradata', logger=self._logger)
+
     def use_db(self, db: str):
         """
         Cambia la base de datos por defecto
@@ -197,52 +437,194 @@ class TeradataML(DatabaseAPI):
         """
         self.do(f'DATABASE {db};')
 
-    def do(self, query: str):
+    def do(self, query: str, batch_size: int = DEFAULT_BATCH_SIZE, commit_every: Optional[int] = None,
+           multi_statement_limit: int = DEFAULT_MULTI_STATEMENT_LIMIT, start_at: int = 0):
         """
         Ejecuta una query que no devuelve resultados
-            :param query: Query a ejecutar
+            :param query: Query a ejecutar, o lista de sentencias generada por Scripting
+            :param batch_size: Cantidad de filas por executemany al agrupar sentencias parametrizadas
+            :param commit_every: Hace commit cada esta cantidad de requests (None para un único commit al final)
+            :param multi_statement_limit: Máximo de sentencias sin parámetros por multi-statement request
+            :param start_at: Posición de la lista desde la cual ejecutar (para reanudar un script que falló)
         """
-        c = self.conn.cursor()
         if isinstance(query, list):
-            query_len = len(query)
-            lock_echo = 0
-            self._logger.info(f'Tamaño de la query: {query_len} sentencias')
-            for ix, item in enumerate(query):
-                percent = ix * 100 / query_len
-                if int(percent) % 2 == 0 and int(percent) != lock_echo:
-                    self._logger.info(f'Ejecutando SQL script, {int(percent)}% completado')
-                    lock_echo = int(percent)
+            # teradatasql confirma cada request por defecto: sin autocommit el script es una transacción que
+            # solo se confirma cada commit_every requests (o al final) y se deshace si falla
+            con = self.conn
+            autocommit = con.autocommit
+            c = con.cursor()
+            try:
+                con.autocommit = False
+                self._run_script(c, query, batch_size, commit_every, multi_statement_limit, start_at)
+                con.commit()
+            except BaseException:
                 try:
-                    if len(item['values']) > 0:
-                        c.execute(item['statement'], *list(item['values']))
-                    else:
-                        c.execute(item['statement'])
-                except (pyodbc.ProgrammingError, pyodbc.Error, pyodbc.IntegrityError, UnicodeEncodeError) as e:
-                    self._logger.error(str(e).replace('\\x00', ''))
-                    self._logger.debug(item['statement'])
-                    if len(item['values']) > 0:
-                        self._logger.debug(item['values'])
-                    raise DatabaseError
-
+                    con.rollback()
+                except Exception as e:
+                    self._logger.warning('No se pudo deshacer el script: %s', e)
+                raise
+            finally:
+                c.close()
+                con.autocommit = autocommit
         else:
-            self._logger.debug(f'Ejecutando query: {query}')
+            self._logger.debug('Ejecutando query: %s', query)
+            self.retry_policy.run(self._reconnecting, lambda: self._execute(query), logger=self._logger)
+            self.conn.commit()
+
+    def _execute(self, query: str):
+        c = self.conn.cursor()
+        try:
             c.execute(query)
+        finally:
+            c.close()
+
+    def _run_script(self, c, script: list, batch_size: int, commit_every: Optional[int],
+                    multi_statement_limit: int, start_at: int):
+        plan = plan_script(script[start_at:], batch_size, multi_statement_limit)
+        query_len = len(script) - start_at
+        self._logger.info('Tamaño de la query: %d sentencias en %d requests', query_len, len(plan))
+
+        t_start = perf_counter()
+        executed, lock_echo, pending = 0, 0, 0
+        last_commit = start_at
+        for unit in plan:
+            try:
+                if unit['kind'] == 'batch':
+                    c.executemany(unit['statement'], unit['params'])
+                elif unit['params']:
+                    c.execute(unit['statement'], *list(unit['params']))
+                else:
+                    c.execute(unit['statement'])
+            except (pyodbc.ProgrammingError, pyodbc.Error, pyodbc.IntegrityError, tdOperationalError,
+                    UnicodeEncodeError) as e:
+                position = start_at + unit['first']
+                self._logger.error(str(e).replace('\\x00', ''))
+                self._logger.debug(unit['statement'])
+                if unit['kind'] == 'batch':
+                    self._logger.debug('Lote de %d filas', len(unit['params']))
+                elif unit['params']:
+                    self._logger.debug(unit['params'])
+                raise DatabaseError(
+                    f'Falló la sentencia en la posición {position} del script. '
+                    f'Confirmado hasta la posición {last_commit}, se puede reanudar con start_at={last_commit}'
+                )
+
+            executed = unit['end']
+            pending += 1
+            # solo se confirma en el límite de una sentencia para poder reanudar sin duplicar filas. La DDL
+            # tiene que cerrar su transacción, por lo que se confirma siempre
+            ddl = unit['kind'] == 'single' and not unit['params'] and _is_ddl(unit['statement'])
+            if ddl or (commit_every is not None and pending >= commit_every and unit['complete']):
+                self.conn.commit()
+                last_commit = start_at + unit['end']
+                pending = 0
 
-        c.close()
-        self.conn.commit()
+            percent = int(executed * 100 / query_len)
+            if percent % 2 == 0 and percent != lock_echo:
+                elapsed = perf_counter() - t_start
+                self._logger.info('Ejecutando SQL script, %d%% completado (%.0f sentencias/s)', percent,
+                                  executed / elapsed if elapsed > 0 else 0)
+                lock_echo = percent
 
-    def query(self, query: str, mode: str = 'normal') -> DataFrame:
+        elapsed = perf_counter() - t_start
+        self._logger.info('Script ejecutado: %d sentencias en %d requests, %.2f s (%.0f sentencias/s)',
+                          executed, len(plan), elapsed, executed / elapsed if elapsed > 0 else 0)
+
+    def query(self, query: str, mode: str = 'normal', sessions: Optional[int] = None,
+              dtype_backend: str = 'numpy', optimize_dtypes: bool = False) -> DataFrame:
         """
         Ejecuta una query que devuelve resultados
             :param query: Query a ejecutar
-            :param mode: Modo de ejecución, puede ser 'normal' o 'legacy'
+            :param mode: Modo de ejecución, puede ser 'normal', 'legacy' o 'fastexport'
+            :param sessions: Cantidad de sesiones de FastExport (solo para mode='fastexport')
+            :param dtype_backend: 'numpy' (pd.read_sql) o 'pyarrow': los lotes del cursor se convierten
+                directamente en columnas de Arrow y el DataFrame usa tipos de Arrow
+            :param optimize_dtypes: Reducir la memoria del resultado (ver Utils.optimize_memory)
             :return: DataFrame con los resultados
         """
-        self._logger.debug(f'Ejecutando query: {query}')
-        if mode == 'normal':
-            return pd.read_sql(query, self.engine)
+        self._logger.debug('Ejecutando query: %s', query)
+        if mode == 'fastexport':
+            result = self._query_fastexport(query, sessions, dtype_backend)
         else:
-            return pd.read_sql(query, self.connection)
+            def read():
+                # se resuelve en cada intento: reconnect() reemplaza engine y connection
+                con = self.engine if mode == 'normal' else self.connection
+                return read_sql_arrow(con, query) if dtype_backend == 'pyarrow' else pd.read_sql(query, con)
+
+            result = self.retry_policy.run(self._reconnecting, read, logger=self._logger)
+        if optimize_dtypes:
+            result = optimize_memory(result)
+            self._logger.debug('Tipos optimizados, %d bytes menos', result.attrs['optimize_memory']['bytes_saved'])
+        return result
+
+    def query_iter(self, query: str, chunk_rows: int = DEFAULT_CHUNK_ROWS, mode: str = 'normal',
+                   sessions: Optional[int] = None) -> Iterator[DataFrame]:
+        """
+        Ejecuta una query y devuelve un iterador de DataFrames de hasta chunk_rows filas
+            :param query: Query a ejecutar
+            :param chunk_rows: Cantidad de filas por DataFrame
+            :param mode: 'normal' o 'fastexport'
+            :param sessions: Cantidad de sesiones de FastExport (solo para mode='fastexport')
+            :return: Iterador de DataFrames
+        """
+        self._logger.debug('Ejecutando query: %s', query)
+        if mode != 'fastexport':
+            return super().query_iter(query, chunk_rows)
+        chunks = self._cursor_chunks(self.conn.cursor(), self._fastexport_sql(query, sessions), chunk_rows)
+        return self._log_throughput(chunks, 'FastExport')
+
+    def _log_throughput(self, chunks: Iterator[DataFrame], label: str) -> Iterator[DataFrame]:
+        """
+        Reenvía los chunks e informa en el log las filas/s y MB/s alcanzados al terminar la lectura
+        """
+        t_start = perf_counter()
+        rows, mbytes = 0, 0.0
+        for chunk in chunks:
+            rows += len(chunk)
+            mbytes += chunk.memory_usage(index=False, deep=False).sum() / 1024 ** 2
+            yield chunk
+        self._report_throughput(label, rows, mbytes, perf_counter() - t_start)
+
+    def _report_throughput(self, label: str, rows: int, mbytes: float, elapsed: float):
+        self._logger.info('%s: %d filas en %.2f s (%.0f filas/s, %.1f MB/s)', label, rows, elapsed,
+                          rows / elapsed if elapsed > 0 else 0, mbytes / elapsed if elapsed > 0 else 0,
+                          extra={'rows': rows, 'duration': elapsed})
+
+    @staticmethod
+    def _fastexport_sql(query: str, sessions: Optional[int] = None) -> str:
+        """
+        Antepone las funciones de escape de teradatasql para leer con FastExport.
+        teradata_try_fastexport hace que el driver use la lectura normal si la query no admite FastExport.
+        """
+        escapes = '{fn teradata_try_fastexport}'
+        if sessions is not None:
+            escapes += f'{{fn teradata_sessions({int(sessions)})}}'
+        return escapes + query
+
+    def _query_fastexport(self, query: str, sessions: Optional[int] = None,
+                          dtype_backend: str = 'numpy') -> DataFrame:
+        t_start = perf_counter()
+        if dtype_backend == 'pyarrow':
+            try:
+                result = read_sql_arrow(self.conn, self._fastexport_sql(query, sessions))
+            except tdOperationalError as e:
+                self._logger.warning('No se pudo leer con FastExport, se usa la lectura normal: %s', e)
+                return read_sql_arrow(self.engine, query)
+        else:
+            c = self.conn.cursor()
+            try:
+                c.execute(self._fastexport_sql(query, sessions))
+                columns = [col[0] for col in c.description]
+                result = DataFrame.from_records(c.fetchall(), columns=columns, coerce_float=True)
+            except tdOperationalError as e:
+                self._logger.warning('No se pudo leer con FastExport, se usa la lectura normal: %s', e)
+                return pd.read_sql(query, self.engine)
+            finally:
+                c.close()
+
+        mbytes = result.memory_usage(index=False, deep=False).sum() / 1024 ** 2
+        self._report_throughput('FastExport', len(result), mbytes, perf_counter() - t_start)
+        return result
 
     def current_date(self) -> datetime.date:
         """
@@ -277,6 +659,7 @@ class TeradataML(DatabaseAPI):
             :param schema: Schema de la tabla
             :param table: Nombre de la tabla
         """
+        self.invalidate_metadata(schema, table)
         query = f'DROP TABLE {schema}.{table};'
         self.do(query)
 
@@ -295,9 +678,22 @@ class TeradataML(DatabaseAPI):
             :param schema: Schema de la tabla
             :param table: Nombre de la tabla
         """
-        query = f'SEL TOP 1 * FROM {schema}.{table};'
-        result = self.query(query)
-        return result.columns.tolist()
+        return [name for name, _ in self.table_schema(schema, table)]
+
+    def _read_table_schema(self, schema: str, table: str) -> List[Tuple[str, Optional[str]]]:
+        """
+        Lee las columnas y sus tipos de DBC.ColumnsV
+        """
+        query = f"SEL TRIM(ColumnName) AS ColumnName, TRIM(ColumnType) AS ColumnType FROM DBC.ColumnsV " \
+                f"WHERE DatabaseName = '{schema}' AND TableName = '{table}' ORDER BY ColumnId;"
+        # sin caché de resultados: la definición se guarda en metadata_cache, que se invalida con los DDL
+        result = self.query(query, cache_ttl=0)
+        if result.empty:
+            # la tabla no existe o no es visible en el diccionario: la query falla con el error del motor
+            result = self.query(f'SEL TOP 1 * FROM {schema}.{table};', cache_ttl=0)
+            return [(col, None) for col in result.columns]
+        return [(row.ColumnName, row.ColumnType if isinstance(row.ColumnType, str) else None)
+                for row in result.itertuples(index=False)]
 
     def create_table_like(self, schema: str, table: str, schema_orig: str, table_orig: str):
         """
@@ -307,43 +703,91 @@ class TeradataML(DatabaseAPI):
             :param schema_orig: Schema de la tabla original
             :param table_orig: Nombre de la tabla original
         """
+        self.invalidate_metadata(schema, table)
         query = f'CREATE TABLE {schema}.{table} AS {schema_orig}.{table_orig} WITH NO DATA;'
         self.do(query)
 
     def insert(self, df: DataFrame, schema: str, table: str, pk: str,
-               use_odbc: bool = True, odbc_limit: int = 10000):
+               use_odbc: bool = True, odbc_limit: Optional[int] = None, path: str = 'auto',
+               optimize_dtypes: bool = False):
         """
-        Inserta un DataFrame en una tabla
+        Inserta un DataFrame en una tabla. Con path='auto' se estiman los bytes del DataFrame y se elige
+        el camino (ODBC o fastload) de menor tiempo estimado según el rendimiento medido en cargas anteriores.
             :param df: DataFrame a insertar
             :param schema: Schema de la tabla
             :param table: Nombre de la tabla
             :param pk: Primary key de la tabla
-            :param use_odbc: Usar ODBC para la inserción
-            :param odbc_limit: Límite de filas para usar ODBC
-        """
-        if len(df) <= odbc_limit and use_odbc:
-            parts = chunks_df(df, 5000)
-            total = len(parts)
-            for i, chunk in enumerate(parts):
-                self._logger.info(f'Cargando lote {i+1} de {total}')
+            :param use_odbc: Si es False se fuerza el uso de fastload
+            :param odbc_limit: Máximo de filas para usar ODBC (None para decidir solo por el tiempo estimado)
+            :param path: 'auto', 'odbc' o 'fastload'
+            :param optimize_dtypes: Reducir la memoria del DataFrame antes de cargarlo (ver Utils.optimize_memory).
+                Los enteros no se achican por debajo de int32, que teradataml no sabe mapear.
+        """
+        if path not in ('auto', 'odbc', 'fastload'):
+            raise ValueError(f'Camino de carga no soportado: {path}')
+        if df.empty:
+            return
+
+        host = self._conn_params['host']
+        # el modelo de costo se calibró con el tamaño en memoria de los tipos originales
+        nbytes = estimate_payload_bytes(df)
+        if optimize_dtypes:
+            df = optimize_memory(df, min_int_dtype='int32')
+            self._logger.debug('Tipos optimizados, %d bytes menos', df.attrs['optimize_memory']['bytes_saved'])
+        if not use_odbc or (path == 'auto' and odbc_limit is not None and len(df) > odbc_limit):
+            path = 'fastload'
+        elif path == 'auto':
+            odbc_s = self.throughput.estimate(host, 'odbc', nbytes)
+            fastload_s = self.throughput.estimate(host, 'fastload', nbytes)
+            path = 'odbc' if odbc_s <= fastload_s else 'fastload'
+            self._logger.info('Carga en %s.%s: %d filas, %.1f MB estimados, se elige %s '
+                              '(ODBC %.1f s, fastload %.1f s estimados)', schema, table, len(df),
+                              nbytes / 1024 ** 2, path, odbc_s, fastload_s)
+
+        t_start = perf_counter()
+        if path == 'odbc':
+            batch_rows = odbc_batch_rows(nbytes / len(df))
+            total = -(-len(df) // batch_rows)
+            for i, chunk in enumerate(iter_chunks_df(df, batch_rows)):
+                self._logger.info('Cargando lote %d de %d', i + 1, total)
                 chunk.to_sql(name=table, con=self.engine, schema=schema, if_exists='append', index=False)
         else:
             self.retry_fastload(df, schema, table, pk)
+        elapsed = perf_counter() - t_start
+        mbps = self.throughput.record(host, path, nbytes, elapsed)
+        self._logger.info('Carga por %s en %s.%s: %.1f MB en %.2f s (%.2f MB/s)', path, schema, table,
+                          nbytes / 1024 ** 2, elapsed, mbps)
 
     def upsert(self, df: DataFrame, schema: str, table: str, pk: str,
-               use_odbc: bool = True, odbc_limit: int = 10000, parser_limit: int = 10000):
+               use_odbc: bool = True, odbc_limit: Optional[int] = None, parser_limit: int = 10000,
+               path: str = 'auto'):
         """
         Realiza un upsert en una tabla (insert overwrite)
             :param df: DataFrame a insertar
             :param schema: Schema de la tabla
             :param table: Nombre de la tabla
             :param pk: Primary key de la tabla
-            :param use_odbc: Usar ODBC para la inserción
-            :param odbc_limit: Límite de filas para usar ODBC
+            :param use_odbc: Si es False se fuerza el uso de fastload
+            :param odbc_limit: Máximo de filas para usar ODBC (None para decidir solo por el tiempo estimado)
             :param parser_limit: Límite de filas para el parser
+            :param path: 'auto', 'odbc' o 'fastload' (ver insert)
         """
         self.delete_by_primary_key(df, schema, table, pk, parser_limit)
-        self.insert(df, schema, table, pk, use_odbc, odbc_limit)
+        self.insert(df, schema, table, pk, use_odbc, odbc_limit, path)
+
+    def _delete_by_key_table(self, pks: pd.Series, schema: str, table: str, pk: str):
+        """
+        Carga las claves por FastLoad en una tabla auxiliar y borra con un único DELETE ... IN (SEL ...).
+        No se usa una tabla volátil porque FastLoad abre sus propias sesiones y no la vería.
+        """
+        key_table = _aux_table(table, 'dk')
+        self.retry_fastload(pks.to_frame(name=pk), schema, key_table, pk)
+        try:
+            script = Scripting()
+            script.delete_by_table(schema, table, schema, key_table, pk)
+            self.do(script.statements)
+        finally:
+            self.drop_table_if_exists(schema, key_table)
 
     def get_inserts_from_table(self, schema: str, table: str):
         """
@@ -404,7 +848,8 @@ class TeradataML(DatabaseAPI):
         """
         fastload(df, schema_name=schema, table_name=table, primary_index=pk, index=index)
 
-    def retry_fastload(self, df: DataFrame, schema: str, table: str, pk: str, retries: int = 30, retry_sleep: int = 20):
+    def retry_fastload(self, df: DataFrame, schema: str, table: str, pk: str, retries: int = 30,
+                       retry_sleep: int = 20, retry_policy: Optional[RetryPolicy] = None):
         """
         Realiza un fastload en una tabla con reintentos
             :param df: DataFrame a insertar
@@ -412,26 +857,306 @@ class TeradataML(DatabaseAPI):
             :param table: Nombre de la tabla
             :param pk: Primary key de la tabla
             :param retries: Cantidad de reintentos
-            :param retry_sleep: Tiempo de espera entre reintentos
+            :param retry_sleep: Tiempo de espera máximo entre reintentos (la espera crece exponencialmente desde 1 s)
+            :param retry_policy: Política de reintentos, reemplaza a retries y retry_sleep
         """
+        if retry_policy is None:
+            retry_policy = RetryPolicy(max_attempts=retries, base_delay=1, max_delay=retry_sleep, name='fastload')
         size = len(df)
-        while retries > 0:
-            try:
-                self._logger.info(f'Ejecutando fastload en {schema}.{table} ({size} filas)')
-                self.fastload(df, schema=schema, table=table, pk=pk, index=False)
-                return True
-            except tdOperationalError as e:
-                if '2663' in e:
-                    self._logger.warning(e)
-                    sleep(retry_sleep)
-                    retries -= 1
-                else:
-                    raise e
-        raise DatabaseError('Se superaron todos los reintentos de fastload')
+        self._logger.info('Ejecutando fastload en %s.%s (%d filas)', schema, table, size)
+        try:
+            retry_policy.run(self.fastload, df, schema=schema, table=table, pk=pk, index=False, logger=self._logger)
+        except tdOperationalError as e:
+            if retry_policy.is_retryable(e):
+                raise DatabaseError('Se superaron todos los reintentos de fastload') from e
+            raise e
+        return True
+
+    def td_connect(self, **kwargs):
+        """
+        Abre una conexión nueva de teradatasql (independiente del contexto de teradataml)
+            :param kwargs: Parámetros de conexión adicionales de teradatasql
+            :return: Conexión de teradatasql
+        """
+        params = {
+            'host': self._conn_params['host'],
+            'user': self._conn_params['user'],
+            'password': self._conn_params['pass'],
+            'database': self.schema,
+        }
+        if self.logmech is not None:
+            params['logmech'] = self.logmech
+        params.update(kwargs)
+        return teradatasql.connect(**params)
+
+    def _fastload_partition(self, df: DataFrame, schema: str, table: str, sessions: Optional[int],
+                            batch_size: int) -> int:
+        """
+        Carga un DataFrame por FastLoad en una tabla vacía existente usando una sesión del pool de teradatasql
+            :return: Cantidad de filas cargadas
+        """
+        escapes = '{fn teradata_require_fastload}'
+        if sessions is not None:
+            escapes += f'{{fn teradata_sessions({int(sessions)})}}'
+        statement = f'{escapes}INSERT INTO {schema}.{table} ({", ".join(df.columns)}) ' + \
+            f'VALUES ({", ".join(["?"] * len(df.columns))})'
+
+        con = self.pool.acquire()
+        loaded = False
+        try:
+            con.autocommit = False
+            with con.cursor() as c:
+                # el lote siguiente se convierte en parámetros en un hilo de fondo mientras se envía el actual
+                for batch in iter_chunks_df(df, batch_size, prefetch=1, transform=bind_params_from_dataframe):
+                    c.executemany(statement, batch)
+            con.commit()
+            con.autocommit = True
+            loaded = True
+        finally:
+            # si el FastLoad falló la sesión queda en un estado incierto y no se devuelve al pool
+            self.pool.release(con, discard=not loaded)
+        return len(df)
+
+    def _recreate_staging(self, schema: str, table: str, schema_orig: str, table_orig: str):
+        """
+        Vuelve a crear vacía una tabla staging luego de un FastLoad fallido. Se usa una sesión del pool del hilo
+        que carga la staging, ya que la conexión principal no se puede usar desde varios hilos, y se borra la
+        tabla en lugar de vaciarla porque una tabla con un FastLoad pausado rechaza el DELETE.
+        """
+        self.invalidate_metadata(schema, table)
+        with self.pool.session() as con:
+            with con.cursor() as c:
+                try:
+                    c.execute(f'DROP TABLE {schema}.{table};')
+                except tdOperationalError as e:
+                    # 3807: la tabla no existe
+                    if '3807' not in str(e):
+                        raise
+                c.execute(f'CREATE TABLE {schema}.{table} AS {schema_orig}.{table_orig} WITH NO DATA;')
+
+    def parallel_fastload(self, df: DataFrame, schema: str, table: str, pk: str, partitions: int = 4,
+                          max_workers: Optional[int] = None, sessions_per_partition: Optional[int] = None,
+                          retries: int = 3, retry_sleep: int = 20, batch_size: int = DEFAULT_BATCH_SIZE):
+        """
+        Realiza un fastload en paralelo: divide el DataFrame en particiones, carga cada una por FastLoad en su
+        propia tabla staging (FastLoad exige una tabla vacía) con una sesión independiente y luego las
+        inserta en la tabla destino. Si la tabla destino no existe se crea con la primera partición.
+            :param df: DataFrame a insertar
+            :param schema: Schema de la tabla
+            :param table: Nombre de la tabla
+            :param pk: Primary key de la tabla
+            :param partitions: Cantidad de particiones
+            :param max_workers: Cargas concurrentes, por defecto igual a partitions (limitado por pool_max_size)
+            :param sessions_per_partition: Sesiones de FastLoad por partición (None para el default del driver)
+            :param retries: Reintentos por partición
+            :param retry_sleep: Tiempo de espera entre reintentos
+            :param batch_size: Filas por executemany
+        """
+        size = -(-len(df) // max(partitions, 1))
+        parts = [df.iloc[i:i + size] for i in range(0, len(df), size)] if len(df) > 0 else []
+        if not parts:
+            return True
+
+        try:
+            self.table_columns(schema, table)
+        except (pyodbc.ProgrammingError, teradatasql.OperationalError, OperationalError):
+            self._logger.warning('La tabla destino no existe, se crea con la primera partición')
+            self.retry_fastload(parts[0], schema, table, pk, retries=retries, retry_sleep=retry_sleep)
+            parts = parts[1:]
+
+        stg_tables = [_aux_table(table, f'p{i}') for i in range(len(parts))]
+        retry_policy = RetryPolicy(max_attempts=retries, base_delay=1, max_delay=retry_sleep,
+                                   name='parallel_fastload')
+
+        def load(i):
+            def attempt():
+                t_start = perf_counter()
+                try:
+                    rows = self._fastload_partition(parts[i], schema, stg_tables[i], sessions_per_partition,
+                                                    batch_size)
+                except tdOperationalError:
+                    # la staging tiene que quedar vacía para el próximo intento de FastLoad
+                    self._recreate_staging(schema, stg_tables[i], schema, table)
+                    raise
+                elapsed = perf_counter() - t_start
+                self._logger.info('Partición %d/%d: %d filas en %.2f s (%.0f filas/s)', i + 1, len(parts),
+                                  rows, elapsed, rows / elapsed if elapsed > 0 else 0)
+                return rows
+
+            return retry_policy.run(attempt, logger=self._logger)
+
+        t_start = perf_counter()
+        try:
+            for stg_table in stg_tables:
+                self.create_table_like(schema, stg_table, schema, table)
+            with ThreadPoolExecutor(max_workers=max_workers or min(len(parts), self.pool_max_size)) as executor:
+                total = sum(executor.map(load, range(len(parts))))
+            elapsed = perf_counter() - t_start
+            self._logger.info('Fastload paralelo en %s.%s: %d filas en %.2f s (%.0f filas/s)', schema, table,
+                              total, elapsed, total / elapsed if elapsed > 0 else 0)
+
+            script = Scripting()
+            for stg_table in stg_tables:
+                script.insert_from_table(schema, stg_table, schema, table)
+            self.do(script.statements)
+        finally:
+            for stg_table in stg_tables:
+                self.drop_table_if_exists(schema, stg_table)
+        return True
+
+    def _load_csv_file(self, path: str, schema: str, table: str, columns: List[str], fastload: bool,
+                       sessions: Optional[int], field_sep: str, field_quote: str) -> Tuple[Optional[int], List[str]]:
+        """
+        Carga un CSV con teradata_read_csv en una sesión del pool: el driver lee el archivo y envía las filas
+        por FastLoad (en una tabla vacía) o como batch insert, sin pasar por pandas
+            :return: Filas cargadas por FastLoad (None en batch insert) y advertencias y errores informados
+                por FastLoad (filas rechazadas)
+        """
+        escapes = f'{{fn teradata_read_csv({path})}}'
+        if fastload:
+            escapes += '{fn teradata_require_fastload}'
+            if sessions is not None:
+                escapes += f'{{fn teradata_sessions({int(sessions)})}}'
+        if field_sep != ',':
+            escapes += f'{{fn teradata_field_sep({field_sep})}}'
+        if field_quote != '"':
+            escapes += f'{{fn teradata_field_quote({field_quote})}}'
+        statement = f'{escapes}INSERT INTO {schema}.{table} ({", ".join(columns)}) ' + \
+            f'VALUES ({", ".join(["?"] * len(columns))})'
+
+        con = self.pool.acquire()
+        loaded = False
+        messages = []
+        try:
+            con.autocommit = False
+            with con.cursor() as c:
+                c.execute(statement)
+                if fastload:
+                    for escape in ('teradata_get_warnings', 'teradata_get_errors'):
+                        c.execute(f'{{fn teradata_nativesql}}{{fn {escape}}}{statement}')
+                        messages += [str(row[0]) for row in c.fetchall()]
+            con.commit()
+            con.autocommit = True
+            loaded = True
+            rows = None
+            if fastload:
+                with con.cursor() as c:
+                    c.execute(f'SEL COUNT(*) FROM {schema}.{table};')
+                    rows = int(c.fetchone()[0])
+        finally:
+            # si la carga falló la sesión queda en un estado incierto y no se devuelve al pool
+            self.pool.release(con, discard=not loaded)
+        return rows, messages
+
+    def load_csv(self, path: Union[str, List[str]], schema: str, table: str, fastload: bool = True,
+                 max_workers: Optional[int] = None, sessions_per_file: Optional[int] = None, field_sep: str = ',',
+                 field_quote: str = '"', encoding: str = 'utf-8', retries: int = 3, retry_sleep: int = 20) -> dict:
+        """
+        Carga uno o más archivos CSV en una tabla existente sin leerlos con pandas: el driver teradatasql lee
+        cada archivo y lo envía por FastLoad. Cada archivo se carga en paralelo en su propia tabla staging
+        (FastLoad exige una tabla vacía) y luego se insertan todas en la tabla destino.
+        La primera línea de cada archivo debe tener los nombres de las columnas.
+            :param path: Ruta, patrón glob (ej: 'datos/*.csv') o lista de rutas/patrones
+            :param schema: Schema de la tabla
+            :param table: Nombre de la tabla (debe existir)
+            :param fastload: Si es False cada archivo se inserta directamente en la tabla destino como batch
+                insert (conviene para archivos chicos)
+            :param max_workers: Archivos cargados en paralelo, por defecto uno por archivo (limitado por
+                pool_max_size)
+            :param sessions_per_file: Sesiones de FastLoad por archivo (None para el default del driver)
+            :param field_sep: Separador de campos
+            :param field_quote: Carácter de comillas
+            :param encoding: Codificación de los archivos (para leer el encabezado)
+            :param retries: Reintentos por archivo
+            :param retry_sleep: Tiempo máximo de espera entre reintentos
+            :return: Diccionario con las filas leídas ('rows'), cargadas ('loaded') y rechazadas ('rejected'),
+                los mensajes de FastLoad ('errors') y el detalle por archivo ('files')
+        """
+        patterns = [path] if isinstance(path, str) else list(path)
+        files = []
+        for pattern in patterns:
+            matches = sorted(glob.glob(pattern))
+            if not matches:
+                raise FileNotFoundError(f'No hay archivos que coincidan con {pattern}')
+            files += [match for match in matches if match not in files]
+
+        headers = []
+        for file in files:
+            with open(file, newline='', encoding=encoding) as fp:
+                headers.append([col.strip() for col in next(csv.reader(fp, delimiter=field_sep,
+                                                                       quotechar=field_quote), [])])
+        columns = headers[0]
+        if not columns or any([col.lower() for col in header] != [col.lower() for col in columns]
+                              for header in headers):
+            raise ValueError('Todos los archivos deben tener el mismo encabezado con los nombres de las columnas')
+        try:
+            self.table_columns(schema, table)
+        except (pyodbc.ProgrammingError, teradatasql.OperationalError, OperationalError):
+            raise DatabaseError(f'La tabla {schema}.{table} debe existir para cargar archivos CSV')
+
+        targets = [_aux_table(table, f'c{i}') for i in range(len(files))] if fastload else [table] * len(files)
+
+        retry_policy = RetryPolicy(max_attempts=retries, base_delay=1, max_delay=retry_sleep, name='load_csv')
+
+        def load(i):
+            def attempt():
+                try:
+                    return self._load_csv_file(files[i], schema, targets[i], columns, fastload, sessions_per_file,
+                                               field_sep, field_quote)
+                except tdOperationalError:
+                    if fastload:
+                        # la staging tiene que quedar vacía para el próximo intento de FastLoad
+                        self._recreate_staging(schema, targets[i], schema, table)
+                    raise
+
+            t_start = perf_counter()
+            loaded, messages = retry_policy.run(attempt, logger=self._logger)
+            rows = _count_csv_rows(files[i])
+            if loaded is None:
+                # el batch insert es atómico: si una fila falla se rechaza el archivo completo
+                loaded = rows
+            elapsed = perf_counter() - t_start
+            self._logger.info('%s: %d filas cargadas, %d rechazadas en %.2f s (%.0f filas/s)', files[i], loaded,
+                              max(rows - loaded, 0), elapsed, loaded / elapsed if elapsed > 0 else 0)
+            return {'path': files[i], 'rows': rows, 'loaded': loaded, 'rejected': max(rows - loaded, 0),
+                    'errors': messages}
+
+        t_start = perf_counter()
+        try:
+            if fastload:
+                for stg_table in targets:
+                    self.create_table_like(schema, stg_table, schema, table)
+            with ThreadPoolExecutor(max_workers=max_workers or min(len(files), self.pool_max_size)) as executor:
+                results = list(executor.map(load, range(len(files))))
+            if fastload:
+                script = Scripting()
+                for stg_table in targets:
+                    script.insert_from_table(schema, stg_table, schema, table)
+                self.do(script.statements)
+        finally:
+            if fastload:
+                for stg_table in targets:
+                    self.drop_table_if_exists(schema, stg_table)
+
+        summary = {
+            'rows': sum(result['rows'] for result in results),
+            'loaded': sum(result['loaded'] for result in results),
+            'rejected': sum(result['rejected'] for result in results),
+            'errors': [message for result in results for message in result['errors']],
+            'files': results,
+        }
+        elapsed = perf_counter() - t_start
+        self._logger.info('Carga de %d archivos CSV en %s.%s: %d filas cargadas, %d rechazadas en %.2f s '
+                          '(%.0f filas/s)', len(files), schema, table, summary['loaded'], summary['rejected'],
+                          elapsed, summary['loaded'] / elapsed if elapsed > 0 else 0)
+        if summary['rejected']:
+            self._logger.warning('FastLoad rechazó %d filas: %s', summary['rejected'], summary['errors'])
+        return summary
 
     def diff(self, schema_src: str, table_src: str, schema_dst: str, table_dst: str) -> DataFrame:
         """
-        Devuelve un DataFrame con las diferencias entre dos tablas
+        Devuelve un DataFrame con las filas del origen que no están en el destino. Para tablas grandes
+        hash_diff compara hashes en el motor y solo trae las claves que difieren.
             :param schema_src: Schema de la tabla origen
             :param table_src: Nombre de la tabla origen
             :param schema_dst: Schema de la tabla destino
@@ -441,14 +1166,38 @@ class TeradataML(DatabaseAPI):
         difference = self.query(query)
         return difference
 
-    def _get_named_cols(self, schema_stg: str, table_stg: str, schema_dst: str, table_dst: str, prefix: str):
+    def _row_hash_sql(self, columns: List[str]) -> str:
+        # HASHROW da el mismo hash para NULL, 0 y '': cada grupo de columnas lleva además un string con un
+        # indicador de NULL por columna. HASHROW admite una cantidad limitada de argumentos, por lo que en
+        # tablas anchas se combinan los hashes de los grupos.
+        size = HASHROW_MAX_ARGS - 1
+        groups = [columns[i:i + size] for i in range(0, len(columns), size)]
+        hashes = []
+        for group in groups:
+            nulls = ' || '.join(f"CASE WHEN {col} IS NULL THEN '1' ELSE '0' END" for col in group)
+            hashes.append(f'HASHROW({", ".join(group)}, {nulls})')
+        row_hash = hashes[0] if len(hashes) == 1 else f'HASHROW({", ".join(hashes)})'
+        # los 4 bytes del hash como entero sin signo (0 a 2^32 - 1): la suma de 2 mil millones de filas entra
+        # en un BIGINT
+        return f"CAST(TO_NUMBER(FROM_BYTES({row_hash}, 'base16'), 'XXXXXXXX') AS BIGINT)"
+
+    def _bucket_sql(self, keys: List[str], buckets: int) -> str:
+        return f'HASHBUCKET(HASHROW({", ".join(keys)})) MOD {int(buckets)}'
+
+    def _target_columns(self, schema_stg: str, table_stg: str, schema_dst: str, table_dst: str) -> List[str]:
+        """
+        Devuelve las columnas de la tabla destino, creándola a partir de la staging si no existe
+        """
         try:
-            columns = self.table_columns(schema_dst, table_dst)
+            return self.table_columns(schema_dst, table_dst)
         except (pyodbc.ProgrammingError, teradatasql.OperationalError, OperationalError):
             self._logger.warning('La tabla destino no existe, creando DDL por inferencia de tipos de datos')
             columns = self.table_columns(schema_stg, table_stg)
             self.create_table_like(schema_dst, table_dst, schema_stg, table_stg)
+            return columns
 
+    def _get_named_cols(self, schema_stg: str, table_stg: str, schema_dst: str, table_dst: str, prefix: str):
+        columns = self._target_columns(schema_stg, table_stg, schema_dst, table_dst)
         return [f'{prefix}.{x}' for x in columns]
 
     def drop_table_if_exists(self, schema: str, table: str):
@@ -461,8 +1210,93 @@ class TeradataML(DatabaseAPI):
             self.drop_table(schema, table)
         except (pyodbc.ProgrammingError, teradatasql.OperationalError):
             pass
+        # si era una staging de la sesión hay que volver a crearla en la próxima carga
+        self._session_staging = {key for key in self._session_staging
+                                 if key[1:] != (str(schema).lower(), table.lower())}
 
-    def staging_insert(self, df: DataFrame, schema_stg: str, table_stg: str, schema_dst: str, table_dst: str, pk: str):
+    def _session_staging_table(self, staging: str, schema_stg: str, table_stg: str, schema_dst: str,
+                               table_dst: str, keys: List[str]) -> Tuple[Optional[str], str]:
+        """
+        Devuelve la tabla staging volátil o temporal global de la sesión, creándola con la estructura de la
+        tabla destino solo la primera vez. La temporal global lleva el sufijo _gtt para no compartir el nombre
+        con la staging permanente (que se borra y recrea con FastLoad en cada carga)
+        """
+        stg_schema = None if staging == 'volatile' else schema_stg
+        if staging == 'global_temporary':
+            table_stg = f'{table_stg}_gtt'
+        key = (staging, str(stg_schema).lower(), table_stg.lower())
+        if key not in self._session_staging:
+            kind = 'VOLATILE' if staging == 'volatile' else 'GLOBAL TEMPORARY'
+            ddl = f'CREATE {kind} TABLE {_qualified(stg_schema, table_stg)} AS ' \
+                  f'(SELECT * FROM {schema_dst}.{table_dst}) WITH NO DATA ' \
+                  f'PRIMARY INDEX ({", ".join(keys)}) ON COMMIT PRESERVE ROWS;'
+            try:
+                self.do(ddl)
+            except (pyodbc.Error, tdOperationalError) as e:
+                # 3803: la tabla ya existe (la temporal global es permanente, solo sus filas son de la sesión)
+                if '3803' not in str(e):
+                    raise
+                self._check_session_staging(stg_schema, table_stg, schema_dst, table_dst, ddl)
+            self._session_staging.add(key)
+        return stg_schema, table_stg
+
+    def _check_session_staging(self, schema_stg: Optional[str], table_stg: str, schema_dst: str, table_dst: str,
+                               ddl: str):
+        """
+        Compara las columnas de una temporal global ya existente con las de la tabla destino y, si la estructura
+        del destino cambió, la vuelve a crear para no cargar en una staging desactualizada. Una volátil que ya
+        existe en la sesión no figura en el diccionario, por lo que se vuelve a crear siempre.
+        """
+        if schema_stg is None:
+            self.do(f'DROP TABLE {table_stg};')
+            self.do(ddl)
+            return
+        self.invalidate_metadata(schema_stg, table_stg)
+        self.invalidate_metadata(schema_dst, table_dst)
+        existing = [(name.lower(), kind) for name, kind in self.table_schema(schema_stg, table_stg)]
+        expected = [(name.lower(), kind) for name, kind in self.table_schema(schema_dst, table_dst)]
+        if existing != expected:
+            self._logger.warning('La estructura de %s.%s cambió, se vuelve a crear la staging %s.%s', schema_dst,
+                                 table_dst, schema_stg, table_stg)
+            self.drop_table(schema_stg, table_stg)
+            self.do(ddl)
+
+    def _load_staging(self, df: DataFrame, schema_stg: str, table_stg: str, schema_dst: str, table_dst: str,
+                      keys: List[str], staging: str) -> Tuple[Optional[str], str, str]:
+        """
+        Carga el DataFrame en la tabla staging
+            :param staging: 'permanent' (tabla nueva por FastLoad en cada carga), 'volatile' o 'global_temporary'
+                (tabla de la sesión que se crea una sola vez y se vacía y carga por lotes en la misma sesión)
+            :return: Schema (None para la volátil) y nombre de la tabla staging, y el modo usado
+        """
+        if staging not in ('permanent', 'volatile', 'global_temporary'):
+            raise ValueError(f'Modo de staging no soportado: {staging}')
+        if staging != 'permanent':
+            try:
+                self.table_columns(schema_dst, table_dst)
+            except (pyodbc.ProgrammingError, teradatasql.OperationalError, OperationalError):
+                self._logger.warning('La tabla destino no existe, se usa una staging permanente para crearla')
+                staging = 'permanent'
+
+        if staging == 'permanent':
+            self.drop_table_if_exists(schema_stg, table_stg)
+            self.retry_fastload(df, schema_stg, table_stg, keys if len(keys) > 1 else keys[0])
+            return schema_stg, table_stg, staging
+
+        stg_schema, stg_table = self._session_staging_table(staging, schema_stg, table_stg, schema_dst, table_dst,
+                                                            keys)
+        script = Scripting()
+        script.add_statement(f'DELETE FROM {_qualified(stg_schema, stg_table)} ALL;')
+        script.insert_batch(df, stg_schema, stg_table, lossless=True)
+        self.do(script.statements)
+        return stg_schema, stg_table, staging
+
+    def _drop_staging(self, schema_stg: Optional[str], table_stg: str, staging: str):
+        if staging == 'permanent':
+            self.drop_table_if_exists(schema_stg, table_stg)
+
+    def staging_insert(self, df: DataFrame, schema_stg: str, table_stg: str, schema_dst: str, table_dst: str, pk: str,
+                       staging: str = 'permanent'):
         """
         Realiza una carga incremental en una tabla
             :param df: DataFrame a insertar
@@ -471,21 +1305,23 @@ class TeradataML(DatabaseAPI):
             :param schema_dst: Schema de la tabla destino
             :param table_dst: Nombre de la tabla destino
             :param pk: Primary key de la tabla
+            :param staging: 'permanent', 'volatile' o 'global_temporary' (ver _load_staging)
         """
-        self.drop_table_if_exists(schema_stg, table_stg)
-        self.retry_fastload(df, schema_stg, table_stg, pk)
-
-        named_columns = self._get_named_cols(schema_stg, table_stg, schema_dst, table_dst, 'stg')
-        query = f'INSERT INTO {schema_dst}.{table_dst} SELECT {", ".join(named_columns)} ' + \
-            f'FROM {schema_stg}.{table_stg} stg ' + \
-            f'LEFT JOIN {schema_dst}.{table_dst} prd ON prd.{pk} = stg.{pk} ' + \
-            f'WHERE prd.{pk} IS NULL;'
-
-        self.do(query)
-        self.drop_table(schema_stg, table_stg)
+        stg_schema, stg_table, staging = self._load_staging(df, schema_stg, table_stg, schema_dst, table_dst,
+                                                            [pk], staging)
+        try:
+            named_columns = self._get_named_cols(stg_schema, stg_table, schema_dst, table_dst, 'stg')
+            query = f'INSERT INTO {schema_dst}.{table_dst} SELECT {", ".join(named_columns)} ' + \
+                f'FROM {_qualified(stg_schema, stg_table)} stg ' + \
+                f'LEFT JOIN {schema_dst}.{table_dst} prd ON prd.{pk} = stg.{pk} ' + \
+                f'WHERE prd.{pk} IS NULL;'
+            self.do(query)
+        finally:
+            self._drop_staging(stg_schema, stg_table, staging)
 
     def staging_upsert(self, df: DataFrame, schema_stg: str, table_stg: str, schema_dst: str,
-                       table_dst: str, pk: str, parser_limit: int = 10000):
+                       table_dst: str, pk: Union[str, List[str]], parser_limit: int = 10000,
+                       mode: str = 'delete_insert', staging: str = 'permanent'):
         """
             Realiza un upsert (insert overwrite) incremental en una tabla
             :param df: DataFrame a insertar
@@ -493,21 +1329,40 @@ class TeradataML(DatabaseAPI):
             :param table_stg: Nombre de la tabla staging
             :param schema_dst: Schema de la tabla destino
             :param table_dst: Nombre de la tabla destino
-            :param pk: Primary key de la tabla
-            :param parser_limit: Límite de filas para el parser
+            :param pk: Primary key de la tabla, simple o compuesta ('a, b' o ['a', 'b'])
+            :param parser_limit: Límite de filas para el parser (solo en modo 'delete_insert')
+            :param mode: 'delete_insert' (por defecto) borra las claves y vuelve a insertar, 'merge' actualiza e
+                inserta desde la staging con un único MERGE (la clave debe incluir el primary index de la tabla
+                destino)
+            :param staging: 'permanent', 'volatile' o 'global_temporary' (ver _load_staging)
         """
-        self.drop_table_if_exists(schema_stg, table_stg)
-        self.retry_fastload(df, schema_stg, table_stg, pk)
-        self.delete_by_primary_key(df, schema_dst, table_dst, pk, parser_limit)
+        if mode not in ('merge', 'delete_insert'):
+            raise ValueError(f'Modo de upsert no soportado: {mode}')
 
-        named_columns = self._get_named_cols(schema_stg, table_stg, schema_dst, table_dst, 'stg')
-        query = f'INSERT INTO {schema_dst}.{table_dst} SELECT {", ".join(named_columns)} ' + \
-            f'FROM {schema_stg}.{table_stg} stg ' + \
-            f'LEFT JOIN {schema_dst}.{table_dst} prd ON prd.{pk} = stg.{pk} ' + \
-            f'WHERE prd.{pk} IS NULL;'
-
-        self.do(query)
-        self.drop_table(schema_stg, table_stg)
+        keys = _key_columns(pk)
+        stg_schema, stg_table, staging = self._load_staging(df, schema_stg, table_stg, schema_dst, table_dst,
+                                                            keys, staging)
+        stg_name = _qualified(stg_schema, stg_table)
+        try:
+            script = Scripting()
+            if mode == 'merge':
+                columns = self._target_columns(stg_schema, stg_table, schema_dst, table_dst)
+                script.merge_from_table(schema_dst, table_dst, stg_schema, stg_table, keys, columns)
+            else:
+                if len(keys) == 1:
+                    self.delete_by_primary_key(df, schema_dst, table_dst, keys[0], parser_limit)
+                else:
+                    script.add_statement(f'DELETE FROM {schema_dst}.{table_dst} WHERE ({", ".join(keys)}) IN '
+                                         f'(SEL {", ".join(keys)} FROM {stg_name});')
+                named_columns = self._get_named_cols(stg_schema, stg_table, schema_dst, table_dst, 'stg')
+                on = ' AND '.join(f'prd.{k} = stg.{k}' for k in keys)
+                script.add_statement(f'INSERT INTO {schema_dst}.{table_dst} SELECT {", ".join(named_columns)} '
+                                     f'FROM {stg_name} stg '
+                                     f'LEFT JOIN {schema_dst}.{table_dst} prd ON {on} '
+                                     f'WHERE prd.{keys[0]} IS NULL;')
+            self.do(script.statements)
+        finally:
+            self._drop_staging(stg_schema, stg_table, staging)
 
 
 class Teradata(TeradataML):
@@ -0,0 +1,121 @@
+import json
+import os
+import threading
+from typing import Optional, Dict
+
+from pandas import DataFrame
+
+# Valores iniciales del modelo de costo mientras no haya mediciones: (segundos fijos, MB/s)
+DEFAULT_PATH_COSTS = {
+    'odbc': (0.2, 0.5),
+    'fastload': (10.0, 20.0),
+}
+
+ODBC_BATCH_BYTES = 1024 ** 2  # bytes objetivo por lote de ODBC
+ODBC_MIN_BATCH_ROWS = 100
+ODBC_MAX_BATCH_ROWS = 50000
+
+
+def estimate_payload_bytes(df: DataFrame, sample_rows: int = 1000) -> int:
+    """
+    Estima los bytes de un DataFrame a partir de una muestra de filas (incluye el largo de los strings)
+        :param df: DataFrame a cargar
+        :param sample_rows: Filas de la muestra
+    """
+    if len(df) == 0:
+        return 0
+    sample = df.iloc[:sample_rows]
+    sample_bytes = int(sample.memory_usage(index=False, deep=True).sum())
+    return int(sample_bytes * len(df) / len(sample))
+
+
+def odbc_batch_rows(row_bytes: float, batch_bytes: int = ODBC_BATCH_BYTES) -> int:
+    """
+    Filas por lote de ODBC para que cada request tenga alrededor de batch_bytes
+    """
+    if row_bytes <= 0:
+        return ODBC_MAX_BATCH_ROWS
+    return int(min(max(batch_bytes / row_bytes, ODBC_MIN_BATCH_ROWS), ODBC_MAX_BATCH_ROWS))
+
+
+class ThroughputHistory:
+    """
+    Historial local del rendimiento de cada camino de carga (ODBC, fastload) por servidor.
+    El costo estimado de una carga es: segundos fijos + MB / (MB/s), donde los MB/s son un promedio móvil
+    exponencial de las cargas anteriores. Solo si se indica un archivo se guarda en JSON para usarlo entre
+    ejecuciones, si no el historial queda en memoria.
+    """
+
+    def __init__(self, path: Optional[str] = None, alpha: float = 0.3):
+        """
+            :param path: Archivo del historial, por defecto el de la variable de entorno LIBGAL_THROUGHPUT_FILE
+                (sin ninguno de los dos el historial no se guarda)
+            :param alpha: Peso de la última medición en el promedio móvil
+        """
+        self.path = path if path is not None else os.environ.get('LIBGAL_THROUGHPUT_FILE')
+        self.alpha = alpha
+        self._history: Optional[Dict[str, dict]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, dict]:
+        if self._history is None:
+            self._history = {}
+            if self.path and os.path.exists(self.path):
+                try:
+                    with open(self.path, encoding='utf-8') as fp:
+                        self._history = json.load(fp)
+                except (OSError, ValueError):
+                    self._history = {}
+        return self._history
+
+    def _save(self):
+        if not self.path:
+            return
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(tmp_path, mode='w', encoding='utf-8') as fp:
+                json.dump(self._history, fp, indent=2)
+            os.replace(tmp_path, self.path)
+        except (OSError, TypeError, ValueError):
+            # el historial es una optimización, si no se puede guardar se sigue con los valores en memoria
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def costs(self, host: str, path: str):
+        """
+        Devuelve (segundos fijos, MB/s) del camino de carga
+        """
+        overhead, mbps = DEFAULT_PATH_COSTS[path]
+        with self._lock:
+            entry = self._load().get(f'{host}:{path}')
+        if entry is not None:
+            mbps = entry['mbps']
+        return overhead, mbps
+
+    def estimate(self, host: str, path: str, nbytes: int) -> float:
+        """
+        Segundos estimados para cargar nbytes por el camino indicado
+        """
+        overhead, mbps = self.costs(host, path)
+        return overhead + nbytes / 1024 ** 2 / mbps
+
+    def record(self, host: str, path: str, nbytes: int, seconds: float) -> float:
+        """
+        Registra una carga y devuelve los MB/s obtenidos (descontando los segundos fijos del camino)
+        """
+        overhead = DEFAULT_PATH_COSTS[path][0]
+        mbps = nbytes / 1024 ** 2 / max(seconds - overhead, seconds / 2, 1e-3)
+        key = f'{host}:{path}'
+        with self._lock:
+            history = self._load()
+            entry = history.get(key)
+            if entry is None:
+                history[key] = {'mbps': mbps, 'loads': 1}
+            else:
+                entry['mbps'] = (1 - self.alpha) * entry['mbps'] + self.alpha * mbps
+                entry['loads'] += 1
+            self._save()
+        return nbytes / 1024 ** 2 / seconds if seconds > 0 else 0.0
@@ -1,6 +1,8 @@
 import hashlib
+import queue
 import string
-from typing import Optional, List
+import threading
+from typing import Callable, Iterator, Optional, List
 from pandas import DataFrame
 import numpy as np
 import pandas as pd
@@ -46,11 +48,155 @@ def chunks_df(df: DataFrame, n: int) -> List[DataFrame]:
         :param df: el dataframe
         :param n: el tamaño de las porciones
         :return: el dataframe dividido en porciones de tamaño n
+        Genera todas las porciones de una vez y su tamaño es aproximado, para cargas grandes conviene iter_chunks_df.
     """
     chunk_size = max(int(len(df) / n), 1)
     return np.array_split(df, chunk_size)
 
 
+class _PrefetchError:
+
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+_PREFETCH_DONE = object()
+
+
+def _prefetch(items: Iterator, size: int) -> Iterator:
+    """
+        Esta función consume un iterador en un hilo de fondo, manteniendo hasta size elementos listos.
+        :param items: el iterador
+        :param size: la cantidad de elementos a preparar por adelantado
+        :return: un iterador con los mismos elementos
+    """
+    ready = queue.Queue(maxsize=size)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                ready.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+            put(_PREFETCH_DONE)
+        except BaseException as e:
+            put(_PrefetchError(e))
+
+    threading.Thread(target=produce, name='libgal-prefetch', daemon=True).start()
+    try:
+        while True:
+            item = ready.get()
+            if item is _PREFETCH_DONE:
+                return
+            if isinstance(item, _PrefetchError):
+                raise item.exc
+            yield item
+    finally:
+        # si el consumidor corta la iteración el hilo deja de producir
+        stop.set()
+
+
+def iter_chunks_df(df: DataFrame, rows: Optional[int] = None, target_bytes: Optional[int] = None,
+                   prefetch: int = 0, transform: Optional[Callable[[DataFrame], object]] = None) -> Iterator:
+    """
+        Esta función recorre un dataframe por porciones sin copiarlo: cada porción es una vista df.iloc[i:i + n]
+        que se genera recién cuando se pide, por lo que la memoria no crece con la cantidad de porciones.
+        :param df: el dataframe
+        :param rows: la cantidad exacta de filas de cada porción (la última puede ser menor)
+        :param target_bytes: en lugar de rows, los bytes aproximados de cada porción (se estima el tamaño de las
+            filas con una muestra)
+        :param prefetch: la cantidad de porciones a preparar por adelantado en un hilo de fondo (0 para no usarlo)
+        :param transform: una función que se aplica a cada porción antes de entregarla (en el hilo de fondo si
+            se usa prefetch), por ejemplo para convertirla en parámetros de un INSERT
+        :return: un iterador de porciones del dataframe (o de lo que devuelva transform)
+    """
+    if (rows is None) == (target_bytes is None):
+        raise ValueError('Se debe indicar rows o target_bytes')
+    if target_bytes is not None:
+        sample = df.iloc[:1000]
+        row_bytes = sample.memory_usage(index=False, deep=True).sum() / len(sample) if len(sample) > 0 else 1
+        rows = int(target_bytes / row_bytes) if row_bytes > 0 else len(df)
+    rows = max(int(rows), 1)
+
+    def generate():
+        for i in range(0, len(df), rows):
+            chunk = df.iloc[i:i + rows]
+            yield transform(chunk) if transform is not None else chunk
+
+    if prefetch > 0:
+        return _prefetch(generate(), prefetch)
+    return generate()
+
+
+def optimize_memory(df: DataFrame, category_ratio: float = 0.5, string_dtype: bool = True,
+                    min_int_dtype: str = 'int8') -> DataFrame:
+    """
+        Esta función reduce la memoria de un dataframe: achica los enteros al menor tipo que admite sus valores,
+        pasa a float32 los float64 que no pierden precisión, convierte en categóricas las columnas de texto con
+        pocos valores distintos y usa el tipo string de Arrow para el resto de las columnas de texto.
+        El detalle queda en result.attrs['optimize_memory'] (bytes antes, después, ahorrados y tipos cambiados).
+        :param df: el dataframe
+        :param category_ratio: proporción máxima de valores distintos sobre filas para usar una categórica
+            (None para no usar categóricas)
+        :param string_dtype: usar el tipo string de Arrow para el texto (requiere pyarrow)
+        :param min_int_dtype: el menor tipo entero a usar (ej: 'int32' si el destino no admite enteros chicos)
+        :return: un nuevo dataframe con los tipos optimizados
+    """
+    if string_dtype:
+        try:
+            import pyarrow
+        except ImportError:
+            string_dtype = False
+
+    min_int_bits = np.iinfo(min_int_dtype).bits
+    result = df.copy(deep=False)
+    changes = {}
+    for i, name in enumerate(df.columns):
+        col = df.iloc[:, i]
+        new = col
+        if pd.api.types.is_signed_integer_dtype(col) and not pd.api.types.is_extension_array_dtype(col):
+            if len(col) > 0:
+                lower, upper = col.min(), col.max()
+                for dtype in (np.int8, np.int16, np.int32):
+                    info = np.iinfo(dtype)
+                    if info.bits >= min_int_bits and info.bits < col.dtype.itemsize * 8 and \
+                            info.min <= lower and upper <= info.max:
+                        new = col.astype(dtype)
+                        break
+        elif col.dtype == np.float64:
+            candidate = col.astype(np.float32)
+            if np.array_equal(candidate.to_numpy(dtype=np.float64), col.to_numpy(), equal_nan=True):
+                new = candidate
+        elif col.dtype == object and pd.api.types.infer_dtype(col, skipna=True) == 'string':
+            distinct, present = col.nunique(dropna=True), col.count()
+            if category_ratio is not None and present > 0 and distinct <= present * category_ratio:
+                new = col.astype('category')
+            elif string_dtype:
+                new = col.astype(pd.StringDtype('pyarrow'))
+        if new is not col:
+            result.isetitem(i, new)
+            changes[str(name)] = f'{col.dtype} -> {new.dtype}'
+
+    bytes_before = int(df.memory_usage(index=True, deep=True).sum())
+    bytes_after = int(result.memory_usage(index=True, deep=True).sum())
+    result.attrs['optimize_memory'] = {
+        'bytes_before': bytes_before,
+        'bytes_after': bytes_after,
+        'bytes_saved': bytes_before - bytes_after,
+        'columns': changes,
+    }
+    return result
+
+
 def remove_non_latin1(a_str: Optional[str]) -> Optional[str]:
     """
         Esta función elimina los caracteres no latin1 del string.
@@ -132,10 +278,11 @@ def hash_primary_key(
         return f"{int(unix_epoch)}_{sha256_string_hash_hex[0:trim]}"
 
 
-def generate_dataframe(num_rows=1000000):
+def generate_dataframe(num_rows=1000000, optimize_dtypes=False):
     """
         Esta función genera un dataframe de prueba con datos aleatorios.
         :param num_rows: la cantidad de filas del dataframe
+        :param optimize_dtypes: reducir la memoria del dataframe con optimize_memory
         :return: el dataframe de prueba
     """
     nombres_animales = ['áspid', 'colibrí', 'tejón', 'mújol', 'tálamo', 'coendú', 'vicuña', 'ñandú', 'alacrán',
@@ -202,6 +349,8 @@ def generate_dataframe(num_rows=1000000):
     # Crear DataFrame
     df = pd.DataFrame(dict_df)
 
+    if optimize_dtypes:
+        return optimize_memory(df)
     return df
 
 
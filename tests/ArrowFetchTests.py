@@ -0,0 +1,74 @@
+import os
+import unittest
+from time import perf_counter
+
+import pandas as pd
+from libgal.modules.ODBCTools import load_table
+from libgal.modules.Sqlite import Sqlite
+from libgal.modules.Utils import generate_dataframe
+
+# Filas del benchmark (se puede ajustar por variable de entorno)
+BENCHMARK_ROWS = int(os.environ.get('LIBGAL_ARROW_BENCHMARK_ROWS', '50000'))
+
+test_df = generate_dataframe(num_rows=BENCHMARK_ROWS)
+sql = Sqlite(dbfile='arrow_fetch_test.db')
+sql.drop_tables(['arrow_table', 'mixed_table'])
+sql.insert(test_df, None, 'arrow_table', 'Log_Id')
+
+
+def tearDownModule():
+    sql.connection.close()
+    sql.engine.dispose()
+    os.remove('arrow_fetch_test.db')
+
+
+def best_of(func, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        t_start = perf_counter()
+        func()
+        timings.append(perf_counter() - t_start)
+    return min(timings)
+
+
+class ArrowFetchTests(unittest.TestCase):
+
+    def test_arrow_dtypes(self):
+        result = sql.query('SELECT * FROM arrow_table ORDER BY Log_Id;', dtype_backend='pyarrow')
+        assert all(isinstance(dtype, pd.ArrowDtype) for dtype in result.dtypes), 'Hay columnas sin tipo de Arrow'
+        expected = sql.query('SELECT * FROM arrow_table ORDER BY Log_Id;')
+        assert list(result.columns) == list(expected.columns)
+        pd.testing.assert_frame_equal(result.astype(object).where(result.notna(), None),
+                                      expected.astype(object).where(expected.notna(), None),
+                                      check_dtype=False)
+
+    def test_load_table(self):
+        result = load_table(sql.engine, 'arrow_table', dtype_backend='pyarrow')
+        assert len(result) == len(test_df)
+        assert isinstance(result['Log_Id'].dtype, pd.ArrowDtype)
+
+    def test_empty_result(self):
+        result = sql.query('SELECT * FROM arrow_table WHERE 1 = 0;', dtype_backend='pyarrow')
+        assert result.empty
+        assert len(result.columns) == len(test_df.columns)
+
+    def test_mixed_types_fallback(self):
+        # SQLite permite valores de distinto tipo en una misma columna, Arrow no: se usa pd.read_sql
+        sql.do('CREATE TABLE mixed_table (valor);')
+        sql.do("INSERT INTO mixed_table VALUES (1), ('uno');")
+        result = sql.query('SELECT * FROM mixed_table;', dtype_backend='pyarrow')
+        assert len(result) == 2
+
+    def test_benchmark(self):
+        query = 'SELECT * FROM arrow_table;'
+        numpy_s = best_of(lambda: sql.query(query))
+        arrow_s = best_of(lambda: sql.query(query, dtype_backend='pyarrow'))
+        numpy_mb = sql.query(query).memory_usage(index=False, deep=True).sum() / 1024 ** 2
+        arrow_mb = sql.query(query, dtype_backend='pyarrow').memory_usage(index=False, deep=True).sum() / 1024 ** 2
+        print(f'Lectura de {BENCHMARK_ROWS} filas: read_sql {numpy_s:.3f} s ({numpy_mb:.1f} MB), '
+              f'columnar {arrow_s:.3f} s ({arrow_mb:.1f} MB)')
+        assert arrow_mb < numpy_mb, 'El DataFrame con tipos de Arrow ocupa más memoria'
+
+
+if __name__ == '__main__':
+    unittest.main()
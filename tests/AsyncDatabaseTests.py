@@ -0,0 +1,79 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from libgal.modules.AsyncDatabase import AsyncSqlite
+from libgal.modules.Sqlite import Sqlite
+from libgal.modules.Utils import generate_dataframe
+
+test_df = generate_dataframe(num_rows=2000)
+tmpdir = tempfile.TemporaryDirectory()
+dbfile = os.path.join(tmpdir.name, 'async_test.db')
+sql = Sqlite(dbfile)
+sql.drop_table(None, 'async_table')
+sql.insert(test_df, None, 'async_table', 'Log_Id')
+
+
+def tearDownModule():
+    sql.connection.close()
+    sql.engine.dispose()
+    tmpdir.cleanup()
+
+
+def slow_query(db, seconds):
+    time.sleep(seconds)
+    return db.query('SELECT COUNT(*) AS n FROM async_table;')
+
+
+class AsyncDatabaseTests(unittest.TestCase):
+
+    def test_gather_queries(self):
+        async def main():
+            async with AsyncSqlite(dbfile, max_workers=4) as adb:
+                queries = [f'SELECT * FROM async_table WHERE Log_Id % 4 = {i};' for i in range(4)]
+                return await adb.gather_queries(queries)
+
+        results = asyncio.run(main())
+        assert sum(len(df) for df in results) == len(test_df)
+
+    def test_concurrency(self):
+        async def main():
+            async with AsyncSqlite(dbfile, max_workers=4) as adb:
+                t_start = time.perf_counter()
+                results = await asyncio.gather(*(adb.run(slow_query, 0.3) for _ in range(4)))
+                return time.perf_counter() - t_start, results
+
+        elapsed, results = asyncio.run(main())
+        assert all(df['n'].iloc[0] == len(test_df) for df in results)
+        assert elapsed < 0.9, f'Las queries no corrieron en paralelo ({elapsed:.2f} s)'
+
+    def test_cancellation(self):
+        async def main():
+            async with AsyncSqlite(dbfile, max_workers=1, max_concurrency=1) as adb:
+                running = asyncio.ensure_future(adb.run(slow_query, 0.3))
+                pending = asyncio.ensure_future(adb.run(slow_query, 5))
+                await asyncio.sleep(0.05)
+                pending.cancel()
+                result = await running
+                with self.assertRaises(asyncio.CancelledError):
+                    await pending
+                return result
+
+        t_start = time.perf_counter()
+        result = asyncio.run(main())
+        assert result['n'].iloc[0] == len(test_df)
+        assert time.perf_counter() - t_start < 3, 'La operación cancelada se ejecutó igual'
+
+    def test_write(self):
+        async def main():
+            async with AsyncSqlite(dbfile, max_workers=2) as adb:
+                await adb.do('DROP TABLE IF EXISTS async_copy;')
+                await adb.insert(test_df.iloc[:100], None, 'async_copy', 'Log_Id')
+                return await adb.query('SELECT COUNT(*) AS n FROM async_copy;')
+
+        assert asyncio.run(main())['n'].iloc[0] == 100
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import logging
+import os
+import tempfile
+import unittest
+from time import time
+from libgal.modules.Logger import AsyncBufferingHandler
+
+
+class AsyncFileLoggerTests(unittest.TestCase):
+
+    def test_async_log(self):
+        num_records = 10000
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'async_test.log')
+            handler = AsyncBufferingHandler(filename, buffer_size=4096, flush_interval=0.1)
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger = logging.getLogger('libgal_async_test')
+            logger.propagate = False
+            logger.setLevel(logging.INFO)
+            logger.addHandler(handler)
+
+            t_start = time()
+            for i in range(num_records):
+                logger.info('Registro %d', i)
+            elapsed = time() - t_start
+            print(f'Encolados {num_records} registros en {elapsed:.3f} s')
+
+            handler.flush()
+            with open(filename, encoding='utf-8') as fp:
+                assert len(fp.read().splitlines()) == num_records, 'flush no bajó a disco todos los registros'
+
+            logger.info('Registro final')
+            logger.removeHandler(handler)
+            handler.close()
+
+            with open(filename, encoding='utf-8') as fp:
+                lines = fp.read().splitlines()
+            assert len(lines) == num_records + 1, 'No se escribieron todos los registros al cerrar'
+            assert lines[0] == 'Registro 0' and lines[-1] == 'Registro final', 'El orden de los registros no se respetó'
+
+
+if __name__ == '__main__':
+    unittest.main()
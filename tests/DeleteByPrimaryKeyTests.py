@@ -0,0 +1,39 @@
+import unittest
+from libgal.modules.SQLMemory import SQLMemory
+from libgal.modules.Utils import generate_dataframe
+
+test_df = generate_dataframe(num_rows=20000)
+sql = SQLMemory(dbfile='delete_by_pk_test.db')
+
+
+class DeleteByPrimaryKeyTests(unittest.TestCase):
+
+    def setUp(self):
+        sql.drop_table(None, 'delete_table')
+        sql.insert(test_df, None, 'delete_table', 'Log_Id')
+
+    def remaining(self):
+        return sql.query('SELECT COUNT(*) AS n FROM delete_table;')['n'].iloc[0]
+
+    def test_delete_in_list(self):
+        sql.delete_by_primary_key(test_df.iloc[:1500], None, 'delete_table', 'Log_Id', parser_limit=1000,
+                                  strategy='in')
+        assert self.remaining() == len(test_df) - 1500, 'No se borraron las claves con listas IN'
+
+    def test_delete_join(self):
+        sql.delete_by_primary_key(test_df.iloc[:15000], None, 'delete_table', 'Log_Id', strategy='join')
+        assert self.remaining() == len(test_df) - 15000, 'No se borraron las claves con la tabla temporal'
+        tables = sql.query("SELECT name FROM sqlite_temp_master WHERE type = 'table';")
+        assert tables.empty, 'La tabla temporal de claves no se eliminó'
+
+    def test_delete_auto(self):
+        sql.delete_by_primary_key(test_df.iloc[:5000], None, 'delete_table', 'Log_Id', join_threshold=100)
+        assert self.remaining() == len(test_df) - 5000, 'No se borraron las claves con la estrategia auto'
+
+    def test_invalid_strategy(self):
+        with self.assertRaises(ValueError):
+            sql.delete_by_primary_key(test_df.iloc[:10], None, 'delete_table', 'Log_Id', strategy='otra')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+from libgal.modules.SQLMemory import SQLMemory
+from libgal.modules.Utils import generate_dataframe
+
+test_df = generate_dataframe(num_rows=20000)
+sql = SQLMemory(dbfile='hash_diff_test.db')
+
+
+class HashDiffTests(unittest.TestCase):
+
+    def setUp(self):
+        sql.drop_tables(['diff_src', 'diff_dst'])
+        sql.insert(test_df, None, 'diff_src', 'Log_Id')
+        sql.insert(test_df, None, 'diff_dst', 'Log_Id')
+
+    def test_equal_tables(self):
+        result = sql.hash_diff(None, 'diff_src', None, 'diff_dst', 'Log_Id')
+        assert result.inserted.empty and result.deleted.empty and result.changed.empty
+        assert result.rows is None
+
+    def test_key_sets(self):
+        src_id, dst_id, changed_id = test_df['Log_Id'].iloc[[10, 20, 30]].tolist()
+        sql.do(f'DELETE FROM diff_dst WHERE Log_Id = {src_id};')
+        sql.do(f'DELETE FROM diff_src WHERE Log_Id = {dst_id};')
+        sql.do(f"UPDATE diff_dst SET Nombre_Tx = 'distinto' WHERE Log_Id = {changed_id};")
+
+        result = sql.hash_diff(None, 'diff_src', None, 'diff_dst', 'Log_Id', buckets=64, fetch_rows=True)
+        assert result.inserted['Log_Id'].tolist() == [src_id], 'No se detectó la clave insertada'
+        assert result.deleted['Log_Id'].tolist() == [dst_id], 'No se detectó la clave borrada'
+        assert result.changed['Log_Id'].tolist() == [changed_id], 'No se detectó la clave modificada'
+        assert sorted(result.rows['Log_Id'].tolist()) == sorted([src_id, changed_id])
+        assert list(result.rows.columns) == list(test_df.columns)
+
+    def test_composite_key(self):
+        changed_id = test_df['Log_Id'].iloc[5]
+        sql.do(f'UPDATE diff_dst SET Columna_8_Nu = Columna_8_Nu + 1 WHERE Log_Id = {changed_id};')
+        result = sql.hash_diff(None, 'diff_src', None, 'diff_dst', ['Log_Id', 'Nombre_Tx'], bucket_limit=1)
+        assert result.changed['Log_Id'].tolist() == [changed_id]
+        assert list(result.changed.columns) == ['Log_Id', 'Nombre_Tx']
+
+    def test_different_columns(self):
+        sql.do('ALTER TABLE diff_dst ADD COLUMN extra INTEGER;')
+        sql.invalidate_metadata(None, 'diff_dst')
+        with self.assertRaises(ValueError):
+            sql.hash_diff(None, 'diff_src', None, 'diff_dst', 'Log_Id')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+# Dependencias pesadas que no deben cargarse con un simple "import libgal"
+HEAVY_MODULES = ['selenium', 'bs4', 'teradatasql', 'teradataml', 'sqlalchemy', 'sklearn', 'scipy', 'numpy',
+                 'pandas', 'requests']
+
+# Presupuesto de tiempo de importación en segundos (se puede ajustar por variable de entorno)
+IMPORT_BUDGET = float(os.environ.get('LIBGAL_IMPORT_BUDGET', '1.0'))
+
+BENCHMARK_CODE = """
+import json, sys, time
+t_start = time.perf_counter()
+import libgal
+elapsed = time.perf_counter() - t_start
+print(json.dumps({'elapsed': elapsed, 'modules': [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+
+def measure_import():
+    """
+        Importa libgal en un intérprete nuevo y devuelve el tiempo de importación y los módulos pesados cargados.
+        :return: diccionario con las claves elapsed y modules
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, '-c', BENCHMARK_CODE], cwd=root, check=True,
+                            capture_output=True, text=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+class ImportTimeTests(unittest.TestCase):
+
+    def test_no_heavy_modules(self):
+        result = measure_import()
+        assert result['modules'] == [], f'import libgal cargó dependencias pesadas: {result["modules"]}'
+
+    def test_import_time(self):
+        result = measure_import()
+        print(f'Tiempo de importación de libgal: {result["elapsed"]:.3f} s')
+        assert result['elapsed'] < IMPORT_BUDGET, \
+            f'import libgal tardó {result["elapsed"]:.3f} s (presupuesto {IMPORT_BUDGET} s)'
+
+
+if __name__ == '__main__':
+    unittest.main()
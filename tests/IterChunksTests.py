@@ -0,0 +1,48 @@
+import unittest
+import numpy as np
+import pandas as pd
+from libgal.modules.SQLMemory import SQLMemory
+from libgal.modules.Utils import generate_dataframe, iter_chunks_df
+
+test_df = generate_dataframe(num_rows=25000)
+
+
+class IterChunksTests(unittest.TestCase):
+
+    def test_exact_rows(self):
+        sizes = [len(chunk) for chunk in iter_chunks_df(test_df, rows=10000)]
+        assert sizes == [10000, 10000, 5000], 'Las porciones no tienen la cantidad de filas pedida'
+
+    def test_views(self):
+        chunk = next(iter_chunks_df(test_df, rows=1000))
+        assert np.shares_memory(chunk['Log_Id'].to_numpy(), test_df['Log_Id'].to_numpy()), 'La porción es una copia'
+
+    def test_target_bytes(self):
+        row_bytes = test_df.memory_usage(index=False, deep=True).sum() / len(test_df)
+        chunks = list(iter_chunks_df(test_df, target_bytes=int(row_bytes * 5000)))
+        assert 4 <= len(chunks) <= 6, f'Se generaron {len(chunks)} porciones para ~5000 filas cada una'
+        pd.testing.assert_frame_equal(pd.concat(chunks), test_df)
+
+    def test_prefetch(self):
+        sizes = list(iter_chunks_df(test_df, rows=3000, prefetch=2, transform=len))
+        assert sizes == [3000] * 8 + [1000]
+
+    def test_prefetch_error(self):
+        def fail(chunk):
+            raise RuntimeError('falla en el hilo de fondo')
+
+        with self.assertRaises(RuntimeError):
+            list(iter_chunks_df(test_df, rows=3000, prefetch=1, transform=fail))
+
+    def test_arguments(self):
+        with self.assertRaises(ValueError):
+            iter_chunks_df(test_df)
+
+    def test_sqlite_insert(self):
+        sql = SQLMemory(dbfile='iter_chunks_test.db')
+        sql.insert(test_df, None, 'chunks_table', 'Log_Id', odbc_limit=10000)
+        assert sql.query('SELECT COUNT(*) AS n FROM chunks_table;')['n'].iloc[0] == len(test_df)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import json
+import logging
+import unittest
+from time import perf_counter
+from libgal.modules.Logger import JSONFormatter
+
+# Formato JSON previo (pseudo JSON armado con un format string), se conserva solo para comparar rendimiento
+LEGACY_JSON_FORMAT = "{'time':'%(asctime)s', 'pid': '%(process)d', 'instance_hash': '0', " \
+                     "'thread', '%(threadName)s', 'name': '%(name)s', 'level': '%(levelname)s', " \
+                     "'file': '%(filename)s', 'lineno': %(lineno)s, 'message': '%(message)s'}"
+
+
+def make_record(msg='Ejecutando query: %s', args=("SELECT 'a' FROM tabla",), extra=None):
+    record = logging.LogRecord('libgal_json_test', logging.INFO, __file__, 10, msg, args, None)
+    for key, value in (extra or {}).items():
+        setattr(record, key, value)
+    return record
+
+
+def records_per_second(formatter, record, num_records=50000):
+    t_start = perf_counter()
+    for _ in range(num_records):
+        formatter.format(record)
+    return num_records / (perf_counter() - t_start)
+
+
+class JSONFormatterTests(unittest.TestCase):
+
+    def test_valid_json(self):
+        formatter = JSONFormatter(instance_hash=1234)
+        line = formatter.format(make_record(msg='Mensaje con "comillas" y \n salto de línea', args=None))
+        parsed = json.loads(line)
+        assert '\n' not in line, 'Cada registro debe ocupar una sola línea'
+        assert parsed['message'] == 'Mensaje con "comillas" y \n salto de línea'
+        assert parsed['instance_hash'] == 1234
+
+    def test_extra_fields(self):
+        formatter = JSONFormatter()
+        extra = {'duration': 1.25, 'rows': 500, 'table': 'p_staging.tabla'}
+        parsed = json.loads(formatter.format(make_record(extra=extra)))
+        for key, value in extra.items():
+            assert parsed[key] == value, f'El campo {key} no se incluyó en el JSON'
+
+    def test_benchmark(self):
+        record = make_record(extra={'rows': 500, 'table': 'p_staging.tabla'})
+        legacy = records_per_second(logging.Formatter(LEGACY_JSON_FORMAT), record)
+        current = records_per_second(JSONFormatter(), record)
+        print(f'Formatter anterior: {legacy:,.0f} registros/s, JSONFormatter: {current:,.0f} registros/s')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+from time import sleep
+from libgal.modules.Metadata import MetadataCache
+from libgal.modules.SQLMemory import SQLMemory
+from libgal.modules.Utils import generate_dataframe
+
+test_df = generate_dataframe(num_rows=100)
+sql = SQLMemory(dbfile='metadata_test.db')
+
+
+class MetadataCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        sql.metadata_cache = MetadataCache()
+        sql.drop_table(None, 'meta_table')
+        sql.insert(test_df, None, 'meta_table', 'Log_Id')
+
+    def test_table_schema(self):
+        columns = sql.table_schema(None, 'meta_table')
+        assert [name for name, _ in columns] == test_df.columns.tolist()
+        assert dict(columns)['Log_Id'] == 'BIGINT', 'No se leyó el tipo de la columna'
+        assert sql.table_columns(None, 'meta_table') == test_df.columns.tolist()
+        assert sql.metadata_cache.stats['hits'] == 1, 'La segunda lectura no salió de la caché'
+
+    def test_invalidation(self):
+        sql.table_columns(None, 'meta_table')
+        sql.drop_table(None, 'meta_table')
+        assert len(sql.metadata_cache) == 0, 'drop_table no invalidó la caché'
+        with self.assertRaises(Exception):
+            sql.table_columns(None, 'meta_table')
+
+        sql.insert(test_df, None, 'meta_table', 'Log_Id')
+        sql.drop_table(None, 'meta_copy')
+        sql.metadata_cache.put(None, 'meta_copy', [('vieja', None)])
+        sql.create_table_like(None, 'meta_copy', None, 'meta_table')
+        assert sql.table_columns(None, 'meta_copy') == test_df.columns.tolist(), \
+            'create_table_like no invalidó la caché'
+
+    def test_ttl_and_lru(self):
+        cache = MetadataCache(ttl=0.05, max_entries=2)
+        cache.put(None, 'a', [('x', 'INTEGER')])
+        cache.put(None, 'b', [('y', 'TEXT')])
+        assert cache.get(None, 'A') == [('x', 'INTEGER')], 'Las claves deben ignorar mayúsculas'
+        cache.put(None, 'c', [('z', 'REAL')])
+        assert cache.get(None, 'b') is None, 'No se descartó la entrada usada hace más tiempo'
+        sleep(0.1)
+        assert cache.get(None, 'a') is None, 'La entrada no venció'
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+from time import perf_counter
+from pandas import DataFrame
+from libgal.modules.Metrics import enable_metrics, disable_metrics, get_metrics, reset_metrics, measure, registry, \
+    timed
+from libgal.modules.SQLMemory import SQLMemory
+from libgal.modules.Utils import generate_dataframe
+
+
+class MetricsTests(unittest.TestCase):
+
+    def setUp(self):
+        reset_metrics()
+        enable_metrics()
+
+    def tearDown(self):
+        disable_metrics()
+        reset_metrics()
+
+    def test_database_operations(self):
+        df: DataFrame = generate_dataframe(num_rows=1000)
+        sql = SQLMemory(dbfile='metrics_test.db')
+        sql.insert(df, None, 'metrics_table', 'Log_Id')
+        sql.upsert(df.head(10), None, 'metrics_table', 'Log_Id')
+        result = sql.query('SELECT * FROM metrics_table;')
+
+        metrics = get_metrics()
+        assert metrics['Sqlite.insert']['count'] == 2, 'insert debe registrarse también dentro de upsert'
+        assert metrics['Sqlite.insert']['rows'] == 1010
+        assert metrics['Sqlite.upsert']['count'] == 1
+        assert metrics['DatabaseAPI.delete_by_primary_key']['count'] == 1
+        assert metrics['Sqlite.query']['rows'] == len(result)
+        assert metrics['Sqlite.query']['bytes'] > 0
+
+    def test_measure_and_prometheus(self):
+        with measure('proceso') as m:
+            m.add(rows=10, nbytes=100)
+        try:
+            with measure('proceso'):
+                raise ValueError('error esperado')
+        except ValueError:
+            pass
+
+        summary = get_metrics()['proceso']
+        assert summary['count'] == 2 and summary['errors'] == 1 and summary['rows'] == 10
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'libgal.prom')
+            registry.write_prometheus(path)
+            with open(path, encoding='utf-8') as fp:
+                content = fp.read()
+        assert 'libgal_operation_seconds_count{operation="proceso"} 2' in content
+        assert 'libgal_operation_errors_total{operation="proceso"} 1' in content
+
+    def test_disabled_overhead(self):
+        disable_metrics()
+
+        def noop():
+            return None
+
+        wrapped = timed('noop')(noop)
+        iterations = 200000
+        t_start = perf_counter()
+        for _ in range(iterations):
+            wrapped()
+        elapsed = perf_counter() - t_start
+        print(f'Overhead con métricas desactivadas: {elapsed / iterations * 1e9:.0f} ns por llamada')
+        assert 'noop' not in get_metrics()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import datetime
+import unittest
+from time import time
+import numpy as np
+import pandas as pd
+from libgal.modules.ODBCTools import insert_params_from_dataframe, bind_params_from_dataframe
+from libgal.modules.Utils import generate_dataframe
+
+
+class ODBCToolsTests(unittest.TestCase):
+
+    def test_insert_params_normalization(self):
+        df = pd.DataFrame({
+            'Fecha_Dt': pd.to_datetime(['2024-01-01 10:00:00', None]),
+            'Log_Id': [1.0, np.nan],
+            'Party_Num': [3.0, 4.5],
+            'Fondos_Amt': [1.5, np.nan],
+            'Nombre_Tx': [" O'Higgins ", None],
+            'Hora': [datetime.time(1, 2, 3), datetime.date(2024, 1, 2)],
+            'Cantidad': [1, 2],
+        })
+        params = insert_params_from_dataframe(df)
+        assert params[0] == ('2024-01-01', 1, 3, 1.5, 'OHiggins', '01:02:03', 1)
+        assert params[1] == (None, None, 4.5, None, None, '2024-01-02', 2)
+        assert isinstance(params[0][1], int) and isinstance(params[0][6], int), 'Los enteros deben ser int de Python'
+
+    def test_bind_params_lossless(self):
+        df = pd.DataFrame({
+            'Fecha_Dt': pd.to_datetime(['2024-01-02 13:45:00', None]),
+            'Log_Id': [1, 2],
+            'Fondos_Amt': [1.5, np.nan],
+            'Nombre_Tx': ["O'Brien  ", None],
+        })
+        params = bind_params_from_dataframe(df)
+        assert params[0] == (datetime.datetime(2024, 1, 2, 13, 45), 1, 1.5, "O'Brien  ")
+        assert params[1] == (None, 2, None, None)
+        assert type(params[0][0]) is datetime.datetime and isinstance(params[0][1], int)
+
+    def test_insert_params_benchmark(self):
+        df = generate_dataframe(num_rows=100000)
+        t_start = time()
+        params = insert_params_from_dataframe(df)
+        elapsed = time() - t_start
+        assert len(params) == len(df) and len(params[0]) == len(df.columns)
+        print(f'Normalización de {len(df)} filas: {elapsed:.2f} s')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+import numpy as np
+import pandas as pd
+from libgal.modules.SQLMemory import SQLMemory
+from libgal.modules.Utils import generate_dataframe, optimize_memory
+
+test_df = generate_dataframe(num_rows=20000)
+sql = SQLMemory(dbfile='optimize_memory_test.db')
+
+
+class OptimizeMemoryTests(unittest.TestCase):
+
+    def test_optimize_memory(self):
+        result = optimize_memory(test_df)
+        report = result.attrs['optimize_memory']
+        assert report['bytes_saved'] > report['bytes_before'] / 2, 'La optimización ahorró menos de lo esperado'
+        assert result['Log_Id'].dtype == np.int16
+        assert isinstance(result['Animal_Favorito_Tx'].dtype, pd.CategoricalDtype)
+        pd.testing.assert_frame_equal(result.astype(object), test_df.astype(object))
+
+    def test_types(self):
+        df = pd.DataFrame({
+            'chico': [1, 2, 3, 4],
+            'grande': [1, 2, 3, 2 ** 40],
+            'exacto': [0.5, 1.25, np.nan, 2.0],
+            'inexacto': [0.1, 0.2, 0.3, 0.4],
+            'unico': ['a', 'b', 'c', None],
+        })
+        result = optimize_memory(df, min_int_dtype='int32')
+        assert result['chico'].dtype == np.int32, 'No se respetó min_int_dtype'
+        assert result['grande'].dtype == np.int64
+        assert result['exacto'].dtype == np.float32
+        assert result['inexacto'].dtype == np.float64, 'Se perdió precisión al pasar a float32'
+        assert result['unico'].dtype == pd.StringDtype('pyarrow')
+        assert df['chico'].dtype == np.int64, 'Se modificó el DataFrame original'
+
+    def test_database_paths(self):
+        sql.drop_table(None, 'optimize_table')
+        sql.insert(test_df, None, 'optimize_table', 'Log_Id', optimize_dtypes=True)
+        result = sql.query('SELECT * FROM optimize_table ORDER BY Log_Id;', optimize_dtypes=True)
+        assert len(result) == len(test_df)
+        assert result.attrs['optimize_memory']['bytes_saved'] > 0
+        expected = test_df.sort_values('Log_Id', ignore_index=True)
+        assert result['Nombre_Tx'].astype(object).tolist() == expected['Nombre_Tx'].tolist()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import threading
+import unittest
+import teradatasql
+from libgal.modules.Logger import Logger
+from libgal.modules.Pool import SessionPool
+from libgal.modules.Teradata import TeradataML
+from libgal.modules.Utils import generate_dataframe
+
+test_df = generate_dataframe(num_rows=1000)
+
+
+class FakeCursor:
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, statement, *params):
+        self.connection.statements.append((statement, threading.get_ident()))
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class FakeConnection:
+
+    def __init__(self, statements):
+        self.statements = statements
+        self.autocommit = True
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def close(self):
+        pass
+
+
+class FakeTeradata(TeradataML):
+    """
+    TeradataML sin conexión: la conexión principal solo se usa desde el hilo que llama a parallel_fastload
+    y las sesiones del pool registran las sentencias que reciben
+    """
+
+    def __init__(self):
+        self._logger = Logger(dirname=None).get_logger()
+        self.pool_max_size = 4
+        self.main_thread = threading.get_ident()
+        self.main_statements = []
+        self.pool_statements = []
+        self.loads = []
+        self.failed = set()
+        self._pool = SessionPool(lambda: FakeConnection(self.pool_statements), min_size=0, max_size=4,
+                                 ping_query=None)
+
+    @property
+    def pool(self):
+        return self._pool
+
+    def _main(self, statement):
+        assert threading.get_ident() == self.main_thread, 'La conexión principal se usó desde otro hilo'
+        self.main_statements.append(statement)
+
+    def do(self, query, *args, **kwargs):
+        for statement in (query if isinstance(query, list) else [query]):
+            self._main(statement['statement'] if isinstance(statement, dict) else statement)
+
+    def drop_table_if_exists(self, schema, table):
+        self._main(f'DROP TABLE {schema}.{table};')
+
+    def table_columns(self, schema, table):
+        return list(test_df.columns)
+
+    def _fastload_partition(self, df, schema, table, sessions, batch_size):
+        self.loads.append(table)
+        # la segunda partición falla en el primer intento
+        if table.startswith('destino_p1_') and table not in self.failed:
+            self.failed.add(table)
+            raise teradatasql.OperationalError('[Error 2663] Too many load/unload tasks are running')
+        return len(df)
+
+
+class ParallelFastloadTests(unittest.TestCase):
+
+    def test_retry_recreates_staging(self):
+        td = FakeTeradata()
+        assert td.parallel_fastload(test_df, 'esquema', 'destino', 'Log_Id', partitions=3, retry_sleep=0)
+        failed = td.failed.pop()
+        assert td.loads.count(failed) == 2, 'La partición fallida no se reintentó'
+        recreated = [statement for statement, _ in td.pool_statements]
+        assert recreated == [f'DROP TABLE esquema.{failed};',
+                             f'CREATE TABLE esquema.{failed} AS esquema.destino WITH NO DATA;']
+        assert all(thread != td.main_thread for _, thread in td.pool_statements)
+        assert not any(statement.startswith('DELETE') for statement in td.main_statements)
+        inserts = [statement for statement in td.main_statements if statement.startswith('INSERT')]
+        assert len(inserts) == 3, 'No se insertaron todas las particiones en la tabla destino'
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+from libgal.modules.QueryCache import normalize_sql, referenced_tables, written_tables
+from libgal.modules.SQLMemory import SQLMemory
+from libgal.modules.Sqlite import Sqlite
+from libgal.modules.Utils import generate_dataframe
+
+test_df = generate_dataframe(num_rows=1000)
+
+
+class QueryCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.sql = SQLMemory(dbfile='query_cache_test.db')
+        self.sql.drop_table(None, 'cache_table')
+        self.sql.insert(test_df, None, 'cache_table', 'Log_Id')
+
+    def test_sql_parsing(self):
+        assert normalize_sql("SELECT  *\n FROM t -- comentario\n WHERE a = 'x  y';") == \
+            "SELECT * FROM t WHERE a = 'x  y'"
+        assert referenced_tables('SELECT * FROM s.T1 a JOIN "s.t2" b ON a.id = b.id') == {'t1', 't2'}
+        assert written_tables("DELETE FROM s.t1 WHERE a = 'DROP TABLE x'; INSERT INTO t2 VALUES (1);") == {'t1', 't2'}
+        assert written_tables('SELECT 1;') == set()
+        assert written_tables('GRANT SELECT ON t1 TO u;') is None
+
+    def test_memory_cache_and_invalidation(self):
+        cache = self.sql.enable_query_cache(ttl=60)
+        first = self.sql.query('SELECT COUNT(*) AS n FROM cache_table;')
+        second = self.sql.query('SELECT COUNT(*) AS n\n  FROM cache_table')
+        assert cache.stats['misses'] == 1 and cache.stats['hits'] == 1, 'La query normalizada no salió de la caché'
+        assert second['n'].iloc[0] == first['n'].iloc[0] == len(test_df)
+
+        self.sql.do('DELETE FROM cache_table WHERE Log_Id < 100;')
+        third = self.sql.query('SELECT COUNT(*) AS n FROM cache_table;')
+        assert third['n'].iloc[0] < len(test_df), 'do() no invalidó la caché'
+
+        self.sql.insert(test_df.iloc[:10], None, 'cache_table', 'Log_Id')
+        fourth = self.sql.query('SELECT COUNT(*) AS n FROM cache_table;')
+        assert fourth['n'].iloc[0] == third['n'].iloc[0] + 10, 'insert() no invalidó la caché'
+
+        self.sql.query('SELECT COUNT(*) AS n FROM cache_table;', cache_ttl=0)
+        assert cache.stats['hits'] == 1, 'cache_ttl=0 no debe usar la caché'
+
+    def test_disk_cache(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            dbfile = os.path.join(tmpdir, 'query_cache_disk_test.db')
+            db = Sqlite(dbfile)
+            db.drop_table(None, 'disk_table')
+            db.insert(test_df, None, 'disk_table', 'Log_Id')
+            db.enable_query_cache(cache_dir=tmpdir)
+            expected = db.query('SELECT * FROM disk_table;')
+
+            other = Sqlite(dbfile)
+            cache = other.enable_query_cache(cache_dir=tmpdir)
+            result = other.query('SELECT * FROM disk_table;')
+            assert cache.stats['disk_hits'] == 1, 'El resultado no se leyó del Parquet'
+            assert result.equals(expected)
+
+            other.upsert(test_df.iloc[:5], None, 'disk_table', 'Log_Id')
+            assert len(cache) == 0, 'upsert() no invalidó la caché en disco'
+            for database in (db, other):
+                database.connection.close()
+                database.engine.dispose()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from libgal.modules.SQLMemory import SQLMemory
+from libgal.modules.Utils import generate_dataframe
+
+test_df = generate_dataframe(num_rows=25000)
+sql = SQLMemory(dbfile='query_iter_test.db')
+sql.insert(test_df, None, 'iter_table', 'Log_Id')
+
+
+class QueryIterTests(unittest.TestCase):
+
+    def test_query_iter(self):
+        chunks = list(sql.query_iter('SELECT * FROM iter_table ORDER BY Log_Id;', chunk_rows=10000))
+        assert [len(chunk) for chunk in chunks] == [10000, 10000, 5000], 'Los chunks no respetan chunk_rows'
+        result = pd.concat(chunks, ignore_index=True)
+        expected = sql.query('SELECT * FROM iter_table ORDER BY Log_Id;')
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_query_to_csv(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'salida.csv')
+            rows = sql.query_to_file('SELECT * FROM iter_table;', path, chunk_rows=10000)
+            assert rows == len(test_df)
+            assert len(pd.read_csv(path)) == len(test_df), 'El CSV no tiene todas las filas'
+
+    def test_query_to_parquet(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'salida.parquet')
+            rows = sql.query_to_file('SELECT * FROM iter_table;', path, chunk_rows=10000)
+            assert rows == len(test_df)
+            assert len(pd.read_parquet(path)) == len(test_df), 'El Parquet no tiene todas las filas'
+
+    def test_query_to_parquet_null_first_chunk(self):
+        sql.do('DROP TABLE IF EXISTS null_table;')
+        sql.do('CREATE TABLE null_table (id INTEGER, valor REAL, nombre TEXT);')
+        sql.do('INSERT INTO null_table (id) VALUES (1), (2), (3), (4), (5);')
+        sql.do("INSERT INTO null_table VALUES (6, 1.5, 'a'), (7, 2.5, 'b');")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'salida.parquet')
+            rows = sql.query_to_file('SELECT * FROM null_table ORDER BY id;', path, chunk_rows=5)
+            assert rows == 7
+            result = pd.read_parquet(path)
+            assert result['valor'].tolist()[5:] == [1.5, 2.5] and result['nombre'].tolist()[5:] == ['a', 'b']
+            assert result['nombre'].isna().sum() == 5
+
+    def test_query_to_file_empty(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name in ('vacio.csv', 'vacio.parquet'):
+                path = os.path.join(tmpdir, name)
+                rows = sql.query_to_file('SELECT * FROM iter_table WHERE 1 = 0;', path)
+                assert rows == 0
+                result = pd.read_parquet(path) if name.endswith('.parquet') else pd.read_csv(path)
+                assert result.empty and list(result.columns) == list(test_df.columns), f'{name} sin columnas'
+
+
+if __name__ == '__main__':
+    unittest.main()
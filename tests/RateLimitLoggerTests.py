@@ -0,0 +1,57 @@
+import logging
+import unittest
+from libgal.modules.Logger import RateLimitFilter
+
+
+class CountingHandler(logging.Handler):
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def make_logger(name, rate_filter):
+    handler = CountingHandler()
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(handler)
+    logger.addFilter(rate_filter)
+    return logger, handler
+
+
+class RateLimitLoggerTests(unittest.TestCase):
+
+    def test_sampling(self):
+        logger, handler = make_logger('libgal_sampling_test', RateLimitFilter(sample_every=100))
+        for i in range(1000):
+            logger.info('Sentencia %d', i)
+        assert len(handler.records) == 10, f'Se esperaban 10 registros, se emitieron {len(handler.records)}'
+        assert handler.records[1].suppressed == 99, 'No se informó la cantidad de registros descartados'
+
+    def test_rate_limit(self):
+        logger, handler = make_logger('libgal_rate_test', RateLimitFilter(rate=5, burst=5))
+        for i in range(10000):
+            logger.debug('Sentencia %d', i)
+        # el bucle completo tarda mucho menos de un segundo, solo pasa la ráfaga inicial (más algún token recargado)
+        assert len(handler.records) < 20, f'El límite no se aplicó ({len(handler.records)} registros)'
+
+    def test_errors_not_limited(self):
+        logger, handler = make_logger('libgal_rate_error_test', RateLimitFilter(rate=1, burst=1))
+        for i in range(100):
+            logger.error('Error %d', i)
+        assert len(handler.records) == 100, 'Los errores no deben limitarse'
+
+    def test_per_call_site(self):
+        logger, handler = make_logger('libgal_rate_site_test', RateLimitFilter(rate=1, burst=1))
+        for i in range(100):
+            logger.info('Sitio A %d', i)
+            logger.info('Sitio B %d', i)
+        assert len(handler.records) == 2, 'Cada punto de llamada debe tener su propio límite'
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+from libgal.modules.Retry import RetryPolicy, error_code
+
+
+class FakeTeradataError(Exception):
+    pass
+
+
+class RetryTests(unittest.TestCase):
+
+    def test_error_classification(self):
+        policy = RetryPolicy()
+        lock_error = FakeTeradataError('[Version 17.20.0.6] [Session 123] [Teradata Database] [Error 2663] '
+                                       'Too many load/unload tasks are running')
+        syntax_error = FakeTeradataError('[Teradata Database] [Error 3706] Syntax error')
+        odbc_error = FakeTeradataError("('08S01', '[08S01] Communication link failure')")
+        assert error_code(lock_error) == 2663
+        assert policy.is_retryable(lock_error)
+        assert not policy.is_retryable(syntax_error)
+        assert policy.is_retryable(odbc_error)
+        assert not policy.is_retryable(ValueError('otro error'))
+        assert not policy.is_retryable(ValueError('La tabla HYT00 tiene 40001 filas')), 'SQLSTATE fuera de contexto'
+
+    def test_backoff(self):
+        policy = RetryPolicy(base_delay=1, max_delay=10, multiplier=2, jitter=0)
+        assert [policy.delay(i) for i in range(1, 6)] == [1, 2, 4, 8, 10]
+
+    def test_recovers(self):
+        policy = RetryPolicy(max_attempts=5, base_delay=0.001, max_delay=0.01)
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise FakeTeradataError('[Error 2631] Transaction ABORTed due to deadlock')
+            return 'ok'
+
+        assert policy.run(flaky) == 'ok'
+        assert policy.stats['retries'] == 2 and policy.stats['failures'] == 0
+
+    def test_gives_up(self):
+        policy = RetryPolicy(max_attempts=3, base_delay=0.001, max_delay=0.01)
+
+        @policy
+        def always_fails():
+            raise FakeTeradataError('[Error 2663] Too many load/unload tasks')
+
+        with self.assertRaises(FakeTeradataError):
+            always_fails()
+        assert policy.stats['retries'] == 2 and policy.stats['failures'] == 1
+
+    def test_deadline(self):
+        policy = RetryPolicy(max_attempts=100, base_delay=0.05, max_delay=0.05, jitter=0, deadline=0.12)
+        with self.assertRaises(FakeTeradataError):
+            policy.run(lambda: (_ for _ in ()).throw(FakeTeradataError('[Error 2663] busy')))
+        assert policy.stats['retries'] <= 3
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import glob
+import gzip
+import logging
+import os
+import tempfile
+import time
+import unittest
+from libgal.modules.Logger import BufferingHandler, AsyncBufferingHandler
+
+
+def make_logger(name, handler):
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    return logger
+
+
+class RotatingFileLoggerTests(unittest.TestCase):
+
+    def test_size_rotation_gzip(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'rotating.log')
+            handler = BufferingHandler(filename, buffer_size=1024, max_bytes=10 * 1024, compression='gzip')
+            logger = make_logger('libgal_rotation_test', handler)
+            for i in range(5000):
+                logger.info('Registro de prueba número %06d', i)
+            logger.removeHandler(handler)
+            handler.close()
+
+            rotated = glob.glob(filename + '.*')
+            assert len(rotated) > 1, 'No se rotó el archivo de log'
+            assert all(path.endswith('.gz') for path in rotated), 'Los segmentos rotados no se comprimieron'
+
+            lines = 0
+            for path in rotated:
+                with gzip.open(path, 'rt', encoding='utf-8') as fp:
+                    lines += len(fp.read().splitlines())
+            with open(filename, encoding='utf-8') as fp:
+                lines += len(fp.read().splitlines())
+            assert lines == 5000, 'Se perdieron registros al rotar'
+
+    def test_size_budget(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'budget.log')
+            budget = 50 * 1024
+            handler = AsyncBufferingHandler(filename, buffer_size=1024, max_bytes=10 * 1024,
+                                            max_total_bytes=budget)
+            logger = make_logger('libgal_budget_test', handler)
+            for i in range(20000):
+                logger.info('Registro de prueba número %06d', i)
+            logger.removeHandler(handler)
+            handler.close()
+
+            total = sum(os.path.getsize(path) for path in glob.glob(filename + '*'))
+            # el archivo activo puede crecer hasta max_bytes + un buffer luego de la última rotación
+            assert total <= budget + 10 * 1024 + 1024, f'Los logs ocupan {total} bytes, presupuesto {budget}'
+
+    def test_time_rotation(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'timed.log')
+            handler = BufferingHandler(filename, rotate_interval=0.2)
+            logger = make_logger('libgal_time_rotation_test', handler)
+            logger.info('Primer registro')
+            time.sleep(0.3)
+            logger.info('Segundo registro')
+            rotated = glob.glob(filename + '.*')
+            assert len(rotated) == 1, 'No se rotó por tiempo con el buffer sin llenar'
+            with open(rotated[0], encoding='utf-8') as fp:
+                assert fp.read() == 'Primer registro\n'
+            logger.removeHandler(handler)
+            handler.close()
+            with open(filename, encoding='utf-8') as fp:
+                assert fp.read() == 'Segundo registro\n'
+
+    def test_invalid_compression(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with self.assertRaises(ValueError):
+                BufferingHandler(os.path.join(tmpdir, 'invalid.log'), compression='rar')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import sqlite3
+import threading
+import unittest
+from libgal.modules.Pool import SessionPool, PoolTimeout, is_disconnect
+
+
+def connect():
+    return sqlite3.connect(':memory:', check_same_thread=False)
+
+
+class SessionPoolTests(unittest.TestCase):
+
+    def test_reuses_sessions(self):
+        pool = SessionPool(connect, min_size=1, max_size=2, ping_interval=0)
+        with pool.session() as first:
+            with pool.session() as nested:
+                assert first is nested, 'El mismo hilo debe recibir la misma sesión'
+        with pool.session() as second:
+            assert second is first, 'La sesión no se devolvió al pool'
+        stats = pool.stats
+        assert stats['created'] == 1 and stats['checkouts'] == 2 and stats['in_use'] == 0
+        pool.close()
+
+    def test_reconnects_dead_session(self):
+        pool = SessionPool(connect, min_size=1, max_size=1, ping_interval=0)
+        conn = pool.acquire()
+        conn.close()
+        pool.release(conn)
+        with pool.session() as new_conn:
+            assert new_conn is not conn
+            new_conn.execute('SELECT 1')
+        assert pool.stats['reconnects'] == 1 and pool.stats['failures'] == 1
+        pool.close()
+
+    def test_max_size_and_timeout(self):
+        pool = SessionPool(connect, min_size=0, max_size=2, timeout=0.1)
+        sessions = [pool.acquire(), pool.acquire()]
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+        assert pool.stats['timeouts'] == 1
+
+        acquired = []
+        waiter = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+        pool.timeout = 5
+        waiter.start()
+        pool.release(sessions[0])
+        waiter.join()
+        assert acquired == [sessions[0]], 'El hilo en espera no recibió la sesión liberada'
+        assert pool.stats['size'] == 2
+        pool.close()
+
+    def test_is_disconnect(self):
+        assert is_disconnect(Exception("('08S01', '[08S01] Communication link failure')"))
+        assert is_disconnect(Exception('Socket error: connection reset by peer'))
+        assert not is_disconnect(Exception('[Error 3706] Syntax error'))
+        assert not is_disconnect(Exception('[Error 2801] Duplicate key 08123 in table T08S01')), 'SQLSTATE fuera de contexto'
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,5 @@
+import os
+import tempfile
 import unittest
 from time import time
 from pandas import DataFrame
@@ -40,6 +42,8 @@ class TeradataTests(unittest.TestCase):
         self.staging_load(schema, dbcname, dl_schema, dw_table, 'Log_Id')
         self.fastload(schema, flname)
         self.verify_tables(schema, flname, dl_schema, dw_table)
+        self.csv_load(schema, flname)
+        self.verify_tables(schema, flname, dl_schema, dw_table)
         self.odbc(schema, dbcname, flname)
         self.verify_tables(schema, dbcname, dl_schema, dw_table)
         self.post_checks(schema, flname, dbcname)
@@ -59,6 +63,18 @@ class TeradataTests(unittest.TestCase):
         t_qry = time() - t_start
         logger.info(f'La carga (upsert) tardó {round(t_qry, 2)} s')
 
+        t_start = time()
+        self.td.staging_upsert(test_df, schema, dbcname, dl_schema, dw_table, pk, mode='merge')
+        t_qry = time() - t_start
+        logger.info(f'La carga (upsert por merge) tardó {round(t_qry, 2)} s')
+
+        # la staging volátil se crea en la primera carga y se reutiliza en las siguientes de la sesión
+        for i in range(3):
+            t_start = time()
+            self.td.staging_upsert(test_df.iloc[:1000], schema, dbcname, dl_schema, dw_table, pk, staging='volatile')
+            t_qry = time() - t_start
+            logger.info(f'La carga {i + 1} (upsert con staging volátil) tardó {round(t_qry, 2)} s')
+
     def fastload(self, schema, table):
         self.td.drop_table_if_exists(schema, table)
         logger.info(f'Escribiendo tabla con {len(test_df)} filas vía Fastload')
@@ -68,6 +84,20 @@ class TeradataTests(unittest.TestCase):
         t_qry = time() - t_start
         logger.info(f'La carga tardó {round(t_qry, 2)} s')
 
+    def csv_load(self, schema, table):
+        self.td.truncate_table(schema, table)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            half = len(test_df) // 2
+            test_df.iloc[:half].to_csv(os.path.join(tmpdir, 'parte_1.csv'), index=False)
+            test_df.iloc[half:].to_csv(os.path.join(tmpdir, 'parte_2.csv'), index=False)
+            logger.info(f'Cargando {len(test_df)} filas desde 2 archivos CSV vía Fastload')
+
+            t_start = time()
+            result = self.td.load_csv(os.path.join(tmpdir, '*.csv'), schema, table)
+            t_qry = time() - t_start
+            logger.info(f'La carga tardó {round(t_qry, 2)} s')
+        assert result['loaded'] == len(test_df), f'Se rechazaron filas del CSV: {result["errors"]}'
+
     def odbc(self, schema, table, flname):
         self.td.drop_table_if_exists(schema, table)
         logger.info(f'Realizando copia de la DDL de la tabla creada con Fastload')
@@ -93,7 +123,7 @@ class TeradataTests(unittest.TestCase):
     def upsert_stage(self, schema, fltable, dbctable):
         logger.info(f'Verificando UPSERT')
         t_start = time()
-        self.td.upsert(df=test_df, schema=schema, table=dbctable, pk='Log_Id', odbc_limit=len(test_df))
+        self.td.upsert(df=test_df, schema=schema, table=dbctable, pk='Log_Id', path='odbc')
         t_qry = time() - t_start
         logger.info(f'La carga tardó {round(t_qry, 2)} s')
         assert self.verify_tables(schema, fltable, schema, dbctable)
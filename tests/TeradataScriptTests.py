@@ -0,0 +1,86 @@
+import unittest
+import teradatasql
+from libgal.modules.DatabaseAPI import DatabaseError
+from libgal.modules.Logger import Logger
+from libgal.modules.Retry import RetryPolicy
+from libgal.modules.Teradata import TeradataML
+
+
+class FakeCursor:
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, statement, *params):
+        self.connection.requests.append((statement, self.connection.autocommit))
+        if len(self.connection.requests) == self.connection.fail_at:
+            raise teradatasql.OperationalError('[Error 2801] Duplicate unique prime key error')
+
+    def executemany(self, statement, params):
+        self.execute(statement)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """
+    Conexión DB-API mínima con autocommit activado por defecto, como teradatasql
+    """
+
+    def __init__(self, fail_at=None):
+        self.autocommit = True
+        self.fail_at = fail_at
+        self.requests = []
+        self.commits = []
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits.append(len(self.requests))
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def fake_teradata(connection):
+    td = TeradataML.__new__(TeradataML)
+    td.conn = connection
+    td.retry_policy = RetryPolicy(max_attempts=1)
+    td._logger = Logger(dirname=None).get_logger()
+    return td
+
+
+def script(size):
+    # sentencias parametrizadas con distinto texto: cada una es un request
+    return [{'statement': f'INSERT INTO tabla_{i} VALUES (?);', 'values': [i]} for i in range(size)]
+
+
+class TeradataScriptTests(unittest.TestCase):
+
+    def test_single_transaction(self):
+        con = FakeConnection()
+        fake_teradata(con).do(script(5))
+        assert all(not autocommit for _, autocommit in con.requests), 'El script se ejecutó con autocommit'
+        assert con.commits == [5], 'Debe haber un único commit al final'
+        assert con.autocommit, 'No se restauró el autocommit'
+
+    def test_resume_position(self):
+        con = FakeConnection(fail_at=4)
+        with self.assertRaises(DatabaseError) as ctx:
+            fake_teradata(con).do(script(6), commit_every=2)
+        assert 'start_at=2' in str(ctx.exception), str(ctx.exception)
+        assert con.commits == [2] and con.rollbacks == 1
+        assert con.autocommit, 'No se restauró el autocommit luego del error'
+
+    def test_ddl_commits(self):
+        con = FakeConnection()
+        statements = [{'statement': 'CREATE TABLE tabla (id INTEGER);', 'values': []}] + script(2)
+        fake_teradata(con).do(statements)
+        assert con.commits == [1, 3], 'La DDL debe cerrar su transacción'
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from libgal.modules.Throughput import ThroughputHistory, estimate_payload_bytes, odbc_batch_rows
+from libgal.modules.Utils import generate_dataframe
+
+test_df = generate_dataframe(num_rows=5000)
+
+
+class ThroughputTests(unittest.TestCase):
+
+    def test_payload_estimate(self):
+        exact = int(test_df.memory_usage(index=False, deep=True).sum())
+        estimate = estimate_payload_bytes(test_df, sample_rows=500)
+        assert abs(estimate - exact) / exact < 0.2, 'La estimación de bytes se aleja más del 20%'
+        assert estimate_payload_bytes(test_df.iloc[:0]) == 0
+
+    def test_batch_rows(self):
+        assert odbc_batch_rows(100) == 10485
+        assert odbc_batch_rows(10 ** 7) == 100
+        assert odbc_batch_rows(1) == 50000
+
+    def test_path_choice_and_history(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'throughput.json')
+            history = ThroughputHistory(path=path)
+            small, large = 100 * 1024, 500 * 1024 ** 2
+            assert history.estimate('host', 'odbc', small) < history.estimate('host', 'fastload', small)
+            assert history.estimate('host', 'odbc', large) > history.estimate('host', 'fastload', large)
+
+            # una red rápida para ODBC mueve el punto de corte
+            history.record('host', 'odbc', 100 * 1024 ** 2, 10.2)
+            assert ThroughputHistory(path=path).costs('host', 'odbc')[1] == 10.0, 'El historial no se guardó'
+            assert history.estimate('host', 'odbc', 50 * 1024 ** 2) < history.estimate('host', 'fastload', 50 * 1024 ** 2)
+
+    def test_history_opt_in(self):
+        with mock.patch.dict(os.environ, clear=True):
+            history = ThroughputHistory()
+            assert history.path is None, 'Sin archivo ni LIBGAL_THROUGHPUT_FILE no se debe guardar el historial'
+            history.record('host', 'odbc', 100 * 1024 ** 2, 10.2)
+            assert history.costs('host', 'odbc')[1] == 10.0, 'El historial en memoria no se actualizó'
+
+    def test_unwritable_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            blocker = os.path.join(tmpdir, 'archivo')
+            open(blocker, 'w').close()
+            # el directorio del historial es un archivo: no se puede guardar pero la carga no falla
+            history = ThroughputHistory(path=os.path.join(blocker, 'throughput.json'))
+            history.record('host', 'fastload', 100 * 1024 ** 2, 15)
+            assert history.costs('host', 'fastload')[1] > 0
+            assert os.listdir(tmpdir) == ['archivo']
+
+
+if __name__ == '__main__':
+    unittest.main()